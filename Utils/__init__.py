@@ -1,7 +1,10 @@
-from . import cardinal_tools
-from . import config_loader
-from . import exceptions
-from . import logger
-from . import updater
+import importlib
 
-__all__ = ["cardinal_tools", "config_loader", "exceptions", "logger", "updater"]
+__all__ = ["cardinal_tools", "config_loader", "exceptions", "log_reader", "logger", "settings", "startup", "updater"]
+
+
+def __getattr__(name):
+    # подмодули — по первому обращению: `from Utils.startup import ...` не должен тянуть aiohttp через updater
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
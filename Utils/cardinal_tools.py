@@ -1,9 +1,10 @@
 import os
 import shutil
 import time
-import json
 import hashlib
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from . import json_codec
 
 def create_directories(directories: List[str]):
     for directory in directories:
@@ -61,17 +62,48 @@ def clean_filename(filename: str) -> str:
         filename = filename[:255]
     return filename
 
-def calculate_file_hash(file_path: str) -> str:
+HASH_CHUNK_SIZE = 256 * 1024
+
+# путь → (mtime_ns, size, алгоритм, хэш); файл не перечитывается, пока mtime и размер те же
+_hash_cache: Dict[str, Tuple[int, int, str, str]] = {}
+
+
+def calculate_file_hash(file_path: str, algorithm: str = "md5") -> str:
+    """Хэш файла потоково (память не зависит от размера), с кэшем по mtime и размеру."""
     try:
+        st = os.stat(file_path)
+        cached = _hash_cache.get(file_path)
+        if cached and cached[:3] == (st.st_mtime_ns, st.st_size, algorithm):
+            return cached[3]
+        h = hashlib.new(algorithm)
         with open(file_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _hash_cache[file_path] = (st.st_mtime_ns, st.st_size, algorithm, digest)
+        return digest
     except Exception:
         return ""
 
+
+def load_hash_cache(path: str) -> None:
+    """Подхватить кэш хэшей прошлого запуска (save_hash_cache)."""
+    try:
+        for file_path, entry in json_codec.load_file(path).items():
+            _hash_cache.setdefault(file_path, tuple(entry))
+    except Exception:
+        pass
+
+
+def save_hash_cache(path: str) -> None:
+    try:
+        json_codec.dump_file(path, {k: list(v) for k, v in _hash_cache.items()})
+    except Exception:
+        pass
+
 def save_json(data: Dict[str, Any], file_path: str) -> bool:
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file(file_path, data, pretty=True)
         return True
     except Exception:
         return False
@@ -80,8 +112,7 @@ def load_json(file_path: str) -> Optional[Dict[str, Any]]:
     try:
         if not os.path.exists(file_path):
             return None
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return json_codec.load_file(file_path)
     except Exception:
         return None
 
@@ -0,0 +1,57 @@
+"""
+JSON-кодек для всех файлов бота: orjson, если установлен, иначе стандартный json.
+
+pretty=True — отступы для конфигов, которые правят руками (configs/*.json).
+Всё, что пишет сам бот (storage/, plugins/data/), сохраняется компактно.
+"""
+import json
+import os
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError — его подкласс
+
+if orjson is not None:
+    _OPT_COMPACT = orjson.OPT_NON_STR_KEYS
+    _OPT_PRETTY = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def dumpb(obj: Any, pretty: bool = False) -> bytes:
+    """Сериализует в UTF-8 байты."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_OPT_PRETTY if pretty else _OPT_COMPACT)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    return dumpb(obj, pretty).decode("utf-8")
+
+
+def load_file(path: Union[str, os.PathLike]) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_file(path: Union[str, os.PathLike], obj: Any, pretty: bool = False) -> None:
+    """Пишет через временный файл и os.replace, чтобы сбой не оставил обрезанный JSON."""
+    data = dumpb(obj, pretty)
+    tmp_path = f"{os.fspath(path)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
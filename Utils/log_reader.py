@@ -0,0 +1,172 @@
+"""
+Чтение logs/bot.log* для /logs в Telegram: хвост и поиск по всем ротированным файлам.
+
+Несжатые файлы читаются с конца блоками по BLOCK_SIZE, поэтому хвост большого лога стоит
+несколько блоков, а не весь файл. .gz назад не читается — он проходится вперёд потоком,
+в памяти держатся только последние нужные строки. При поиске regex сначала проверяется
+на блоке целиком, на строки режутся только блоки с совпадением. Память ограничена числом
+строк результата и MAX_LINE, время — budget: по его истечении возвращается найденное
+с truncated=True.
+
+Поиск по умолчанию — по обычному тексту. Регулярное выражение — только явно (regex=True,
+в /logs префикс «re:») и не длиннее MAX_PATTERN: budget проверяется между блоками, а не
+внутри одного re.search, и выражение с катастрофическим перебором он бы не остановил.
+"""
+import gzip
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Pattern
+
+LOG_PATH = os.path.join("logs", "bot.log")
+BLOCK_SIZE = 64 * 1024
+MAX_LINE = 4096        # более длинные строки обрезаются
+MAX_RESULTS = 500
+DEFAULT_BUDGET = 3.0   # секунд на один запрос
+MAX_PATTERN = 200      # символов в регулярном выражении
+
+
+@dataclass
+class LogScan:
+    lines: List[str] = field(default_factory=list)  # от новых к старым
+    files: int = 0
+    scanned_bytes: int = 0
+    truncated: bool = False
+    elapsed: float = 0.0
+
+
+def log_files(base: str = LOG_PATH) -> List[str]:
+    """bot.log, bot.log.1[.gz], bot.log.2[.gz]... — от новых к старым."""
+    directory, name = os.path.split(base)
+    indexed = {}
+    try:
+        entries = os.listdir(directory or ".")
+    except OSError:
+        return []
+    for entry in entries:
+        match = re.fullmatch(re.escape(name) + r"\.(\d+)(\.gz)?", entry)
+        if match:
+            index = int(match.group(1))
+            # пока идёт сжатие, есть и bot.log.N, и bot.log.N.gz.tmp — берём несжатый
+            if index not in indexed or not match.group(2):
+                indexed[index] = os.path.join(directory, entry)
+    files = [base] if os.path.exists(base) else []
+    return files + [indexed[i] for i in sorted(indexed)]
+
+
+def _lines(block: bytes) -> List[str]:
+    text = block.decode("utf-8", errors="replace")
+    return [line[:MAX_LINE].rstrip("\r") for line in text.split("\n") if line]
+
+
+def reverse_blocks(path: str, scan: LogScan, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Несжатый файл с конца к началу кусками из целых строк; целиком в память не читается."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + tail
+            scan.scanned_bytes += step
+            head, sep, body = chunk.partition(b"\n")  # head может начинаться в предыдущем блоке
+            if not sep:
+                tail = chunk[-MAX_LINE:]
+                continue
+            tail = head[-MAX_LINE:]
+            yield body
+        if tail:
+            yield tail
+
+
+def forward_blocks(path: str, scan: LogScan, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """.gz от начала к концу теми же кусками из целых строк."""
+    with open(path, "rb") as raw, gzip.open(raw, "rb") as f:
+        rest = b""
+        while True:
+            chunk = f.read(block_size)
+            scan.scanned_bytes = max(scan.scanned_bytes, raw.tell())
+            if not chunk:
+                break
+            body, sep, rest_new = (rest + chunk).rpartition(b"\n")
+            if not sep:
+                rest = rest_new[-MAX_LINE:]
+                continue
+            rest = rest_new
+            yield body
+        if rest:
+            yield rest
+
+
+def _matches(block: bytes, regex: Optional[Pattern]) -> List[str]:
+    if regex is None:
+        return _lines(block)
+    # regex по всему куску сразу: большинство кусков отсеивается без разбиения на строки
+    text = block.decode("utf-8", errors="replace")
+    if not regex.search(text):
+        return []
+    return [line for line in _lines(block) if regex.search(line)]
+
+
+def scan_logs(regex: Optional[Pattern] = None, limit: int = 50, budget: float = DEFAULT_BUDGET,
+              base: str = LOG_PATH) -> LogScan:
+    """Первые limit строк (от новых к старым), где находится regex; без regex — хвост."""
+    limit = max(1, min(limit, MAX_RESULTS))
+    started = time.monotonic()
+    deadline = started + budget
+    scan = LogScan()
+    for path in log_files(base):
+        need = limit - len(scan.lines)
+        if need <= 0 or scan.truncated:
+            break
+        scan.files += 1
+        try:
+            if path.endswith(".gz"):
+                # назад не прочитать: проходим вперёд, храним только последние need совпадений
+                found: deque = deque(maxlen=need)
+                for block in forward_blocks(path, scan):
+                    found.extend(_matches(block, regex))
+                    if time.monotonic() > deadline:
+                        scan.truncated = True
+                        break
+                scan.lines += reversed(found)
+                continue
+            for block in reverse_blocks(path, scan):
+                scan.lines += _matches(block, regex)[::-1][:limit - len(scan.lines)]
+                if len(scan.lines) >= limit:
+                    break
+                if time.monotonic() > deadline:
+                    scan.truncated = True
+                    break
+        except (OSError, EOFError):
+            continue  # файл ротировался или дописывается сжатие — пропускаем
+    scan.elapsed = time.monotonic() - started
+    return scan
+
+
+def compile_pattern(text: str, regex: bool = False) -> Pattern:
+    """Обычный текст без учёта регистра; regex=True — регулярное выражение (не длиннее MAX_PATTERN,
+    некорректное ищется как текст). MULTILINE — чтобы ^ и $ в проверке целого куска значили
+    то же, что и в отдельной строке."""
+    flags = re.IGNORECASE | re.MULTILINE
+    if not regex:
+        return re.compile(re.escape(text), flags)
+    if len(text) > MAX_PATTERN:
+        raise ValueError(f"регулярное выражение длиннее {MAX_PATTERN} символов")
+    try:
+        return re.compile(text, flags)
+    except re.error:
+        return re.compile(re.escape(text), flags)
+
+
+def tail(lines: int = 50, budget: float = DEFAULT_BUDGET, base: str = LOG_PATH) -> LogScan:
+    return scan_logs(None, lines, budget, base)
+
+
+def search(pattern: str, limit: int = 100, budget: float = DEFAULT_BUDGET, base: str = LOG_PATH,
+           regex: bool = False) -> LogScan:
+    return scan_logs(compile_pattern(pattern, regex), limit, budget, base)
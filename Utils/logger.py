@@ -1,4 +1,31 @@
+"""
+Логирование бота.
+
+Обработчики из get_logger_config (консоль, logs/bot.log) работают в отдельном потоке:
+install_queue_logging() подменяет их у логгеров на QueueHandler, а настоящие вызывает
+QueueListener. На цикле событий остаётся только постановка записи в очередь — форматирование,
+запись на диск и ротация идут в потоке слушателя, сжатие ротированного файла в .gz — ещё в
+одном потоке. DEBUG-записи прореживаются по месту вызова (DebugSampler), формат файла —
+текст или JSON lines ([Other] log_format).
+"""
+import atexit
+import gzip
+import logging
+import logging.handlers
 import os
+import queue
+import re
+import shutil
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from Utils import json_codec
+
+LOG_FORMATS = ("text", "json")
+ROTATED_SUFFIX = ".gz"
+DEBUG_BURST = 20      # DEBUG-записей с одного места вызова за окно
+DEBUG_WINDOW = 10.0   # секунд; сверх лимита записи отбрасываются, их число дописывается к следующей
+
 
 def get_logger_config(log_level: str = "INFO") -> dict:
     os.makedirs("logs", exist_ok=True)
@@ -37,6 +64,8 @@ def get_logger_config(log_level: str = "INFO") -> dict:
             "StarVell": {"level": level, "handlers": ["console", "file"], "propagate": False},
             "Nexus": {"level": level, "handlers": ["console", "file"], "propagate": False},
             "StarVellAPI": {"level": level, "handlers": ["console", "file"], "propagate": False},
+            # plugin.<модуль> — логгеры плагинов и plugins/utils
+            "plugin": {"level": level, "handlers": ["console", "file"], "propagate": False},
             "aiogram": {"level": "WARNING", "handlers": ["console"], "propagate": False},
             "aiohttp": {"level": "WARNING", "handlers": ["console"], "propagate": False},
         },
@@ -44,3 +73,225 @@ def get_logger_config(log_level: str = "INFO") -> dict:
     }
 
 LOGGER_CONFIG = get_logger_config("INFO")
+
+
+def set_log_level(log_level: str = "INFO") -> None:
+    """Меняет уровень логирования на лету (консоль и логгеры из get_logger_config)."""
+    level = log_level.upper() if log_level.upper() in ("DEBUG", "INFO", "WARNING") else "INFO"
+    for name in ("StarVell", "Nexus", "StarVellAPI", "plugin"):
+        logging.getLogger(name).setLevel(level)
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in _real_handlers():
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(level)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись — одна JSON-строка: ts, level, logger, msg (+ exc)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json_codec.dumps(entry)
+
+
+class DebugSampler(logging.Filter):
+    """Не больше DEBUG_BURST DEBUG-записей за DEBUG_WINDOW секунд с одного места вызова."""
+
+    def __init__(self, burst: int = DEBUG_BURST, window: float = DEBUG_WINDOW) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._sites: Dict[Tuple[str, int], List[float]] = {}  # место → [начало окна, пропущено, записано]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        key = (record.pathname, record.lineno)
+        site = self._sites.get(key)
+        if site is None or record.created - site[0] >= self.window:
+            dropped = int(site[1]) if site else 0
+            self._sites[key] = [record.created, 0, 1]
+            if dropped and isinstance(record.msg, str):
+                record.msg = f"{record.msg} (+{dropped} похожих пропущено)"
+            return True
+        if site[2] >= self.burst:
+            site[1] += 1
+            return False
+        site[2] += 1
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Ставит запись в очередь как есть: форматирование — в потоке слушателя, а не на цикле событий."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, route: str) -> None:
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.log_route = self.route
+        return record
+
+
+class _RoutingListener(logging.handlers.QueueListener):
+    """У каждого логгера свой набор обработчиков (aiogram — только консоль), маршрут хранится в записи."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, routes: Dict[str, List[logging.Handler]]) -> None:
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.routes.get(getattr(record, "log_route", ""), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+_gzip_threads: List[threading.Thread] = []
+_gzip_lock = threading.Lock()
+
+
+def _gzip_rotated(plain: str, target: str) -> None:
+    tmp = f"{target}.tmp"
+    try:
+        inode = os.stat(plain).st_ino
+        with open(plain, "rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, target)
+        if os.stat(plain).st_ino == inode:  # под этим именем мог оказаться уже другой файл
+            os.remove(plain)
+    except OSError:
+        pass  # останется несжатый файл — он тоже читается, при следующем запуске будет сжат
+
+
+def _start_gzip(plain: str, target: str) -> None:
+    thread = threading.Thread(target=_gzip_rotated, args=(plain, target), name="log-gzip", daemon=True)
+    with _gzip_lock:
+        _gzip_threads[:] = [t for t in _gzip_threads if t.is_alive()] + [thread]
+    thread.start()
+
+
+def _wait_gzip(timeout: Optional[float] = None) -> None:
+    """Дождаться начатых сжатий."""
+    with _gzip_lock:
+        threads = list(_gzip_threads)
+    for thread in threads:
+        thread.join(timeout)
+
+
+def _rotate_compressed(source: str, dest: str) -> None:
+    """Ротация: быстрое переименование в потоке слушателя, сжатие — в фоновом потоке."""
+    plain = dest[:-len(ROTATED_SUFFIX)]
+    os.replace(source, plain)
+    _start_gzip(plain, dest)
+
+
+def _after_gzip(rollover):
+    """Следующая ротация ждёт сжатия предыдущей: иначе bot.log.1 перезапишется до того, как
+    станет bot.log.1.gz, а недописанный архив не сдвинется в bot.log.2.gz."""
+    def wrapped() -> None:
+        _wait_gzip()
+        rollover()
+    return wrapped
+
+
+def _cleanup_rotated(base: str) -> None:
+    """Остатки прерванного сжатия: *.gz.tmp удаляются, несжатый bot.log.N дожимается в .gz
+    (или удаляется, если архив уже готов) — иначе его не удалит ни одна ротация."""
+    directory, name = os.path.split(base)
+    try:
+        entries = os.listdir(directory or ".")
+    except OSError:
+        return
+    for entry in entries:
+        match = re.fullmatch(re.escape(name) + r"\.\d+(\.gz\.tmp)?", entry)
+        if not match:
+            continue
+        path = os.path.join(directory, entry)
+        try:
+            if match.group(1):
+                os.remove(path)
+            elif os.path.exists(path + ROTATED_SUFFIX):
+                os.remove(path)
+            else:
+                _start_gzip(path, path + ROTATED_SUFFIX)
+        except OSError:
+            pass
+
+
+_listener: Optional[_RoutingListener] = None
+_text_formatters: Dict[logging.Handler, Optional[logging.Formatter]] = {}
+
+
+def _real_handlers() -> List[logging.Handler]:
+    if _listener is None:
+        return list(logging.getLogger().handlers + logging.getLogger("StarVell").handlers)
+    return list({id(h): h for hs in _listener.routes.values() for h in hs}.values())
+
+
+def install_queue_logging(logger_names=None) -> None:
+    """Переводит корневой и перечисленные логгеры на очередь (повторный вызов ничего не делает)."""
+    global _listener
+    if _listener is not None:
+        return
+    names = logger_names or [name for name in get_logger_config()["loggers"]]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    sampler = DebugSampler()
+    routes: Dict[str, List[logging.Handler]] = {}
+    queue_handlers: Dict[str, _QueueHandler] = {}
+
+    for lg in [logging.getLogger()] + [logging.getLogger(n) for n in names]:
+        if not lg.handlers:
+            continue
+        route = "+".join(sorted(h.get_name() or str(id(h)) for h in lg.handlers))
+        if route not in queue_handlers:
+            routes[route] = list(lg.handlers)
+            queue_handlers[route] = _QueueHandler(log_queue, route)
+            queue_handlers[route].addFilter(sampler)
+        lg.handlers = [queue_handlers[route]]
+
+    for handler in {id(h): h for hs in routes.values() for h in hs}.values():
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            handler.namer = lambda name: name + ROTATED_SUFFIX
+            handler.rotator = _rotate_compressed
+            handler.doRollover = _after_gzip(handler.doRollover)
+            _cleanup_rotated(handler.baseFilename)
+        _text_formatters[handler] = handler.formatter
+
+    _listener = _RoutingListener(log_queue, routes)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+
+
+def stop_queue_logging() -> None:
+    """Дописать очередь, остановить поток слушателя и дождаться сжатия ротированных файлов."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _wait_gzip()
+
+
+def set_log_format(log_format: str = "text") -> None:
+    """text — как раньше, json — JSON lines; меняется только формат файла, консоль остаётся текстовой."""
+    for handler in _real_handlers():
+        if isinstance(handler, logging.FileHandler):
+            if log_format == "json":
+                handler.setFormatter(JsonLinesFormatter())
+            elif handler in _text_formatters:
+                handler.setFormatter(_text_formatters[handler])
+
+
+def setup_logging(log_level: str = "INFO", log_format: str = "text") -> None:
+    import logging.config
+
+    logging.config.dictConfig(get_logger_config(log_level))
+    install_queue_logging()
+    set_log_format(log_format)
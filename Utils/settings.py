@@ -0,0 +1,332 @@
+"""
+Типизированные настройки из configs/_main.cfg и их горячая перезагрузка.
+"""
+import asyncio
+import logging
+import os
+import re
+from dataclasses import dataclass, fields, replace
+from typing import Awaitable, Callable, Optional, Set, Tuple, Union
+
+from .config_loader import load_main_config
+from .exceptions import ConfigParseError
+
+logger = logging.getLogger("StarVell.settings")
+
+MAIN_CONFIG_PATH = os.path.join("configs", "_main.cfg")
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING")
+LOG_FORMATS = ("text", "json")
+DEFAULT_POLL_INTERVAL = 6.0
+DEFAULT_OFFERS_SYNC_INTERVAL = 300.0
+DEFAULT_RAISE_INTERVAL = 3600.0
+
+# Основной аккаунт — [StarVell]; дополнительные — секции [Account:<имя>] с тем же набором ключей
+MAIN_ACCOUNT = "main"
+ACCOUNT_SECTION_PREFIX = "Account:"
+ACCOUNT_NAME_RE = re.compile(r"[A-Za-z0-9_-]{1,32}")
+
+# Ключи, которые применяются на лету. Всё остальное требует перезапуска.
+LIVE_KEYS = {
+    "StarVell.poll_interval",
+    "StarVell.offers_sync_interval",
+    "StarVell.auto_raise",
+    "StarVell.raise_interval",
+    "Accounts.intervals",
+    "Telegram.admin_ids",
+    "Telegram.notifications",
+    "Telegram.password",
+    "Other.log_level",
+    "Other.log_format",
+}
+
+
+def _to_bool(value, default: bool = False) -> bool:
+    if value is None or value == "":
+        return default
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+@dataclass(frozen=True)
+class StarVellSettings:
+    session_id: str = ""
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+    offers_sync_interval: float = DEFAULT_OFFERS_SYNC_INTERVAL
+    auto_raise: bool = False
+    raise_interval: float = DEFAULT_RAISE_INTERVAL
+
+
+@dataclass(frozen=True)
+class AccountSettings:
+    """Дополнительный аккаунт StarVell. Незаданные интервалы берутся из [StarVell]."""
+    name: str
+    session_id: str
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+    offers_sync_interval: float = DEFAULT_OFFERS_SYNC_INTERVAL
+    auto_raise: bool = False
+    raise_interval: float = DEFAULT_RAISE_INTERVAL
+
+
+@dataclass(frozen=True)
+class TelegramSettings:
+    bot_token: str = ""
+    admin_ids: Tuple[int, ...] = ()
+    password: str = "admin"
+    notifications: bool = True
+
+    @property
+    def main_admin_id(self) -> int:
+        return self.admin_ids[0] if self.admin_ids else 0
+
+
+@dataclass(frozen=True)
+class ProxySettings:
+    enable: bool = False
+    check: bool = True
+    login: str = ""
+    password: str = ""
+    ip: str = ""
+    port: str = ""
+
+
+@dataclass(frozen=True)
+class OtherSettings:
+    language: str = "ru"
+    log_level: str = "INFO"
+    log_format: str = "text"
+
+
+@dataclass(frozen=True)
+class UpdateSettings:
+    github_token: str = ""
+    auto_update: bool = False
+
+
+def _parse_starvell(sv: dict, section: str) -> StarVellSettings:
+    """Ключи [StarVell] (или [Account:<имя>]) с проверкой значений."""
+    session_id = (sv.get("session") or sv.get("session_id") or "").strip()
+
+    try:
+        poll_interval = float(sv.get("poll_interval") or DEFAULT_POLL_INTERVAL)
+    except ValueError:
+        raise ConfigParseError(f"[{section}] poll_interval должен быть числом: {sv.get('poll_interval')!r}")
+    if poll_interval < 1:
+        raise ConfigParseError(f"[{section}] poll_interval должен быть не меньше 1 сек: {poll_interval}")
+
+    try:
+        offers_sync_interval = float(sv.get("offers_sync_interval") or DEFAULT_OFFERS_SYNC_INTERVAL)
+    except ValueError:
+        raise ConfigParseError(
+            f"[{section}] offers_sync_interval должен быть числом: {sv.get('offers_sync_interval')!r}")
+    if offers_sync_interval < 30:
+        raise ConfigParseError(f"[{section}] offers_sync_interval должен быть не меньше 30 сек: {offers_sync_interval}")
+
+    try:
+        raise_interval = float(sv.get("raise_interval") or DEFAULT_RAISE_INTERVAL)
+    except ValueError:
+        raise ConfigParseError(f"[{section}] raise_interval должен быть числом: {sv.get('raise_interval')!r}")
+    if raise_interval < 60:
+        raise ConfigParseError(f"[{section}] raise_interval должен быть не меньше 60 сек: {raise_interval}")
+
+    return StarVellSettings(session_id=session_id, poll_interval=poll_interval,
+                            offers_sync_interval=offers_sync_interval,
+                            auto_raise=_to_bool(sv.get("auto_raise")),
+                            raise_interval=raise_interval)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Снимок configs/_main.cfg с доступом через атрибуты.
+    Собирается один раз через from_dict() и дальше не меняется — при перезагрузке создаётся новый объект.
+    """
+    starvell: StarVellSettings = StarVellSettings()
+    telegram: TelegramSettings = TelegramSettings()
+    proxy: ProxySettings = ProxySettings()
+    other: OtherSettings = OtherSettings()
+    updates: UpdateSettings = UpdateSettings()
+    accounts: Tuple[AccountSettings, ...] = ()
+
+    SECTIONS = {
+        "starvell": "StarVell",
+        "telegram": "Telegram",
+        "proxy": "Proxy",
+        "other": "Other",
+        "updates": "Updates",
+    }
+
+    @classmethod
+    def from_dict(cls, cfg: dict) -> "Settings":
+        """Строит и валидирует настройки из словаря load_main_config(). Ошибки — ConfigParseError."""
+        if not isinstance(cfg, dict):
+            raise ConfigParseError(f"Неверный тип конфига: {type(cfg)}")
+
+        sv = cfg.get("StarVell", {})
+        tg = cfg.get("Telegram", {})
+        proxy = cfg.get("Proxy", {})
+        other = cfg.get("Other", {})
+        upd = cfg.get("Updates", {})
+
+        starvell = _parse_starvell(sv, "StarVell")
+        accounts = []
+        for section, values in cfg.items():
+            if not section.startswith(ACCOUNT_SECTION_PREFIX):
+                continue
+            name = section[len(ACCOUNT_SECTION_PREFIX):].strip()
+            if not ACCOUNT_NAME_RE.fullmatch(name) or name == MAIN_ACCOUNT:
+                raise ConfigParseError(f"[{section}] имя аккаунта — латиница, цифры, _ и -, не {MAIN_ACCOUNT!r}")
+            parsed = _parse_starvell({**sv, "session": "", "session_id": "", **values}, section)
+            if not parsed.session_id:
+                raise ConfigParseError(f"[{section}] не указан session_id")
+            accounts.append(AccountSettings(name=name, session_id=parsed.session_id,
+                                            poll_interval=parsed.poll_interval,
+                                            offers_sync_interval=parsed.offers_sync_interval,
+                                            auto_raise=parsed.auto_raise,
+                                            raise_interval=parsed.raise_interval))
+
+        admin_ids = []
+        for part in (tg.get("admin_id") or "").replace(" ", "").split(","):
+            if not part:
+                continue
+            try:
+                admin_ids.append(int(part))
+            except ValueError:
+                raise ConfigParseError(f"[Telegram] admin_id должен быть числом: {part!r}")
+
+        log_level = (other.get("log_level") or "INFO").strip().upper()
+        if log_level not in LOG_LEVELS:
+            raise ConfigParseError(f"[Other] log_level должен быть одним из {', '.join(LOG_LEVELS)}: {log_level!r}")
+        log_format = (other.get("log_format") or "text").strip().lower()
+        if log_format not in LOG_FORMATS:
+            raise ConfigParseError(f"[Other] log_format должен быть одним из {', '.join(LOG_FORMATS)}: {log_format!r}")
+
+        return cls(
+            starvell=starvell,
+            telegram=TelegramSettings(
+                bot_token=(tg.get("bot_token") or "").strip(),
+                admin_ids=tuple(dict.fromkeys(admin_ids)),
+                password=(tg.get("password") or "").strip() or "admin",
+                notifications=_to_bool(tg.get("notifications"), default=True),
+            ),
+            proxy=ProxySettings(
+                enable=_to_bool(proxy.get("enable")),
+                check=_to_bool(proxy.get("check"), default=True),
+                login=proxy.get("login", ""),
+                password=proxy.get("password", ""),
+                ip=proxy.get("ip", ""),
+                port=proxy.get("port", ""),
+            ),
+            other=OtherSettings(
+                language=(other.get("language") or "ru").strip(),
+                log_level=log_level,
+                log_format=log_format,
+            ),
+            updates=UpdateSettings(
+                github_token=(upd.get("github_token") or "").strip(),
+                auto_update=_to_bool(upd.get("auto_update")),
+            ),
+            accounts=tuple(accounts),
+        )
+
+    @classmethod
+    def load(cls, config_path: str = MAIN_CONFIG_PATH) -> Tuple["Settings", dict]:
+        """Читает файл конфига и возвращает (settings, raw_dict)."""
+        raw = load_main_config(config_path)
+        return cls.from_dict(raw), raw
+
+    def diff(self, other: "Settings") -> Set[str]:
+        """Возвращает изменённые ключи в формате 'Section.key'."""
+        changed = set()
+        for attr, section in self.SECTIONS.items():
+            old_part, new_part = getattr(self, attr), getattr(other, attr)
+            for f in fields(old_part):
+                if getattr(old_part, f.name) != getattr(new_part, f.name):
+                    changed.add(f"{section}.{f.name}")
+        if [(a.name, a.session_id) for a in self.accounts] != [(a.name, a.session_id) for a in other.accounts]:
+            changed.add("Accounts")
+        elif self.accounts != other.accounts:
+            changed.add("Accounts.intervals")
+        return changed
+
+    def for_account(self, account: AccountSettings) -> "Settings":
+        """Настройки с [StarVell], подменённым на дополнительный аккаунт; остальные секции общие."""
+        return replace(self, starvell=StarVellSettings(
+            session_id=account.session_id, poll_interval=account.poll_interval,
+            offers_sync_interval=account.offers_sync_interval,
+            auto_raise=account.auto_raise, raise_interval=account.raise_interval,
+        ), accounts=())
+
+
+OnChange = Callable[[Settings, dict, Set[str], Set[str]], Union[Awaitable[None], None]]
+
+
+class ConfigWatcher:
+    """
+    Следит за configs/_main.cfg (по mtime/size) и при изменении перечитывает его.
+    Безопасные ключи (LIVE_KEYS) передаются в on_change для применения на лету,
+    остальные помечаются как требующие перезапуска.
+    """
+
+    def __init__(self, settings: Settings, on_change: OnChange,
+                 config_path: str = MAIN_CONFIG_PATH, interval: float = 2.0):
+        self.settings = settings
+        self.on_change = on_change
+        self.config_path = config_path
+        self.interval = interval
+        self._stamp = self._file_stamp()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def sync(self, settings: Settings):
+        """Принимает настройки, которые процесс сам записал в файл, чтобы не применять их повторно."""
+        self.settings = settings
+        self._stamp = self._file_stamp()
+
+    async def reload(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Перечитывает конфиг и применяет изменения.
+        Возвращает (live, restart) — применённые и требующие перезапуска ключи.
+        При ошибке валидации остаются старые настройки, ConfigParseError пробрасывается.
+        """
+        self._stamp = self._file_stamp()
+        new_settings, raw = Settings.load(self.config_path)
+        changed = self.settings.diff(new_settings)
+        live = changed & LIVE_KEYS
+        restart = changed - LIVE_KEYS
+        if "Telegram.notifications" in live and new_settings.telegram.notifications:
+            # выключенный при старте бот не запускался — включить его можно только перезапуском
+            live.discard("Telegram.notifications")
+            restart.add("Telegram.notifications")
+
+        self.settings = new_settings
+        result = self.on_change(new_settings, raw, live, restart)
+        if asyncio.iscoroutine(result):
+            await result
+
+        if live:
+            logger.info("♻️ Конфиг применён на лету: %s", ", ".join(sorted(live)))
+        if restart:
+            logger.warning("⚠️ Изменения требуют перезапуска: %s", ", ".join(sorted(restart)))
+        return live, restart
+
+    async def run(self):
+        logger.debug("Слежу за %s", self.config_path)
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                stamp = self._file_stamp()
+                if stamp is None or stamp == self._stamp:
+                    continue
+                await self.reload()
+            except asyncio.CancelledError:
+                break
+            except ConfigParseError as e:
+                logger.error("❌ Конфиг не применён, остаются старые настройки: %s", e)
+            except Exception as e:
+                logger.error("💥 ConfigWatcher: %s", e)
@@ -0,0 +1,193 @@
+"""
+Замеры запуска: каждая фаза (авторизация, база, плагины, Telegram...) пишет в лог своё
+время, а в конце — сводку от старта процесса до готовности бота отвечать на /start.
+
+Режим профилирования (python main.py --profile-startup или STARVELL_PROFILE_STARTUP=1):
+ImportProfiler, как -X importtime, засекает выполнение каждого импортируемого модуля
+(собственное время и вместе с вложенными импортами), и при готовности бота в
+logs/startup_profile.txt пишется отчёт: фазы, инициализация плагинов, самые дорогие импорты.
+"""
+import importlib.abc
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger("StarVell.Startup")
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "STARVELL_PROFILE_STARTUP"
+PROFILE_REPORT = Path("logs") / "startup_profile.txt"
+REPORT_TOP = 40
+
+T = TypeVar("T")
+
+
+def profiling_requested() -> bool:
+    return PROFILE_FLAG in sys.argv or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+class _TimedLoader:
+    """Обёртка загрузчика: exec_module с замером, всё остальное — исходному загрузчику."""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler", name: str) -> None:
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name, time.perf_counter() - started)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Первый в sys.meta_path: находит модуль остальными искателями и подменяет загрузчик на замеряющий."""
+
+    def __init__(self) -> None:
+        self.cumulative: Dict[str, float] = {}
+        self.self_time: Dict[str, float] = {}
+        self._local = threading.local()  # импорты идут и из потоков — у каждого свой стек
+
+    def _stack(self) -> List[float]:
+        """Время вложенных импортов для каждого модуля, который сейчас выполняется в этом потоке."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def install(self) -> "ImportProfiler":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def _enter(self) -> None:
+        self._stack().append(0.0)
+
+    def _leave(self, name: str, elapsed: float) -> None:
+        stack = self._stack()
+        children = stack.pop()
+        self.cumulative[name] = elapsed
+        self.self_time[name] = max(elapsed - children, 0.0)
+        if stack:
+            stack[-1] += elapsed
+
+    def by_package(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for name, sec in self.self_time.items():
+            top = name.split(".", 1)[0]
+            totals[top] = totals.get(top, 0.0) + sec
+        return totals
+
+
+def _ranked(values: Dict[str, float], top: int) -> List[str]:
+    rows = sorted(values.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [f"  {sec * 1000:9.1f} мс  {name}" for name, sec in rows]
+
+
+class StartupTimings:
+    def __init__(self, started: Optional[float] = None, profiler: Optional[ImportProfiler] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.profiler = profiler
+        self.phases: Dict[str, float] = {}
+        self.plugin_init: Dict[str, float] = {}  # PluginManager.init_times
+        self.ready_at: Optional[float] = None
+
+    def since_start(self) -> float:
+        return time.perf_counter() - self.started
+
+    def _done(self, name: str, began: float, failed: bool = False) -> None:
+        elapsed = time.perf_counter() - began
+        self.phases[name] = elapsed
+        mark = "⚠️" if failed else "⏱"
+        logger.info(f"{mark} Запуск: {name} — {elapsed * 1000:.0f} мс (от старта {self.since_start():.2f} с)")
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        began = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self._done(name, began, failed)
+
+    async def measure(self, name: str, aw: Awaitable[T]) -> T:
+        """Дождаться корутины/задачи и записать её время как фазу name."""
+        began = time.perf_counter()
+        failed = True
+        try:
+            result = await aw
+            failed = False
+            return result
+        finally:
+            self._done(name, began, failed)
+
+    def summary(self) -> str:
+        total = self.ready_at if self.ready_at is not None else self.since_start()
+        parts = ", ".join(f"{name} {sec * 1000:.0f} мс" for name, sec in self.phases.items())
+        return f"{total:.2f} с ({parts})" if parts else f"{total:.2f} с"
+
+    def ready(self, what: str = "Telegram бот") -> None:
+        """Отметка готовности (один раз); в режиме профилирования — отчёт в PROFILE_REPORT."""
+        if self.ready_at is not None:
+            return
+        self.ready_at = self.since_start()
+        logger.info(f"✅ {what} готов за {self.summary()}")
+        self.save_profile()
+
+    def save_profile(self) -> None:
+        """Перезаписать отчёт (например, когда догрузились плагины). Без режима профилирования — ничего."""
+        if self.profiler is None:
+            return
+        try:
+            self.write_report(PROFILE_REPORT)
+            logger.info(f"📊 Профиль запуска: {PROFILE_REPORT}")
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось записать профиль запуска: {e}")
+
+    def write_report(self, path: Path) -> None:
+        lines = [f"Готовность: {self.ready_at or self.since_start():.3f} с от старта процесса", "",
+                 "Фазы (идут параллельно, сумма больше общего времени):"]
+        lines += _ranked(self.phases, len(self.phases))
+        if self.plugin_init:
+            lines += ["", "Инициализация плагинов (attach/register):"] + _ranked(self.plugin_init, REPORT_TOP)
+        profiler = self.profiler
+        if profiler is not None:
+            total = sum(profiler.self_time.values())
+            lines += ["", f"Импорт: {len(profiler.self_time)} модулей, {total * 1000:.0f} мс",
+                      "", "Пакеты (собственное время модулей):"] + _ranked(profiler.by_package(), REPORT_TOP)
+            lines += ["", "Модули, вместе с вложенными импортами:"] + _ranked(profiler.cumulative, REPORT_TOP)
+            lines += ["", "Модули, собственное время:"] + _ranked(profiler.self_time, REPORT_TOP)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -0,0 +1,13 @@
+"""
+Пути каталога обновлений. Отдельно от Utils.updater, чтобы main.py мог проверить журнал
+прерванной перестановки при старте, не импортируя updater (и aiohttp).
+"""
+import os
+
+UPDATE_DIR = "update"
+STAGING_DIR = os.path.join(UPDATE_DIR, "staging")
+BACKUP_DIR = os.path.join(UPDATE_DIR, "backup")
+TRASH_DIR = os.path.join(UPDATE_DIR, "rolled_back")
+JOURNAL_PATH = os.path.join(UPDATE_DIR, "swap.json")
+INSTALLED_MANIFEST = os.path.join(UPDATE_DIR, "manifest.json")
+HASH_CACHE_PATH = os.path.join(UPDATE_DIR, "hashes.json")
@@ -1,16 +1,133 @@
+"""
+Автообновление из релизов GitHub.
+
+Архив качается на диск кусками, с докачкой и проверкой sha256 (digest ассета или соседний
+<архив>.sha256), распаковывается в update/staging, и только потом верхние элементы дерева
+(файлы и каталоги) переставляются переименованием: текущие уезжают в update/backup, новые
+встают на их место. План перестановки записан в update/swap.json до первого переименования
+и удаляется последним шагом — если процесс упал посередине, recover_interrupted() при
+следующем запуске возвращает старую версию, смешанного дерева не остаётся. update/backup —
+предыдущая версия для мгновенного rollback().
+
+Если в релизе есть manifest.json (sha256 и размер каждого файла, см. build_manifest), качаются
+только файлы, чей хэш отличается от локального, и переставляются только они; удалённые из
+релиза файлы убираются. Хэши локальных файлов кэшируются по mtime и размеру. Полный архив —
+запасной путь, если манифеста нет или дельта не удалась.
+
+Манифест для релиза:  python -m Utils.updater manifest <каталог релиза> > manifest.json
+"""
 import aiohttp
 import asyncio
+import hashlib
 import logging
 import os
 import sys
 import zipfile
 import shutil
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import quote
+
+from Utils import json_codec
+from Utils.cardinal_tools import calculate_file_hash, load_hash_cache, save_hash_cache
+from Utils.update_paths import (
+    BACKUP_DIR, HASH_CACHE_PATH, INSTALLED_MANIFEST, JOURNAL_PATH, STAGING_DIR, TRASH_DIR, UPDATE_DIR,
+)
 
 logger = logging.getLogger("StarVell.updater")
 
 GITHUB_REPO = "abuzedr/StarvellNexusBot"
 GITHUB_API = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+RAW_FILES_URL = "https://raw.githubusercontent.com/{repo}/{tag}/"
+MANIFEST_ASSET = "manifest.json"
+
+BACKUP_INFO = "backup.json"
+BACKUP_MANIFEST = "installed_manifest.json"
+CHUNK_SIZE = 64 * 1024
+DELTA_CONCURRENCY = 8
+
+# не трогаются обновлением
+PROTECTED = {"configs", "storage", "logs", ".git", UPDATE_DIR}
+# каталоги, где у пользователя свои файлы (плагины, plugins/data): их файлы, которых нет в релизе, переносятся в новую версию
+KEEP_LOCAL = {"plugins"}
+
+
+def _managed(path: str) -> bool:
+    """Файл относится к релизу (а не к данным пользователя и не к кэшу Python)."""
+    parts = path.replace("\\", "/").split("/")
+    return parts[0] not in PROTECTED and "__pycache__" not in parts and not path.endswith(".pyc")
+
+
+def build_manifest(root: str, version: str = "") -> Dict[str, Any]:
+    """Манифест релиза: относительный путь → sha256 и размер."""
+    files: Dict[str, Dict[str, Any]] = {}
+    for dirpath, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(names):
+            full = os.path.join(dirpath, name)
+            rel = os.path.relpath(full, root).replace(os.sep, "/")
+            if _managed(rel):
+                files[rel] = {"sha256": calculate_file_hash(full, "sha256"), "size": os.path.getsize(full)}
+    return {"version": version, "files": files}
+
+
+def _carry_local(live_dir: str, staged_dir: str) -> int:
+    """Копирует в новую версию файлы из live_dir, которых в ней нет (кроме __pycache__)."""
+    copied = 0
+    for root, dirs, files in os.walk(live_dir):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        rel = os.path.relpath(root, live_dir)
+        for name in files:
+            target = os.path.normpath(os.path.join(staged_dir, rel, name))
+            if not os.path.lexists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(os.path.join(root, name), target)
+                copied += 1
+    return copied
+
+
+def _swap(source_dir: str, backup_dir: str, plan: List[Dict[str, Any]]) -> None:
+    """
+    Перестановка по плану: item → backup_dir/item, source_dir/item → item. Журнал пишется до
+    первого переименования и удаляется после последнего; при ошибке всё откатывается сразу.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    json_codec.dump_file(JOURNAL_PATH, {"source": source_dir, "backup": backup_dir, "plan": plan})
+    try:
+        for step in plan:
+            item = step["item"]
+            if step["had_live"]:
+                old = os.path.join(backup_dir, item)
+                os.makedirs(os.path.dirname(old), exist_ok=True)
+                os.replace(item, old)
+            if step["has_new"]:
+                if os.path.dirname(item):
+                    os.makedirs(os.path.dirname(item), exist_ok=True)
+                os.replace(os.path.join(source_dir, item), item)
+    except Exception:
+        _undo_swap()
+        raise
+    os.remove(JOURNAL_PATH)
+
+
+def _undo_swap() -> None:
+    """Возвращает всё, что успела переставить прерванная _swap (по журналу)."""
+    journal = json_codec.load_file(JOURNAL_PATH)
+    source_dir, backup_dir = journal["source"], journal["backup"]
+    for step in reversed(journal["plan"]):
+        item = step["item"]
+        staged, old = os.path.join(source_dir, item), os.path.join(backup_dir, item)
+        if step["has_new"] and not os.path.lexists(staged) and os.path.lexists(item):
+            os.replace(item, staged)
+        if step["had_live"] and os.path.lexists(old) and not os.path.lexists(item):
+            os.replace(old, item)
+    os.remove(JOURNAL_PATH)
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
 
 
 class Updater:
@@ -19,7 +136,13 @@ class Updater:
         self.github_token = github_token
         self.latest_version: Optional[str] = None
         self.download_url: Optional[str] = None
+        self.download_size: Optional[int] = None
+        self.download_sha256: Optional[str] = None
+        self.checksum_url: Optional[str] = None
+        self.manifest_url: Optional[str] = None
+        self.latest_tag: Optional[str] = None
         self.changelog: Optional[str] = None
+        self.bytes_downloaded = 0
     
     def _get_headers(self) -> Dict[str, str]:
         headers = {
@@ -46,12 +169,23 @@ class Updater:
                         return {"available": False, "error": f"HTTP {resp.status}"}
                     
                     data = await resp.json()
-                    self.latest_version = data.get("tag_name", "").lstrip("v")
+                    self.latest_tag = data.get("tag_name", "")
+                    self.latest_version = self.latest_tag.lstrip("v")
                     self.changelog = data.get("body", "")
                     
-                    for asset in data.get("assets", []):
+                    assets = data.get("assets", [])
+                    self.manifest_url = next((a.get("browser_download_url") for a in assets
+                                              if a.get("name") == MANIFEST_ASSET), None)
+                    for asset in assets:
                         if asset.get("name", "").endswith(".zip"):
                             self.download_url = asset.get("browser_download_url")
+                            self.download_size = asset.get("size")
+                            digest = asset.get("digest") or ""
+                            if digest.startswith("sha256:"):
+                                self.download_sha256 = digest.split(":", 1)[1].lower()
+                            companion = f"{asset['name']}.sha256"
+                            self.checksum_url = next((a.get("browser_download_url") for a in assets
+                                                      if a.get("name") == companion), None)
                             break
                     
                     if not self.download_url:
@@ -81,81 +215,264 @@ class Updater:
         except Exception:
             return False
     
+    async def _expected_sha256(self, session: aiohttp.ClientSession) -> Optional[str]:
+        if self.download_sha256:
+            return self.download_sha256
+        if not self.checksum_url:
+            return None
+        async with session.get(self.checksum_url, headers=self._get_headers(),
+                               timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            if resp.status != 200:
+                return None
+            text = (await resp.text()).split()
+            return text[0].lower() if text else None
+
+    async def _download(self, session: aiohttp.ClientSession, path: str) -> bool:
+        """Потоковая загрузка в path кусками CHUNK_SIZE; недокачанный path.part докачивается через Range."""
+        part = f"{path}.part"
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = self._get_headers()
+        if have:
+            headers["Range"] = f"bytes={have}-"
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+
+        async with session.get(self.download_url, headers=headers, timeout=timeout) as resp:
+            if resp.status == 416 and have:
+                pass  # уже скачан целиком, осталось проверить
+            elif resp.status in (200, 206):
+                mode = "ab" if resp.status == 206 else "wb"
+                if mode == "ab":
+                    logger.info(f"⏯ Докачиваю с {have // 1024} КБ")
+                with open(part, mode) as f:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        f.write(chunk)
+                        self.bytes_downloaded += len(chunk)
+            else:
+                logger.error(f"❌ Ошибка скачивания: HTTP {resp.status}")
+                return False
+
+        size = os.path.getsize(part)
+        if self.download_size and size != self.download_size:
+            logger.error(f"❌ Размер архива {size} ≠ {self.download_size}")
+            if size > self.download_size:
+                os.remove(part)
+            return False
+        expected = await self._expected_sha256(session)
+        if expected:
+            actual = await asyncio.to_thread(calculate_file_hash, part, "sha256")
+            if actual != expected:
+                logger.error("❌ Контрольная сумма архива не совпала — архив удалён")
+                os.remove(part)
+                return False
+        os.replace(part, path)
+        return True
+
+    def _stage(self, zip_path: str) -> str:
+        """Проверка CRC всех файлов и распаковка в STAGING_DIR; возвращает корень релиза."""
+        _remove(STAGING_DIR)
+        with zipfile.ZipFile(zip_path) as zf:
+            broken = zf.testzip()
+            if broken is not None:
+                raise ValueError(f"повреждён файл в архиве: {broken}")
+            zf.extractall(STAGING_DIR)
+        entries = os.listdir(STAGING_DIR)
+        if len(entries) == 1 and os.path.isdir(os.path.join(STAGING_DIR, entries[0])):
+            return os.path.join(STAGING_DIR, entries[0])  # zipball: всё в одном каталоге
+        if not entries:
+            raise ValueError("пустой архив")
+        return STAGING_DIR
+
+    def _install(self, source_dir: str) -> None:
+        """Полный релиз: переставляются верхние элементы дерева целиком."""
+        items = sorted(i for i in os.listdir(source_dir) if i not in PROTECTED)
+        for item in KEEP_LOCAL:
+            staged = os.path.join(source_dir, item)
+            if os.path.isdir(item) and os.path.isdir(staged):
+                _carry_local(item, staged)
+        self._install_plan(source_dir, [{"item": i, "had_live": os.path.lexists(i), "has_new": True} for i in items])
+
+    def _install_plan(self, source_dir: str, plan: List[Dict[str, Any]]) -> None:
+        # прошлая резервная копия заменяется текущей версией только после удачной перестановки
+        fresh_backup = f"{BACKUP_DIR}.new"
+        _remove(fresh_backup)
+        _swap(source_dir, fresh_backup, plan)
+        json_codec.dump_file(os.path.join(fresh_backup, BACKUP_INFO),
+                             {"version": self.current_version, "installed": self.latest_version, "plan": plan})
+        if os.path.exists(INSTALLED_MANIFEST):
+            shutil.copy2(INSTALLED_MANIFEST, os.path.join(fresh_backup, BACKUP_MANIFEST))
+        _remove(BACKUP_DIR)
+        os.replace(fresh_backup, BACKUP_DIR)
+
+    # ------------------------------------------------------------------
+    # Дельта по манифесту
+    # ------------------------------------------------------------------
+
+    async def _fetch_manifest(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        async with session.get(self.manifest_url, headers=self._get_headers(),
+                               timeout=aiohttp.ClientTimeout(total=60)) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"манифест: HTTP {resp.status}")
+            return json_codec.loads(await resp.read())
+
+    @staticmethod
+    def _changed_files(files: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Файлы манифеста, которых нет локально или чей sha256 другой (размер сверяется первым)."""
+        changed = []
+        for path, meta in files.items():
+            if not _managed(path):
+                continue
+            try:
+                if os.path.getsize(path) == meta["size"] and calculate_file_hash(path, "sha256") == meta["sha256"]:
+                    continue
+            except OSError:
+                pass
+            changed.append(path)
+        return changed
+
+    async def _fetch_file(self, session: aiohttp.ClientSession, base_url: str, path: str,
+                          meta: Dict[str, Any], slots: asyncio.Semaphore) -> None:
+        target = os.path.join(STAGING_DIR, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        h = hashlib.sha256()
+        async with slots:
+            async with session.get(base_url + quote(path), headers=self._get_headers(),
+                                   timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as resp:
+                if resp.status != 200:
+                    raise RuntimeError(f"{path}: HTTP {resp.status}")
+                with open(target, "wb") as f:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        f.write(chunk)
+                        h.update(chunk)
+                        self.bytes_downloaded += len(chunk)
+        if h.hexdigest() != meta["sha256"]:
+            raise RuntimeError(f"{path}: контрольная сумма не совпала")
+
+    async def _delta_update(self, session: aiohttp.ClientSession) -> Tuple[int, int]:
+        """Скачивает и ставит только изменённые файлы. Возвращает (изменено, удалено)."""
+        manifest = await self._fetch_manifest(session)
+        files = manifest["files"]
+        base_url = manifest.get("files_url") or RAW_FILES_URL.format(repo=GITHUB_REPO, tag=self.latest_tag)
+
+        load_hash_cache(HASH_CACHE_PATH)
+        changed = await asyncio.to_thread(self._changed_files, files)
+        try:
+            previous = json_codec.load_file(INSTALLED_MANIFEST).get("files", {})
+        except (OSError, ValueError):
+            previous = {}  # без прежнего манифеста лишние файлы не удаляются
+        removed = [p for p in previous if p not in files and _managed(p) and os.path.isfile(p)]
+
+        _remove(STAGING_DIR)
+        slots = asyncio.Semaphore(DELTA_CONCURRENCY)
+        await asyncio.gather(*(self._fetch_file(session, base_url, p, files[p], slots) for p in changed))
+
+        plan = [{"item": p, "had_live": os.path.lexists(p), "has_new": True} for p in changed]
+        plan += [{"item": p, "had_live": True, "has_new": False} for p in removed]
+        if plan:
+            await asyncio.to_thread(self._install_plan, STAGING_DIR, plan)
+        json_codec.dump_file(INSTALLED_MANIFEST, manifest)
+        save_hash_cache(HASH_CACHE_PATH)
+        return len(changed), len(removed)
+
     async def auto_update(self) -> bool:
         if not self.download_url or not self.latest_version:
             logger.error("❌ Нет URL для скачивания")
             return False
-        
+
+        os.makedirs(UPDATE_DIR, exist_ok=True)
+        self.bytes_downloaded = 0
+        if self.manifest_url:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    changed, removed = await self._delta_update(session)
+                logger.info(f"✅ Обновление до v{self.latest_version} установлено: изменено файлов {changed}, "
+                            f"удалено {removed}, скачано {self.bytes_downloaded // 1024} КБ")
+                return True
+            except Exception as e:
+                logger.warning(f"⚠️ Дельта-обновление не удалось ({e}) — качаю архив целиком")
+            finally:
+                _remove(STAGING_DIR)
+
+        zip_path = os.path.join(UPDATE_DIR, f"v{self.latest_version}.zip")
         try:
             logger.info(f"📥 Скачиваю обновление v{self.latest_version}...")
-            
-            temp_zip = "update_temp.zip"
-            temp_dir = "update_temp"
-            
             async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.download_url, 
-                    headers=self._get_headers(),
-                    timeout=aiohttp.ClientTimeout(total=120)
-                ) as resp:
-                    if resp.status != 200:
-                        logger.error(f"❌ Ошибка скачивания: HTTP {resp.status}")
-                        return False
-                    
-                    content = await resp.read()
-                    
-                    with open(temp_zip, "wb") as f:
-                        f.write(content)
-            
+                if not await self._download(session, zip_path):
+                    return False
+                manifest = None
+                if self.manifest_url:
+                    try:
+                        manifest = await self._fetch_manifest(session)
+                    except Exception as e:
+                        logger.debug(f"manifest: {e}")
+
             logger.info("📦 Распаковываю...")
-            
-            with zipfile.ZipFile(temp_zip, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
-            
-            extracted_dirs = [d for d in os.listdir(temp_dir) if os.path.isdir(os.path.join(temp_dir, d))]
-            if not extracted_dirs:
-                logger.error("❌ Пустой архив")
-                return False
-            
-            source_dir = os.path.join(temp_dir, extracted_dirs[0])
-            
-            PROTECTED = {"configs", "storage", "logs", "plugins/data", ".git"}
-            
+            source_dir = await asyncio.to_thread(self._stage, zip_path)
+
             logger.info("🔄 Обновляю файлы...")
-            
-            for item in os.listdir(source_dir):
-                if item in PROTECTED:
-                    continue
-                    
-                src = os.path.join(source_dir, item)
-                dst = item
-                
-                try:
-                    if os.path.isdir(src):
-                        if os.path.exists(dst):
-                            shutil.rmtree(dst, ignore_errors=True)
-                        shutil.copytree(src, dst, dirs_exist_ok=True)
-                    else:
-                        shutil.copy2(src, dst)
-                except Exception as e:
-                    logger.warning(f"⚠️ Не удалось обновить {item}: {e}")
-            
-            os.remove(temp_zip)
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            
-            logger.info(f"✅ Обновление до v{self.latest_version} установлено!")
-            return True
-            
+            await asyncio.to_thread(self._install, source_dir)
+            if manifest is not None:
+                json_codec.dump_file(INSTALLED_MANIFEST, manifest)
         except Exception as e:
             logger.error(f"❌ Ошибка автообновления: {e}")
-            if os.path.exists("update_temp.zip"):
-                os.remove("update_temp.zip")
-            if os.path.exists("update_temp"):
-                shutil.rmtree("update_temp", ignore_errors=True)
             return False
-    
+        finally:
+            _remove(STAGING_DIR)
+
+        os.remove(zip_path)
+        logger.info(f"✅ Обновление до v{self.latest_version} установлено (v{self.current_version} — в {BACKUP_DIR})")
+        return True
+
+    @staticmethod
+    def backup_version() -> Optional[str]:
+        """Версия в update/backup, на которую можно откатиться, или None."""
+        try:
+            return json_codec.load_file(os.path.join(BACKUP_DIR, BACKUP_INFO)).get("version")
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def rollback() -> bool:
+        """Возвращает предыдущую версию из update/backup (нужен перезапуск). Текущая уходит в update/rolled_back."""
+        try:
+            info = json_codec.load_file(os.path.join(BACKUP_DIR, BACKUP_INFO))
+        except (OSError, ValueError):
+            logger.error("❌ Нет резервной копии для отката")
+            return False
+        plan = [{"item": step["item"], "had_live": os.path.lexists(step["item"]), "has_new": step["had_live"]}
+                for step in info["plan"]]
+        try:
+            _remove(TRASH_DIR)
+            _swap(BACKUP_DIR, TRASH_DIR, plan)
+        except Exception as e:
+            logger.error(f"❌ Откат не удался, текущая версия не тронута: {e}")
+            return False
+        old_manifest = os.path.join(BACKUP_DIR, BACKUP_MANIFEST)
+        if os.path.exists(old_manifest):
+            os.replace(old_manifest, INSTALLED_MANIFEST)
+        else:
+            _remove(INSTALLED_MANIFEST)
+        _remove(BACKUP_DIR)
+        logger.info(f"⏪ Откат на v{info.get('version')} выполнен (файлы v{info.get('installed')} — в {TRASH_DIR})")
+        return True
+
+    @staticmethod
+    def recover_interrupted() -> bool:
+        """При запуске: если обновление прервалось посреди перестановки — вернуть старую версию."""
+        if not os.path.exists(JOURNAL_PATH):
+            return False
+        logger.warning("⚠️ Прошлое обновление прервано — возвращаю предыдущую версию")
+        _undo_swap()
+        _remove(STAGING_DIR)
+        return True
+
     @staticmethod
     def restart_bot():
         logger.info("🔄 Перезапуск бота...")
         python = sys.executable
         os.execl(python, python, *sys.argv)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "manifest":
+        sys.exit("python -m Utils.updater manifest <каталог релиза> [версия]")
+    sys.stdout.write(json_codec.dumps(build_manifest(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else "")))
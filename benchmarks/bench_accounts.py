@@ -0,0 +1,73 @@
+"""
+HTTP-пул при нескольких аккаунтах: отдельный TCPConnector на каждый StarVellClient (как было)
+против общего shared_connector(). Локальный aiohttp-сервер, каждый аккаунт шлёт пачки запросов
+с паузами, как Runner; считаются TCP-соединения, открытые сервером, и пик памяти (tracemalloc).
+
+Запуск из корня проекта:  python -m benchmarks.bench_accounts
+"""
+import asyncio
+import logging
+import tracemalloc
+
+import aiohttp
+from aiohttp import web
+
+from core import starvell_client
+from core.starvell_client import StarVellClient
+
+PORT = 8771
+ROUNDS = 5
+BURST = 8
+
+
+class CountingServer:
+    def __init__(self) -> None:
+        self.connections = set()
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+
+    async def handle(self, request):
+        self.connections.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"items": []})
+
+
+async def run(server: CountingServer, accounts: int, shared: bool) -> str:
+    server.connections.clear()
+    starvell_client.BASE_URL = f"http://127.0.0.1:{PORT}"
+    clients = [StarVellClient(f"session-{i}", rate=1000, burst=1000) for i in range(accounts)]
+    if not shared:
+        for client in clients:
+            client._session = aiohttp.ClientSession(
+                base_url=starvell_client.BASE_URL,
+                connector=aiohttp.TCPConnector(limit=client.max_connections, ttl_dns_cache=300),
+                cookies={"session": client.session_id},
+            )
+
+    tracemalloc.start()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(client.request("POST", "/api/offers/list-my", json={})
+                               for client in clients for _ in range(BURST)))
+        await asyncio.sleep(0.05)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await starvell_client.close_all()
+    for client in clients:
+        await client.close()
+    return f"{len(server.connections):4d} соединений  пик {peak / 1024:8.0f} КБ"
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    server = CountingServer()
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", PORT).start()
+    print(f"{ROUNDS} пачек по {BURST} запросов на аккаунт")
+    for accounts in (1, 3, 10):
+        print(f"{accounts:2d} акк., свой пул: {await run(server, accounts, shared=False)}")
+        print(f"{accounts:2d} акк., общий:    {await run(server, accounts, shared=True)}")
+    await server.runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Каталог: разбор JSON + компиляция (холодный старт) против чтения снимка (тёплый старт),
+и навигация по сделанным заранее индексам.
+
+Запуск из корня проекта:  python -m benchmarks.bench_catalog
+"""
+import tempfile
+import timeit
+
+from plugins.utils.catalog import Catalog, CATALOG_JSON_PATH
+
+REPEAT = 20
+
+
+def _best(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def bench_startup():
+    snapshot_dir = tempfile.mkdtemp()
+    Catalog(CATALOG_JSON_PATH, snapshot_dir)  # создаём снимок
+
+    def cold():
+        Catalog(CATALOG_JSON_PATH, snapshot_dir=None)
+
+    def warm():
+        Catalog(CATALOG_JSON_PATH, snapshot_dir)
+
+    return _best(cold, REPEAT), _best(warm, REPEAT)
+
+
+def bench_navigation():
+    catalog = Catalog(CATALOG_JSON_PATH, tempfile.mkdtemp())
+
+    def walk():
+        for game_slug, _ in catalog.list_games():
+            for cat_slug, _, _ in catalog.list_categories(game_slug):
+                for _, _, sub_id in catalog.list_subcategories(game_slug, cat_slug):
+                    catalog.get_subcategory_details(game_slug, cat_slug, sub_id)
+
+    return _best(walk, REPEAT * 10)
+
+
+def main():
+    cold, warm = bench_startup()
+    print(f"{'':<28}{'ms':>10}")
+    print(f"{'cold start (json+compile)':<28}{cold:>10.3f}")
+    print(f"{'warm start (snapshot)':<28}{warm:>10.3f}")
+    print(f"{'full catalog walk':<28}{bench_navigation():>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Память, занимаемая каталогом: как было (полный dict из JSON + литерал SUB_CATEGORY_MAP)
+и как стало (компактные записи из снимка). Меряется через tracemalloc.
+
+Запуск из корня проекта:  python -m benchmarks.bench_catalog_memory
+"""
+import gc
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from Utils import json_codec
+from plugins.utils.catalog import Catalog, CATALOG_JSON_PATH
+
+SUBCATEGORIES_PATH = "plugins/utils/starvell_config_subcategories.py"
+
+
+def _measure(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    keep = fn()
+    gc.collect()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return current
+
+
+def _old_sub_category_map_source() -> str:
+    """Версия модуля с литералом — родитель коммита, который его убрал."""
+    try:
+        removed_in = subprocess.check_output(
+            ["git", "log", "-1", "--format=%H", "-S", "SUB_CATEGORY_MAP = {", "--", SUBCATEGORIES_PATH],
+            text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+        if not removed_in:
+            return ""
+        return subprocess.check_output(
+            ["git", "show", f"{removed_in}~1:{SUBCATEGORIES_PATH}"],
+            text=True, stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    old_source = _old_sub_category_map_source()
+
+    def before():
+        data = json_codec.load_file(CATALOG_JSON_PATH)["all_categories_detailed"]
+        namespace = {}
+        if old_source:
+            exec(compile(old_source, "starvell_config_subcategories.py", "exec"), namespace)
+        return data, namespace
+
+    snapshot_dir = tempfile.mkdtemp()
+    Catalog(CATALOG_JSON_PATH, snapshot_dir)  # создаём снимок
+
+    def after():
+        catalog = Catalog(CATALOG_JSON_PATH, snapshot_dir)
+        return catalog, catalog.sub_category_map()
+
+    old = _measure(before)
+    new = _measure(after)
+    note = "" if old_source else "  (литерал SUB_CATEGORY_MAP не найден в git, учтён только JSON)"
+    print(f"before: {old / 1024:>8.0f} KiB{note}")
+    print(f"after:  {new / 1024:>8.0f} KiB")
+    print(f"x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Обновление каталога против локальной заглушки API: игры и категории отдаются из
+complete_categories_map.json, у одной игры меняется категория, добавляется новая игра.
+
+1-й проход — без валидаторов (всё 200), 2-й — всё 304, 3-й — после изменения одной игры.
+Всё пишется во временный каталог, общий каталог процесса подменяется как в боте.
+
+Запуск из корня проекта:  python -m benchmarks.bench_catalog_refresh
+"""
+import asyncio
+import copy
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from Utils import json_codec
+from plugins.utils.catalog import CATALOG_JSON_PATH, Catalog, get_catalog, set_catalog
+from plugins.utils.catalog_refresh import CatalogRefresher
+
+
+def build_api(raw: dict):
+    games = copy.deepcopy(raw)
+    some_game = next(iter(games))
+    some_cat = next(iter(games[some_game]))
+    games[some_game][some_cat]["name"] += " (обновлено)"
+    games["new-game"] = {"coins": {"id": 999_001, "name": "Монеты", "slug": "coins", "position": 1,
+                                   "isActive": True, "gameId": 999, "filters": [], "subCategories": []}}
+    return games, some_game
+
+
+async def start_server(games: dict):
+    def etag(obj) -> str:
+        return '"' + hashlib.md5(json_codec.dumpb(obj)).hexdigest() + '"'
+
+    def respond(request: web.Request, obj):
+        tag = etag(obj)
+        if request.headers.get("If-None-Match") == tag:
+            return web.Response(status=304, headers={"ETag": tag})
+        return web.Response(body=json_codec.dumpb(obj), content_type="application/json", headers={"ETag": tag})
+
+    async def game_list(request):
+        return respond(request, [{"slug": slug} for slug in games])
+
+    async def game_categories(request):
+        slug = request.match_info["slug"]
+        if slug not in games:
+            return web.Response(status=404)
+        return respond(request, list(games[slug].values()))
+
+    app = web.Application()
+    app.router.add_get("/api/games", game_list)
+    app.router.add_get("/api/games/{slug}/categories", game_categories)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+async def main():
+    tmp = Path(tempfile.mkdtemp())
+    set_catalog(Catalog(CATALOG_JSON_PATH, snapshot_dir=None))
+    raw = json_codec.load_file(CATALOG_JSON_PATH)["all_categories_detailed"]
+    games, changed_game = build_api(raw)
+    runner, base_url = await start_server(games)
+
+    refresher = CatalogRefresher(base_url=base_url, target_path=tmp / "catalog.json",
+                                 validators_path=tmp / "validators.json", snapshot_dir=tmp)
+    old_catalog = get_catalog()
+    try:
+        for label in ("cold", "304", "one game"):
+            if label == "one game":
+                next(iter(games[changed_game].values()))["position"] += 1
+            started = time.perf_counter()
+            result = await refresher.refresh()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{label:>8}: {elapsed:7.1f} мс, проверено {result.games_checked}, 304: {result.games_not_modified}, "
+                  f"+{result.added} ~{result.changed} -{result.removed}, подмена: {result.swapped}")
+    finally:
+        await runner.cleanup()
+
+    catalog = get_catalog()
+    print(f"старый экземпляр жив: игр {len(old_catalog.list_games())}; "
+          f"новый: игр {len(catalog.list_games())}, new-game: {catalog.get_category('new-game', 'coins') is not None}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
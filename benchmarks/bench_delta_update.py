@@ -0,0 +1,120 @@
+"""
+Полное обновление архивом против дельты по манифесту на копии этого дерева.
+
+Локальный aiohttp-сервер изображает релиз GitHub: архив, manifest.json и файлы по одному.
+Патч-релиз меняет два модуля. Сравниваются отданные сервером байты и время auto_update():
+целиком, дельта с холодным кэшем хэшей и дельта со следующим патчем (кэш уже прогрет).
+
+Запуск из корня проекта:  python -m benchmarks.bench_delta_update
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from aiohttp import web
+
+from Utils import json_codec
+from Utils.updater import Updater, build_manifest
+
+ROOT = Path(__file__).resolve().parent.parent
+PORT = 8769
+BASE = f"http://127.0.0.1:{PORT}"
+SKIP = shutil.ignore_patterns(".git", "__pycache__", "*.pyc", "update", "storage", "logs", "configs")
+PATCHES = {"2": ["nexus.py", "core/event_bus.py"], "3": ["main.py", "Utils/settings.py"]}
+
+
+def make_release(base: Path, out: Path, version: str) -> None:
+    """Копия base с правкой двух модулей + архив + манифест."""
+    tree = out / f"StarvellNexusBot-{version}"
+    shutil.copytree(base, tree, ignore=SKIP)
+    for rel in PATCHES[version]:
+        with open(tree / rel, "a", encoding="utf-8") as f:
+            f.write(f"\n# release {version}\n")
+    with zipfile.ZipFile(out / "release.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        for path in sorted(tree.rglob("*")):
+            if path.is_file():
+                zf.write(path, path.relative_to(out).as_posix())
+    manifest = build_manifest(str(tree), version)
+    manifest["files_url"] = f"{BASE}/files/"
+    (out / "manifest.json").write_bytes(json_codec.dumpb(manifest))
+
+
+class ReleaseServer:
+    def __init__(self) -> None:
+        self.root: Path = Path()
+        self.sent = 0
+        app = web.Application()
+        app.router.add_get("/release.zip", self.file("release.zip"))
+        app.router.add_get("/manifest.json", self.file("manifest.json"))
+        app.router.add_get("/files/{path:.+}", self.release_file)
+        self.runner = web.AppRunner(app)
+
+    def file(self, name: str):
+        async def handler(_request):
+            return self.send((self.root / name).read_bytes())
+        return handler
+
+    async def release_file(self, request):
+        tree = next(self.root.glob("StarvellNexusBot-*"))
+        return self.send((tree / request.match_info["path"]).read_bytes())
+
+    def send(self, data: bytes) -> web.Response:
+        self.sent += len(data)
+        return web.Response(body=data)
+
+
+async def run(server: ReleaseServer, release: Path, install: Path, version: str, delta: bool) -> str:
+    server.root, server.sent = release, 0
+    os.chdir(install)
+    updater = Updater(str(int(version) - 1))
+    updater.latest_version = version
+    updater.download_url = f"{BASE}/release.zip"
+    data = (release / "release.zip").read_bytes()
+    updater.download_size, updater.download_sha256 = len(data), hashlib.sha256(data).hexdigest()
+    updater.manifest_url = f"{BASE}/manifest.json" if delta else None
+
+    started = time.perf_counter()
+    assert await updater.auto_update()
+    elapsed = time.perf_counter() - started
+    for rel in PATCHES[version]:
+        assert f"# release {version}" in (install / rel).read_text(encoding="utf-8"), rel
+    return f"{server.sent / 1024:9.1f} КБ  {elapsed * 1000:8.1f} мс"
+
+
+async def main() -> None:
+    logging.disable(logging.CRITICAL)
+    server = ReleaseServer()
+    await server.runner.setup()
+    await web.TCPSite(server.runner, "127.0.0.1", PORT).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base = tmp / "base"
+        shutil.copytree(ROOT, base, ignore=SKIP)
+        rel2, rel3 = tmp / "r2", tmp / "r3"
+        rel2.mkdir()
+        rel3.mkdir()
+        make_release(base, rel2, "2")
+        make_release(rel2 / "StarvellNexusBot-2", rel3, "3")
+        files = sum(1 for p in (rel2 / "StarvellNexusBot-2").rglob("*") if p.is_file())
+        print(f"дерево: {files} файлов, архив {(rel2 / 'release.zip').stat().st_size / 1024:.0f} КБ, "
+              f"в патче меняются 2 модуля")
+
+        full, inc = tmp / "full", tmp / "delta"
+        shutil.copytree(base, full)
+        shutil.copytree(base, inc)
+        print(f"архив целиком       {await run(server, rel2, full, '2', delta=False)}")
+        # первый раз без прежнего манифеста: хэшируется всё дерево
+        print(f"дельта, кэш холодный {await run(server, rel2, inc, '2', delta=True)}")
+        print(f"дельта, кэш тёплый   {await run(server, rel3, inc, '3', delta=True)}")
+        os.chdir(ROOT)
+    await server.runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
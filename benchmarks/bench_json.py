@@ -0,0 +1,57 @@
+"""
+Сравнение стандартного json (как было) и Utils.json_codec на горячих путях:
+загрузка каталога complete_categories_map.json и сброс storage/read_cache.json.
+
+Запуск из корня проекта:  python -m benchmarks.bench_json
+"""
+import json
+import os
+import tempfile
+import timeit
+
+from Utils import json_codec
+
+CATALOG_PATH = os.path.join("plugins", "utils", "complete_categories_map.json")
+REPEAT = 20
+
+
+def _best(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def bench_catalog_load():
+    def stdlib():
+        with open(CATALOG_PATH, "r", encoding="utf-8") as f:
+            json.load(f)
+
+    def codec():
+        json_codec.load_file(CATALOG_PATH)
+
+    return _best(stdlib, REPEAT), _best(codec, REPEAT)
+
+
+def bench_read_store_flush():
+    keys = [f"019906df-7144-ed0c-f1ab-f5d3f2e191c6:{i:08d}" for i in range(1000)]
+    path = os.path.join(tempfile.mkdtemp(), "read_cache.json")
+
+    def stdlib():
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(keys, f, ensure_ascii=False, indent=2)
+
+    def codec():
+        json_codec.dump_file(path, keys)
+
+    return _best(stdlib, REPEAT * 10), _best(codec, REPEAT * 10)
+
+
+def main():
+    print(f"backend: {json_codec.BACKEND}")
+    print(f"{'':<24}{'json, ms':>12}{'codec, ms':>12}{'x':>8}")
+    for name, fn in (("catalog load (1 MB)", bench_catalog_load),
+                     ("read store flush", bench_read_store_flush)):
+        before, after = fn()
+        print(f"{name:<24}{before:>12.3f}{after:>12.3f}{before / after:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
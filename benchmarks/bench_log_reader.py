@@ -0,0 +1,73 @@
+"""
+/logs на большом логе: чтение файлов целиком против log_reader (с конца блоками, .gz потоком).
+
+Лог — bot.log на 50 МБ и два сжатых архива ротации. Хвост 200 строк и поиск редкой строки,
+которая есть только в самом старом архиве; сравниваются время и пик памяти (tracemalloc).
+
+Запуск из корня проекта:  python -m benchmarks.bench_log_reader
+"""
+import gzip
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+from Utils import log_reader
+
+LINE = "2026-01-01 12:00:00 [INFO] StarVell.Runner: 📦 Заказ #{i} обработан, payload " + "x" * 80 + "\n"
+CURRENT_MB = 50
+ARCHIVE_LINES = 200_000
+
+
+def make_logs(base: str) -> None:
+    with open(base, "w", encoding="utf-8") as f:
+        i = 0
+        while f.tell() < CURRENT_MB * 1024 * 1024:
+            f.write(LINE.format(i=i))
+            i += 1
+    for n in (1, 2):
+        with gzip.open(f"{base}.{n}.gz", "wt", encoding="utf-8") as f:
+            for i in range(ARCHIVE_LINES):
+                f.write("NEEDLE в архиве\n" if n == 2 and i == 1000 else LINE.format(i=i))
+
+
+def naive_tail(base: str, n: int) -> list:
+    with open(base, encoding="utf-8") as f:
+        return f.readlines()[-n:]
+
+
+def naive_search(base: str, pattern: str) -> list:
+    regex = re.compile(pattern, re.IGNORECASE)
+    found = []
+    for path in log_reader.log_files(base):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            found += [line for line in f.read().splitlines() if regex.search(line)]
+    return found
+
+
+def measure(fn, *args) -> str:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    lines = result.lines if isinstance(result, log_reader.LogScan) else result
+    return f"{elapsed * 1000:8.1f} мс  пик {peak / 1024 / 1024:7.1f} МБ  строк {len(lines)}"
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "bot.log")
+        make_logs(base)
+        print(f"bot.log {CURRENT_MB} МБ + 2 архива .gz по {ARCHIVE_LINES} строк")
+        print(f"хвост 200, целиком:   {measure(naive_tail, base, 200)}")
+        print(f"хвост 200, с конца:   {measure(log_reader.tail, 200, 30.0, base)}")
+        print(f"поиск, целиком:       {measure(naive_search, base, 'needle')}")
+        print(f"поиск, log_reader:    {measure(log_reader.search, 'needle', 100, 30.0, base)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Сколько logger.info стоит вызывающему коду (циклу событий): обработчики из
+get_logger_config напрямую против очереди install_queue_logging(). Каждая запись —
+с полезной нагрузкой в несколько КБ, как дамп payload в CreateLotPro, файл ротируется.
+
+Запуск из корня проекта:  python -m benchmarks.bench_logging
+"""
+import logging
+import logging.config
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import Utils.logger as log_setup
+
+RECORDS = 3000
+PAYLOAD = "x" * 4096
+
+
+def run(label: str, queued: bool) -> str:
+    logging.config.dictConfig(log_setup.get_logger_config("INFO"))
+    if queued:
+        log_setup.install_queue_logging()
+    for handler in log_setup._real_handlers():
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            handler.maxBytes = 1024 * 1024
+    logger = logging.getLogger("StarVell.bench")
+
+    samples = []
+    for i in range(RECORDS):
+        started = time.perf_counter()
+        logger.info("payload %d: %s", i, PAYLOAD)
+        samples.append(time.perf_counter() - started)
+    log_setup.stop_queue_logging()
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99)]
+    return (f"{label:>8}: среднее {statistics.mean(samples) * 1e6:7.1f} мкс, "
+            f"p99 {p99 * 1e6:7.1f} мкс, максимум {samples[-1] * 1e3:6.2f} мс")
+
+
+def main() -> None:
+    print(f"{RECORDS} записей по {len(PAYLOAD) // 1024} КБ, ротация каждый 1 МБ")
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        os.chdir(tmp)
+        for label, queued in (("напрямую", False), ("очередь", True)):
+            sys.stdout = devnull  # консольный обработчик (ext://sys.stdout) пишет в никуда
+            try:
+                result = run(label, queued)
+            finally:
+                sys.stdout = sys.__stdout__
+            print(result)
+
+
+if __name__ == "__main__":
+    main()
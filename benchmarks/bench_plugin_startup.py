@@ -0,0 +1,112 @@
+"""
+Старт PluginManager: N синтетических плагинов, импорт каждого стоит IMPORT_COST секунд
+(как requests + каталог у create_lot_pro). Сравниваются load_plugins() без манифеста
+(всё импортируется сразу) и с MANIFEST lazy=True, плюс задержка первого вызова команды.
+
+Запуск из корня проекта:  python -m benchmarks.bench_plugin_startup
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from core.plugin_manager import PluginManager
+
+PLUGINS = 20
+IMPORT_COST = 0.05
+
+TEMPLATE = '''
+import time
+from aiogram import Router
+from aiogram.filters import Command
+{manifest}
+time.sleep({cost})
+handled = []
+
+
+class P:
+    def __init__(self):
+        self.name = "{name}"
+        self.enabled = True
+        self.router = Router(name="{name}")
+        self.router.message(Command("{name}"))(self.handle)
+
+    async def handle(self, message):
+        handled.append(message.text)
+
+
+def attach(dp=None, bot=None, context=None):
+    plugin = P()
+    dp.include_router(plugin.router)
+    context["nexus"].plugin_manager.plugins["{name}"] = plugin
+'''
+
+
+def write_plugins(root: Path, package: str, lazy: bool) -> None:
+    pkg = root / package
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    for i in range(PLUGINS):
+        name = f"p{i}"
+        manifest = f'MANIFEST = {{"lazy": True, "commands": ["{name}"]}}' if lazy else ""
+        (pkg / f"{name}.py").write_text(TEMPLATE.format(manifest=manifest, cost=IMPORT_COST, name=name))
+
+
+def command_update(bot: Bot, update_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": text,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "a"},
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }, context={"bot": bot})
+
+
+async def run(package: str) -> None:
+    dp, bot = Dispatcher(), Bot("123:abc")
+    nexus = types.SimpleNamespace(plugins={})
+    pm = PluginManager({"nexus": nexus, "dispatcher": dp, "bot": bot}, plugins_dir=package)
+    nexus.plugin_manager = pm
+
+    started = time.perf_counter()
+    pm.load_plugins()
+    ready = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await dp.feed_update(bot, command_update(bot, 1, "/p0"))
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    await dp.feed_update(bot, command_update(bot, 2, "/p0"))
+    second = time.perf_counter() - started
+
+    handled = sys.modules[f"{package}.p0"].handled
+    assert handled == ["/p0", "/p0"], handled
+    print(f"{package:>6}: load_plugins {ready * 1000:7.1f} мс, "
+          f"первый /p0 {first * 1000:6.1f} мс, повторный {second * 1000:5.2f} мс")
+    await bot.session.close()
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_plugins(root, "eager", lazy=False)
+        write_plugins(root, "lazy", lazy=True)
+        sys.path.insert(0, tmp)
+        os.chdir(tmp)  # PluginManager ищет plugins_dir относительно текущего каталога
+        print(f"{PLUGINS} плагинов, импорт каждого {IMPORT_COST * 1000:.0f} мс")
+        asyncio.run(run("eager"))
+        asyncio.run(run("lazy"))
+
+
+if __name__ == "__main__":
+    main()
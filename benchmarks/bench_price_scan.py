@@ -0,0 +1,87 @@
+"""
+Сканер цен конкурентов против локального сервера с HTML-фикстурами: 100 страниц категорий
+по ~200 лотов в __NEXT_DATA__ (как у Next.js), ETag у каждой страницы.
+
+Первый проход — полная загрузка и разбор, второй — только 304 по ETag.
+
+Запуск из корня проекта:  python -m benchmarks.bench_price_scan
+"""
+import asyncio
+import hashlib
+import random
+import time
+
+from aiohttp import web
+
+from Utils import json_codec
+from core.price_scanner import PriceScanner, RepriceRule, plan_reprice
+
+CATEGORIES = 100
+OFFERS_PER_PAGE = 200
+LATENCY = 0.05  # имитация сети на каждый ответ
+MY_USER_ID = 1
+
+
+def make_page(category_id: int) -> bytes:
+    rnd = random.Random(category_id)
+    offers = [{
+        "id": category_id * 1000 + i,
+        "price": round(rnd.uniform(50, 500), 2),
+        "subCategoryId": category_id * 10 + rnd.randint(0, 3),
+        "isActive": True,
+        "user": {"id": MY_USER_ID if i % 50 == 0 else rnd.randint(2, 10_000), "username": f"seller{i}"},
+        "descriptions": {"rus": {"briefDescription": f"Лот {i}", "description": "x" * 200}},
+    } for i in range(OFFERS_PER_PAGE)]
+    data = {"props": {"pageProps": {"category": {"id": category_id}, "offers": offers}}}
+    head = "<html><head><title>StarVell</title></head><body>" + "<div class='card'>…</div>" * 300
+    return (head + f'<script id="__NEXT_DATA__" type="application/json">{json_codec.dumps(data)}</script>'
+            + "<footer>" + "<p>footer</p>" * 2000 + "</footer></body></html>").encode()
+
+
+async def start_server():
+    pages = {c: make_page(c) for c in range(1, CATEGORIES + 1)}
+    etags = {c: '"' + hashlib.md5(body).hexdigest() + '"' for c, body in pages.items()}
+
+    async def handler(request: web.Request):
+        category_id = int(request.match_info["cat"])
+        await asyncio.sleep(LATENCY)
+        if request.headers.get("If-None-Match") == etags[category_id]:
+            return web.Response(status=304, headers={"ETag": etags[category_id]})
+        return web.Response(body=pages[category_id], content_type="text/html", headers={"ETag": etags[category_id]})
+
+    app = web.Application()
+    app.router.add_get("/game/{cat}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", sum(map(len, pages.values()))
+
+
+async def main():
+    runner, base_url, size = await start_server()
+    # лимит частоты снят, чтобы мерить сам сканер; с боевым RATE=20 проход упирается в ~5 с
+    scanner = PriceScanner(base_url=base_url, rate=1000)
+    scanner.exclude_sellers = {str(MY_USER_ID)}
+    targets = {c: f"/game/{c}" for c in range(1, CATEGORIES + 1)}
+    try:
+        for label in ("cold", "etag"):
+            started = time.perf_counter()
+            errors = await scanner.scan(targets)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>5}: {CATEGORIES} категорий за {elapsed:.2f} с, ошибок {len(errors)}")
+    finally:
+        await scanner.close()
+        await runner.cleanup()
+
+    ladder = scanner.ladders[1]
+    sub_id = next(iter(ladder.prices))
+    mine = [{"id": "x", "price": 999.0, "is_active": 1, "subcategory_id": sub_id}]
+    print(f"страниц: {size / 1024 / 1024:.1f} МБ, лотов в лестнице кат. 1: {ladder.total}, "
+          f"дешевле всех: {ladder.cheapest(sub_id):g}")
+    print("reprice:", plan_reprice(mine, ladder, RepriceRule(delta=1, floor=60)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Холодный старт до готовности Telegram-бота: прежний порядок main.py против нового.
+
+before — проверка зависимостей через __import__ (lxml, bcrypt, aiogram), импорт tg_bot и
+         PluginManager на уровне модуля, затем синхронная авторизация StarVell;
+after  — find_spec, авторизация в потоке сразу, aiogram/tg_bot импортируются параллельно с ней.
+
+get_profile здесь — time.sleep(AUTH_LATENCY) (сетевой запрос), каждый прогон — новый процесс.
+
+Запуск из корня проекта:  python -m benchmarks.bench_startup
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 3
+AUTH_LATENCY = 0.8
+
+BEFORE = f"""
+import time
+t0 = time.perf_counter()
+for pkg in ("lxml", "bcrypt", "colorama", "aiogram"):
+    __import__(pkg)
+import tg_bot.aio_bot, core.plugin_manager
+from aiogram.types import BotCommand
+time.sleep({AUTH_LATENCY})
+print(time.perf_counter() - t0)
+"""
+
+AFTER = f"""
+import importlib, importlib.util, threading, time
+t0 = time.perf_counter()
+assert all(importlib.util.find_spec(p) for p in ("lxml", "bcrypt", "colorama", "aiogram"))
+auth = threading.Thread(target=time.sleep, args=({AUTH_LATENCY},))
+auth.start()
+importlib.import_module("tg_bot.aio_bot")
+auth.join()
+print(time.perf_counter() - t0)
+"""
+
+
+def measure(code: str) -> float:
+    runs = []
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(runs)
+
+
+def main() -> None:
+    print(f"авторизация StarVell ~{AUTH_LATENCY * 1000:.0f} мс, медиана из {RUNS} запусков")
+    before = measure(BEFORE)
+    after = measure(AFTER)
+    print(f"before: {before:.2f} с до готовности")
+    print(f" after: {after:.2f} с до готовности ({(1 - after / before) * 100:.0f}% быстрее)")
+
+
+if __name__ == "__main__":
+    main()
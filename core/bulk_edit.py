@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from Utils import json_codec
+
+logger = logging.getLogger("StarVell.BulkEdit")
+
+CHECKPOINT_PATH = "storage/bulk_edit_checkpoint.json"
+CONCURRENCY = 8
+CHECKPOINT_INTERVAL = 1.0
+
+# Поле запроса StarVell → колонка OffersMirror
+MIRROR_FIELDS = {"price": "price", "availability": "availability", "isActive": "is_active"}
+
+
+class BulkEditError(ValueError):
+    pass
+
+
+@dataclass
+class Operation:
+    """
+    price_pct  — цена ± value процентов
+    price_add  — цена ± value рублей
+    price_set  — цена = value
+    availability — наличие = value
+    activate / deactivate — включить / выключить лот
+    """
+    kind: str
+    value: float = 0.0
+
+    def describe(self) -> str:
+        if self.kind == "price_pct":
+            return f"цена {self.value:+g}%"
+        if self.kind == "price_add":
+            return f"цена {self.value:+g} ₽"
+        if self.kind == "price_set":
+            return f"цена = {self.value:g} ₽"
+        if self.kind == "availability":
+            return f"наличие = {int(self.value)}"
+        return "включить" if self.kind == "activate" else "выключить"
+
+    def apply(self, offer: Dict[str, Any]) -> Dict[str, Any]:
+        """Изменения для одного лота (поля запроса StarVell). Пустой словарь — менять нечего."""
+        if self.kind in ("price_pct", "price_add", "price_set"):
+            old = float(offer.get("price") or 0)
+            if self.kind == "price_pct":
+                new = old * (1 + self.value / 100)
+            elif self.kind == "price_add":
+                new = old + self.value
+            else:
+                new = self.value
+            new = round(new, 2)
+            if new <= 0:
+                raise BulkEditError(f"цена стала бы {new:g}")
+            return {"price": new} if new != old else {}
+        if self.kind == "availability":
+            new = int(self.value)
+            return {"availability": new} if new != int(offer.get("availability") or 0) else {}
+        active = self.kind == "activate"
+        return {"isActive": active} if bool(offer.get("is_active")) != active else {}
+
+
+def parse_operation(text: str) -> Operation:
+    """
+    'price +10%' · 'price -50' · 'price =199' · 'stock 100' · 'on' · 'off'
+    (и русские варианты: цена / наличие / вкл / выкл).
+    """
+    parts = text.split()
+    if not parts:
+        raise BulkEditError("не указана операция")
+    head = parts[0].lower()
+    if head in ("on", "вкл", "activate"):
+        return Operation("activate")
+    if head in ("off", "выкл", "deactivate"):
+        return Operation("deactivate")
+    if len(parts) < 2:
+        raise BulkEditError(f"для «{parts[0]}» нужно значение")
+
+    raw = parts[1].replace(",", ".")
+    try:
+        if head in ("stock", "наличие", "availability"):
+            value = int(raw)
+            if value < 0:
+                raise BulkEditError("наличие не может быть отрицательным")
+            return Operation("availability", value)
+        if head in ("price", "цена"):
+            if raw.endswith("%"):
+                return Operation("price_pct", float(raw[:-1]))
+            if raw.startswith("="):
+                return Operation("price_set", float(raw[1:]))
+            if raw[0] in "+-":
+                return Operation("price_add", float(raw))
+            return Operation("price_set", float(raw))
+    except ValueError as e:
+        if isinstance(e, BulkEditError):
+            raise
+        raise BulkEditError(f"не число: {parts[1]}")
+    raise BulkEditError(f"неизвестная операция: {parts[0]}")
+
+
+@dataclass
+class BulkEditJob:
+    """
+    Задание целиком: целевые значения рассчитываются один раз при планировании,
+    поэтому повторный запуск после обрыва не применит +10% дважды.
+    """
+    operation: Operation
+    items: Dict[str, Dict[str, Any]]
+    titles: Dict[str, str] = field(default_factory=dict)
+    done: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    filters: str = ""
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def pending(self) -> List[str]:
+        done = set(self.done)
+        return [offer_id for offer_id in self.items if offer_id not in done]
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "created_at": self.created_at,
+            "operation": {"kind": self.operation.kind, "value": self.operation.value},
+            "filters": self.filters,
+            "items": self.items,
+            "titles": self.titles,
+            "done": self.done,
+            "failed": self.failed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BulkEditJob":
+        op = data.get("operation") or {}
+        return cls(
+            operation=Operation(op.get("kind", ""), float(op.get("value") or 0)),
+            items=data.get("items") or {},
+            titles=data.get("titles") or {},
+            done=list(data.get("done") or []),
+            failed=dict(data.get("failed") or {}),
+            filters=data.get("filters", ""),
+            job_id=data.get("job_id", ""),
+            created_at=data.get("created_at", 0.0),
+        )
+
+
+def plan(offers: List[Dict[str, Any]], operation: Operation,
+         filters: str = "") -> Tuple[BulkEditJob, Dict[str, str]]:
+    """Строит задание по строкам зеркала. Возвращает (job, {offer_id: причина пропуска})."""
+    items, titles, skipped = {}, {}, {}
+    for offer in offers:
+        try:
+            changes = operation.apply(offer)
+        except BulkEditError as e:
+            skipped[offer["id"]] = str(e)
+            continue
+        if changes:
+            items[offer["id"]] = changes
+            titles[offer["id"]] = offer.get("title") or ""
+    return BulkEditJob(operation=operation, items=items, titles=titles, filters=filters), skipped
+
+
+def load_checkpoint(path: str = CHECKPOINT_PATH) -> Optional[BulkEditJob]:
+    try:
+        return BulkEditJob.from_dict(json_codec.load_file(path))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("⚠️ Повреждённый чекпоинт массовой правки %s: %s", path, e)
+        return None
+
+
+def save_checkpoint(job: BulkEditJob, path: str = CHECKPOINT_PATH) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    json_codec.dump_file(path, job.to_dict())
+
+
+def clear_checkpoint(path: str = CHECKPOINT_PATH) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def push_changes(client, mirror, offer_id: str, changes: Dict[str, Any]) -> Optional[str]:
+    """Одно изменение лота + отражение в зеркале. Возвращает текст ошибки или None."""
+    ok, data = await client.update_offer(offer_id, changes)
+    if not ok:
+        return str(data.get("error", "Unknown error"))
+    if mirror is not None:
+        try:
+            await mirror.update_local(offer_id, **{
+                MIRROR_FIELDS[k]: (1 if v else 0) if k == "isActive" else v
+                for k, v in changes.items() if k in MIRROR_FIELDS
+            })
+        except Exception as e:
+            logger.debug("mirror update %s: %s", offer_id, e)
+    return None
+
+
+async def run_job(job: BulkEditJob, client, mirror=None,
+                  on_progress: Optional[Callable[[BulkEditJob], Awaitable[None]]] = None,
+                  checkpoint_path: str = CHECKPOINT_PATH,
+                  concurrency: int = CONCURRENCY) -> BulkEditJob:
+    """
+    Отправляет оставшиеся изменения параллельно (частоту ограничивает RateLimiter клиента).
+    Прогресс пишется в чекпоинт не чаще раза в CHECKPOINT_INTERVAL; после успеха всё задание
+    удаляется, при ошибках чекпоинт остаётся для повтора.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    job.failed = {}
+    save_checkpoint(job, checkpoint_path)
+
+    async def send(offer_id: str):
+        async with semaphore:
+            error = await push_changes(client, mirror, offer_id, job.items[offer_id])
+        if error:
+            job.failed[offer_id] = error
+        else:
+            job.done.append(offer_id)
+
+    pending = {asyncio.create_task(send(offer_id)) for offer_id in job.pending}
+    while pending:
+        _done, pending = await asyncio.wait(pending, timeout=CHECKPOINT_INTERVAL)
+        save_checkpoint(job, checkpoint_path)
+        if on_progress is not None:
+            await on_progress(job)
+
+    if job.finished:
+        clear_checkpoint(checkpoint_path)
+    logger.info("✏️ Массовая правка %s (%s): %s/%s, ошибок %s",
+                job.job_id, job.operation.describe(), len(job.done), len(job.items), len(job.failed))
+    return job
@@ -0,0 +1,213 @@
+"""
+Шина событий для плагинов.
+
+Nexus публикует события (emit) и не ждёт обработчиков: каждый вызов — отдельная задача
+с таймаутом плагина. Медленный или падающий плагин не задерживает ни цикл Runner'а,
+ни другие плагины; по каждому плагину ведётся статистика задержек и ошибок. Синхронные
+обработчики идут в собственный поток плагина, а не в общий пул to_thread: зависший плагин
+не отнимает потоки у ядра.
+
+Подписка — явно через context["events"].subscribe(...) или методами on_<событие>
+(on_new_order, on_new_message, ...), которые PluginManager подключает сам.
+
+Шина одна на процесс и для всех аккаунтов: от какого пришло событие — в event.account.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from Utils.settings import MAIN_ACCOUNT
+
+logger = logging.getLogger("StarVell.EventBus")
+
+NEW_MESSAGE = "new_message"
+NEW_ORDER = "new_order"
+NEW_REVIEW = "new_review"
+ORDER_STATUS_CHANGED = "order_status_changed"
+EVENT_TYPES = (NEW_MESSAGE, NEW_ORDER, NEW_REVIEW, ORDER_STATUS_CHANGED)
+
+DEFAULT_TIMEOUT = 10.0
+MAX_PENDING = 200  # незавершённых вызовов на плагин; сверх этого события плагину не доставляются
+
+
+@dataclass
+class NewMessageEvent:
+    chat_id: str
+    message_id: str
+    author: str
+    text: str
+    raw: Any = None
+    account: str = MAIN_ACCOUNT  # имя аккаунта из configs/_main.cfg, от которого пришло событие
+    type: str = NEW_MESSAGE
+
+
+@dataclass
+class NewOrderEvent:
+    order_id: str
+    buyer: str
+    product: str
+    quantity: int
+    price: float
+    status: str = ""
+    raw: Any = None
+    account: str = MAIN_ACCOUNT
+    type: str = NEW_ORDER
+
+
+@dataclass
+class NewReviewEvent:
+    review_id: str
+    author: str
+    rating: int
+    text: str
+    raw: Any = None
+    account: str = MAIN_ACCOUNT
+    type: str = NEW_REVIEW
+
+
+@dataclass
+class OrderStatusChangedEvent:
+    order_id: str
+    status: str
+    previous: str
+    raw: Any = None
+    account: str = MAIN_ACCOUNT
+    type: str = ORDER_STATUS_CHANGED
+
+
+Event = Union[NewMessageEvent, NewOrderEvent, NewReviewEvent, OrderStatusChangedEvent]
+Handler = Callable[[Event], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class HandlerStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    dropped: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    last_error: str = ""
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+@dataclass
+class _Subscription:
+    plugin: str
+    event: str
+    handler: Handler
+    timeout: float
+
+
+class EventBus:
+    def __init__(self, default_timeout: float = DEFAULT_TIMEOUT, max_pending: int = MAX_PENDING) -> None:
+        self.default_timeout = default_timeout
+        self.max_pending = max_pending
+        self._subs: Dict[str, List[_Subscription]] = {e: [] for e in EVENT_TYPES}
+        self.stats: Dict[str, HandlerStats] = {}
+        self._pending: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def subscribe(self, plugin: str, event: str, handler: Handler, timeout: Optional[float] = None) -> None:
+        if event not in self._subs:
+            raise ValueError(f"неизвестное событие: {event}")
+        self._subs[event].append(_Subscription(plugin, event, handler, timeout or self.default_timeout))
+        self.stats.setdefault(plugin, HandlerStats())
+
+    def subscribe_plugin(self, plugin_name: str, plugin: Any) -> int:
+        """Подписывает методы on_<событие> объекта плагина. Таймаут — атрибут event_timeout плагина."""
+        timeout = getattr(plugin, "event_timeout", None)
+        count = 0
+        for event in EVENT_TYPES:
+            handler = getattr(plugin, f"on_{event}", None)
+            if callable(handler) and not self._subscribed(plugin_name, event, handler):
+                self.subscribe(plugin_name, event, handler, timeout)
+                count += 1
+        return count
+
+    def _subscribed(self, plugin: str, event: str, handler: Handler) -> bool:
+        return any(s.plugin == plugin and s.handler == handler for s in self._subs[event])
+
+    def unsubscribe_plugin(self, plugin: str) -> None:
+        for event, subs in self._subs.items():
+            self._subs[event] = [s for s in subs if s.plugin != plugin]
+        self.stats.pop(plugin, None)
+        executor = self._executors.pop(plugin, None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def has_subscribers(self, event: str) -> bool:
+        return bool(self._subs.get(event))
+
+    # ------------------------------------------------------------------
+
+    def emit(self, event: Event) -> List[asyncio.Task]:
+        """Ставит обработчики в цикл событий и сразу возвращается; ждать их не обязательно."""
+        tasks = []
+        for sub in self._subs.get(event.type, ()):
+            stats = self.stats.setdefault(sub.plugin, HandlerStats())
+            if self._pending.get(sub.plugin, 0) >= self.max_pending:
+                stats.dropped += 1
+                continue
+            self._pending[sub.plugin] = self._pending.get(sub.plugin, 0) + 1
+            task = asyncio.get_running_loop().create_task(self._call(sub, event, stats))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            tasks.append(task)
+        return tasks
+
+    async def _call(self, sub: _Subscription, event: Event, stats: HandlerStats) -> None:
+        started = time.monotonic()
+        in_thread = None
+        try:
+            if inspect.iscoroutinefunction(sub.handler):
+                await asyncio.wait_for(sub.handler(event), sub.timeout)
+            else:
+                # синхронный обработчик — в потоке плагина, чтобы не блокировать цикл
+                in_thread = asyncio.wrap_future(self._executor(sub.plugin).submit(sub.handler, event))
+                await asyncio.wait_for(asyncio.shield(in_thread), sub.timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            stats.last_error = f"таймаут {sub.timeout:g} с ({sub.event})"
+            logger.warning(f"⏱ Плагин {sub.plugin}: {sub.event} не уложился в {sub.timeout:g} с")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = f"{sub.event}: {e or type(e).__name__}"
+            logger.error(f"❌ Плагин {sub.plugin}: ошибка в обработчике {sub.event}: {e}", exc_info=True)
+        finally:
+            elapsed = time.monotonic() - started
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            if in_thread is None or in_thread.done():
+                self._pending[sub.plugin] -= 1
+            else:
+                # по таймауту поток не прерывается: вызов остаётся незавершённым, пока поток не вернётся
+                in_thread.add_done_callback(lambda future, plugin=sub.plugin: self._release(plugin, future))
+
+    def _executor(self, plugin: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(plugin)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"plugin-{plugin}")
+            self._executors[plugin] = executor
+        return executor
+
+    def _release(self, plugin: str, future: asyncio.Future) -> None:
+        if not future.cancelled():
+            future.exception()  # результат опоздавшего вызова уже никому не нужен
+        self._pending[plugin] -= 1
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Ждёт текущие обработчики (при остановке)."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger("StarVell.OffersMirror")
+
+DB_PATH = "storage/offers.db"
+
+# Поля, изменение которых считается изменением лота
+TRACKED_FIELDS = ("category_id", "subcategory_id", "title", "price", "availability", "is_active", "desc_hash")
+
+
+@dataclass
+class SyncResult:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    duration: float = 0.0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def normalize_offer(offer: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Ответ StarVell → строка таблицы offers. Без ID — None."""
+    offer_id = offer.get("id")
+    if offer_id is None:
+        return None
+
+    category = offer.get("category") if isinstance(offer.get("category"), dict) else {}
+    sub = offer.get("subCategory") if isinstance(offer.get("subCategory"), dict) else {}
+    rus = (offer.get("descriptions") or {}).get("rus") or {}
+    title = rus.get("briefDescription") or offer.get("title") or ""
+    description = rus.get("description") or offer.get("description") or ""
+
+    try:
+        price = float(offer.get("price") or 0)
+    except (TypeError, ValueError):
+        price = 0.0
+    try:
+        availability = int(offer.get("availability") or 0)
+    except (TypeError, ValueError):
+        availability = 0
+
+    return {
+        "id": str(offer_id),
+        "category_id": offer.get("categoryId") or category.get("id"),
+        "subcategory_id": offer.get("subCategoryId") or sub.get("id"),
+        "title": title,
+        "title_norm": title.lower().replace("ё", "е"),
+        "price": price,
+        "availability": availability,
+        "is_active": 1 if offer.get("isActive", True) else 0,
+        "desc_hash": hashlib.sha1(description.encode("utf-8")).hexdigest(),
+    }
+
+
+class OffersMirror:
+    """
+    Локальная копия наших лотов в SQLite.
+    sync() забирает список у StarVell, сравнивает с зеркалом и пишет только изменившиеся строки.
+    Списки, поиск и пагинация в Telegram читают отсюда, без запросов к StarVell.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+                 interval: Callable[[], float], path: str = DB_PATH) -> None:
+        self.fetch = fetch
+        self.interval = interval
+        self.path = path
+        self.last_sync: float = 0.0
+        self.last_result: Optional[SyncResult] = None
+        self.listeners: List[Callable[[SyncResult], Any]] = []
+        self._db: Optional[aiosqlite.Connection] = None
+        self._sync_lock = asyncio.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+
+    async def db(self) -> aiosqlite.Connection:
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            self._db.row_factory = aiosqlite.Row
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute("""
+                CREATE TABLE IF NOT EXISTS offers (
+                    id TEXT PRIMARY KEY,
+                    category_id INTEGER,
+                    subcategory_id INTEGER,
+                    title TEXT DEFAULT '',
+                    title_norm TEXT DEFAULT '',
+                    price REAL DEFAULT 0,
+                    availability INTEGER DEFAULT 0,
+                    is_active INTEGER DEFAULT 1,
+                    desc_hash TEXT DEFAULT '',
+                    updated_at INTEGER DEFAULT 0
+                )
+            """)
+            await self._db.execute("CREATE INDEX IF NOT EXISTS idx_offers_category ON offers(category_id, price)")
+            await self._db.execute("CREATE INDEX IF NOT EXISTS idx_offers_active ON offers(is_active, title_norm)")
+            await self._db.commit()
+        return self._db
+
+    async def close(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+
+    async def sync(self) -> SyncResult:
+        """Полный проход по списку StarVell с записью только разницы."""
+        async with self._sync_lock:
+            started = time.monotonic()
+            remote = [row for row in map(normalize_offer, await self.fetch()) if row]
+            result = await self.apply_snapshot(remote, full=True)
+            result.duration = time.monotonic() - started
+            self.last_sync = time.time()
+            self.last_result = result
+
+        if result.has_changes:
+            logger.info("🔄 Лоты: +%s ~%s -%s (без изменений %s) за %.1f с",
+                        len(result.added), len(result.changed), len(result.removed),
+                        result.unchanged, result.duration)
+            for listener in self.listeners:
+                try:
+                    res = listener(result)
+                    if asyncio.iscoroutine(res):
+                        await res
+                except Exception as e:
+                    logger.error("❌ Обработчик синхронизации лотов: %s", e)
+        return result
+
+    async def apply_snapshot(self, rows: Iterable[Dict[str, Any]], full: bool = False) -> SyncResult:
+        """
+        Применяет нормализованные строки. full=True — это полный список, отсутствующие лоты удаляются.
+        Используется и после локальных правок (full=False), чтобы не ждать следующей синхронизации.
+        """
+        db = await self.db()
+        result = SyncResult()
+        cur = await db.execute(f"SELECT id, {', '.join(TRACKED_FIELDS)} FROM offers")
+        local = {r["id"]: tuple(r[f] for f in TRACKED_FIELDS) for r in await cur.fetchall()}
+        await cur.close()
+
+        now = int(time.time())
+        upserts: List[Tuple] = []
+        seen = set()
+        for row in rows:
+            seen.add(row["id"])
+            fingerprint = tuple(row[f] for f in TRACKED_FIELDS)
+            old = local.get(row["id"])
+            if old == fingerprint:
+                result.unchanged += 1
+                continue
+            (result.added if old is None else result.changed).append(row["id"])
+            upserts.append((row["id"], row["category_id"], row["subcategory_id"], row["title"], row["title_norm"],
+                            row["price"], row["availability"], row["is_active"], row["desc_hash"], now))
+
+        if full:
+            result.removed = [offer_id for offer_id in local if offer_id not in seen]
+
+        if upserts:
+            await db.executemany("""
+                INSERT INTO offers(id, category_id, subcategory_id, title, title_norm, price,
+                                   availability, is_active, desc_hash, updated_at)
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    category_id=excluded.category_id, subcategory_id=excluded.subcategory_id,
+                    title=excluded.title, title_norm=excluded.title_norm, price=excluded.price,
+                    availability=excluded.availability, is_active=excluded.is_active,
+                    desc_hash=excluded.desc_hash, updated_at=excluded.updated_at
+            """, upserts)
+        if result.removed:
+            await db.executemany("DELETE FROM offers WHERE id=?", [(i,) for i in result.removed])
+        if upserts or result.removed:
+            await db.commit()
+        return result
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _where(query: str = "", category_id: Optional[int] = None,
+               active: Optional[bool] = None,
+               category_ids: Optional[Iterable[int]] = None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if query:
+            clauses.append("title_norm LIKE ?")
+            params.append(f"%{query.lower().replace('ё', 'е')}%")
+        if category_id is not None:
+            clauses.append("category_id = ?")
+            params.append(category_id)
+        if category_ids is not None:
+            category_ids = list(category_ids)
+            clauses.append(f"category_id IN ({', '.join('?' * len(category_ids)) or 'NULL'})")
+            params.extend(category_ids)
+        if active is not None:
+            clauses.append("is_active = ?")
+            params.append(1 if active else 0)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    async def list_offers(self, query: str = "", category_id: Optional[int] = None,
+                          active: Optional[bool] = None, offset: int = 0, limit: int = 10) -> List[dict]:
+        db = await self.db()
+        where, params = self._where(query, category_id, active)
+        cur = await db.execute(
+            f"SELECT * FROM offers{where} ORDER BY is_active DESC, title_norm LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        rows = [dict(r) for r in await cur.fetchall()]
+        await cur.close()
+        return rows
+
+    async def count_offers(self, query: str = "", category_id: Optional[int] = None,
+                           active: Optional[bool] = None) -> int:
+        db = await self.db()
+        where, params = self._where(query, category_id, active)
+        cur = await db.execute(f"SELECT COUNT(*) FROM offers{where}", params)
+        row = await cur.fetchone()
+        await cur.close()
+        return row[0] if row else 0
+
+    async def select_offers(self, query: str = "", category_id: Optional[int] = None,
+                            category_ids: Optional[Iterable[int]] = None,
+                            active: Optional[bool] = None) -> List[dict]:
+        """Все лоты по фильтру, без пагинации (для массовых операций)."""
+        db = await self.db()
+        where, params = self._where(query, category_id, active, category_ids)
+        cur = await db.execute(f"SELECT * FROM offers{where} ORDER BY id", params)
+        rows = [dict(r) for r in await cur.fetchall()]
+        await cur.close()
+        return rows
+
+    async def update_local(self, offer_id: str, **fields) -> None:
+        """Отражает собственную правку в зеркале сразу, не дожидаясь следующей синхронизации."""
+        columns = [f for f in fields if f in TRACKED_FIELDS]
+        if not columns:
+            return
+        db = await self.db()
+        await db.execute(
+            f"UPDATE offers SET {', '.join(f'{c}=?' for c in columns)}, updated_at=? WHERE id=?",
+            (*(fields[c] for c in columns), int(time.time()), str(offer_id)),
+        )
+        await db.commit()
+
+    async def active_category_ids(self) -> List[int]:
+        db = await self.db()
+        cur = await db.execute("SELECT DISTINCT category_id FROM offers WHERE is_active=1 AND category_id IS NOT NULL")
+        ids = [r[0] for r in await cur.fetchall()]
+        await cur.close()
+        return ids
+
+    async def offer_ids(self) -> Set[str]:
+        """ID всех наших лотов в зеркале, включая неактивные."""
+        db = await self.db()
+        cur = await db.execute("SELECT id FROM offers")
+        ids = {r[0] for r in await cur.fetchall()}
+        await cur.close()
+        return ids
+
+    async def get_offer(self, offer_id: str) -> Optional[dict]:
+        db = await self.db()
+        cur = await db.execute("SELECT * FROM offers WHERE id=?", (str(offer_id),))
+        row = await cur.fetchone()
+        await cur.close()
+        return dict(row) if row else None
+
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        """Периодическая синхронизация. Интервал читается каждый раз — меняется на лету через конфиг."""
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("⚠️ Синхронизация лотов не удалась: %s", e)
+            try:
+                await asyncio.sleep(self.interval())
+            except asyncio.CancelledError:
+                break
+        await self.close()
@@ -1,17 +1,63 @@
+import ast
+import asyncio
 import importlib
+import inspect
 import logging
+import re
+import sys
+import time
 import traceback
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.types import CallbackQuery, Message, Update
+
+from core.event_bus import EventBus
+from core.plugin_services import build_services
+from core.plugin_process import PluginProcess
 
 logger = logging.getLogger("PluginManager")
 
+WARMUP_DELAY = 5.0
+WATCH_INTERVAL = 1.0
+_MANIFEST_RE = re.compile(r"^MANIFEST\s*=\s*", re.M)
+
+
+class LazyPlugin:
+    """Заглушка в plugins до первого вызова: метаданные из манифеста для меню плагинов."""
+
+    def __init__(self, module_name: str, manifest: dict) -> None:
+        self.module_name = module_name
+        self.name = manifest.get("name", module_name)
+        self.version = manifest.get("version", "1.0.0")
+        self.author = manifest.get("author", "Unknown")
+        self.description = manifest.get("description", "Нет описания")
+        self.commands = list(manifest.get("commands", []))
+        self.buttons = list(manifest.get("buttons", []))
+        self.enabled = True
+        self.warmup = bool(manifest.get("warmup", False))
+        self.manifest = manifest
+
 
 class PluginManager:
     """
     1. attach(dp=Dispatcher, bot=Bot, context=dict)
     2. register(cardinal)
     3. Plugin class
+
+    Плагин с MANIFEST = {"lazy": True, "commands": [...], "callbacks": [...]} не импортируется
+    при старте: его команды и префиксы callback'ов ловит заглушка, первый вызов загружает модуль.
+    "warmup": True — загрузить в фоне через WARMUP_DELAY после старта. Функция warmup() модуля,
+    если есть, выполняется в потоке перед attach (прогрев кэшей).
+    Общие ресурсы (клиент StarVell, база, планировщик, кэш, KV) — в context, см. core/plugin_services.py.
+
+    "isolated": True — плагин работает в отдельном процессе (core/plugin_process.py), "events" —
+    какие события шины ему пересылать, "memory_mb" — лимит памяти процесса.
+
+    События Nexus доступны через context["events"] (core/event_bus.py); методы плагина
+    on_new_order / on_new_message / on_new_review / on_order_status_changed подписываются сами.
     """
 
     def __init__(self, context: Optional[dict] = None, plugins_dir: str = "plugins") -> None:
@@ -19,6 +65,19 @@ class PluginManager:
         self.plugins_dir: str = plugins_dir
         self.plugins: Dict[str, Any] = {}
         self.routers = []
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.watch_task: Optional[asyncio.Task] = None
+        # модуль → ключи в plugins и роутеры, которые он добавил (для выгрузки)
+        self._owned: Dict[str, Dict[str, list]] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self.init_times: Dict[str, float] = {}  # время attach/register по модулям (отчёт о запуске)
+
+        nexus = self.context.get("nexus")
+        self.events: EventBus = getattr(nexus, "events", None) or self.context.get("events") or EventBus()
+        self.context["events"] = self.events
+        for name, service in build_services(nexus).items():
+            self.context.setdefault(name, service)
 
     # ------------------------------------------------------------------
 
@@ -29,75 +88,261 @@ class PluginManager:
             path.mkdir(parents=True, exist_ok=True)
             return self.plugins
 
-        for file in path.glob("*.py"):
-            module_name = file.stem
-            if module_name.startswith("_"):
+        for module_name, stamp in self._scan().items():
+            self._stamps[module_name] = stamp
+            manifest = self._read_manifest(path / f"{module_name}.py")
+            if manifest and manifest.get("isolated") and self._register_isolated(module_name, manifest):
+                continue
+            if manifest and manifest.get("lazy") and self._register_lazy(module_name, manifest):
                 continue
 
             try:
                 logger.info("🧩 Загружаю плагин: %s", module_name)
                 module = importlib.import_module(f"{self.plugins_dir}.{module_name}")
+            except Exception as e:  # noqa: BLE001
+                logger.error("❌ Ошибка при загрузке %s: %s", module_name, e)
+                traceback.print_exc()
+                continue
+            self._activate(module_name, module)
+
+        self.subscribe_events()
+        lazy = sum(1 for p in self.plugins.values() if isinstance(p, LazyPlugin))
+        logger.info("🔗 Загружено плагинов: %s (отложено до первого вызова: %s)", len(self.plugins), lazy)
+        if any(p.warmup for p in self.plugins.values() if isinstance(p, LazyPlugin)):
+            self._warmup_task = asyncio.get_running_loop().create_task(self.warmup())
+        return self.plugins
+
+    def _activate(self, module_name: str, module: Any) -> None:
+        """attach / register / Plugin с учётом того, что добавил модуль (для выгрузки)."""
+        dp = self.context.get("dispatcher")
+        keys_before = set(self.plugins)
+        routers_before = list(dp.sub_routers) if dp is not None else []
+        started = time.perf_counter()
+        try:
+            self._activate_module(module_name, module)
+        finally:
+            self.init_times[module_name] = time.perf_counter() - started
+            self._record(module_name, keys_before, routers_before)
+
+    def _record(self, module_name: str, keys_before: set, routers_before: list) -> None:
+        dp = self.context.get("dispatcher")
+        owned = self._owned.setdefault(module_name, {"keys": [], "routers": []})
+        owned["keys"] += [k for k in self.plugins if k not in keys_before and k not in owned["keys"]]
+        if dp is not None:
+            owned["routers"] += [r for r in dp.sub_routers if r not in routers_before]
+
+    def _activate_module(self, module_name: str, module: Any) -> None:
+        """attach / register / Plugin — в порядке приоритета."""
+        if hasattr(module, "attach"):
+            nexus = self.context.get("nexus")
+            dp = self.context.get("dispatcher")
+            bot = self.context.get("bot")
 
-                if hasattr(module, "attach"):
-                    nexus = self.context.get("nexus")
-                    dp = self.context.get("dispatcher")
-                    bot = self.context.get("bot")
-
-                    if dp is None:
-                        logger.error("❌ Плагин %s: dp не передан", module_name)
-                    else:
-                        try:
-                            module.attach(dp=dp, bot=bot, context=self.context)
-                        except Exception as e:
-                            logger.error("❌ Ошибка attach() %s: %s", module_name, e)
-                            traceback.print_exc()
-                        else:
-                            if nexus is not None and hasattr(nexus, "plugins"):
-                                for key, plugin_inst in getattr(nexus, "plugins", {}).items():
-                                    if key not in self.plugins:
-                                        self.plugins[key] = plugin_inst
-                                        logger.info("✅ %s загружен (attach)", key)
-                    continue
-
-                if hasattr(module, "register"):
-                    nexus = self.context.get("nexus")
-                    if nexus is not None:
-                        try:
-                            module.register(nexus)
-                        except Exception as e:
-                            logger.error("❌ Ошибка register() %s: %s", module_name, e)
-                            traceback.print_exc()
-                        else:
-                            if hasattr(nexus, "plugins"):
-                                for key, plugin_inst in getattr(nexus, "plugins", {}).items():
-                                    if key not in self.plugins:
-                                        self.plugins[key] = plugin_inst
-                            self.plugins[module_name] = module
-                            logger.info("✅ %s зарегистрирован (register)", module_name)
-                    else:
-                        logger.error("❌ Плагин %s: nexus не найден в контексте", module_name)
-                    continue
-
-                if hasattr(module, "Plugin"):
-                    try:
-                        plugin = module.Plugin(self.context)  # type: ignore[call-arg]
-                    except Exception as e:  # noqa: BLE001
-                        logger.error("❌ Ошибка при создании Plugin из %s: %s", module_name, e)
-                        traceback.print_exc()
-                    else:
-                        self.plugins[module_name] = plugin
-                        plugin_name = getattr(plugin, "name", module_name)
-                        logger.info("✅ %s загружен (class-style)", plugin_name)
-                    continue
-
-                logger.warning("⚠️ В %s.py нет attach/register/Plugin — пропускаю", module_name)
+            if dp is None:
+                logger.error("❌ Плагин %s: dp не передан", module_name)
+            else:
+                try:
+                    module.attach(dp=dp, bot=bot, context=self.context)
+                except Exception as e:
+                    logger.error("❌ Ошибка attach() %s: %s", module_name, e)
+                    traceback.print_exc()
+                else:
+                    if nexus is not None and hasattr(nexus, "plugins"):
+                        for key, plugin_inst in getattr(nexus, "plugins", {}).items():
+                            if key not in self.plugins:
+                                self.plugins[key] = plugin_inst
+                                logger.info("✅ %s загружен (attach)", key)
+            return
 
+        if hasattr(module, "register"):
+            nexus = self.context.get("nexus")
+            if nexus is not None:
+                try:
+                    module.register(nexus)
+                except Exception as e:
+                    logger.error("❌ Ошибка register() %s: %s", module_name, e)
+                    traceback.print_exc()
+                else:
+                    if hasattr(nexus, "plugins"):
+                        for key, plugin_inst in getattr(nexus, "plugins", {}).items():
+                            if key not in self.plugins:
+                                self.plugins[key] = plugin_inst
+                    self.plugins[module_name] = module
+                    logger.info("✅ %s зарегистрирован (register)", module_name)
+            else:
+                logger.error("❌ Плагин %s: nexus не найден в контексте", module_name)
+            return
+
+        if hasattr(module, "Plugin"):
+            try:
+                plugin = module.Plugin(self.context)  # type: ignore[call-arg]
+            except Exception as e:  # noqa: BLE001
+                logger.error("❌ Ошибка при создании Plugin из %s: %s", module_name, e)
+                traceback.print_exc()
+            else:
+                self.plugins[module_name] = plugin
+                plugin_name = getattr(plugin, "name", module_name)
+                logger.info("✅ %s загружен (class-style)", plugin_name)
+            return
+
+        logger.warning("⚠️ В %s.py нет attach/register/Plugin — пропускаю", module_name)
+
+    # ------------------------------------------------------------------
+    # Отложенная загрузка
+
+    @staticmethod
+    def _read_manifest(file: Path) -> Optional[dict]:
+        """
+        MANIFEST = {...} верхнего уровня модуля, прочитанный как литерал без импорта.
+        Разбирается только сам литерал, а не весь файл.
+        """
+        try:
+            text = file.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        match = _MANIFEST_RE.search(text)
+        if not match:
+            return None
+        rest = text[match.end():]
+        end = 0
+        for i, line in enumerate(rest.splitlines(keepends=True)):
+            end += len(line)
+            if i and not line.startswith("}"):
+                continue
+            try:
+                manifest = ast.literal_eval(rest[:end])
+            except (SyntaxError, ValueError):
+                continue
+            return manifest if isinstance(manifest, dict) else None
+        logger.warning("⚠️ %s: MANIFEST не является литералом — загружаю сразу", file.name)
+        return None
+
+    @staticmethod
+    def _triggers(manifest: dict) -> Tuple[list, tuple]:
+        commands = [c["command"] if isinstance(c, dict) else str(c) for c in manifest.get("commands", [])]
+        return commands, tuple(manifest.get("callbacks", ()))
+
+    def _install_stub(self, module_name: str, key: str, placeholder: Any, kind: str,
+                      on_message, on_callback, conversation=None) -> None:
+        """Роутер на команды и префиксы callback'ов из манифеста; активен, пока в plugins лежит placeholder.
+        conversation(message) — дополнительно пересылать любые сообщения, для которых он истинен."""
+        dp = self.context["dispatcher"]
+        commands, prefixes = self._triggers(placeholder.manifest)
+        keys_before, routers_before = set(self.plugins), list(dp.sub_routers)
+        self.plugins[key] = placeholder
+
+        def active(_event) -> bool:
+            return self.plugins.get(key) is placeholder
+
+        router = Router(name=f"{kind}:{module_name}")
+        if commands:
+            router.message(Command(*commands), active)(on_message)
+        if prefixes:
+            router.callback_query(F.data.startswith(prefixes), active)(on_callback)
+        if conversation is not None:
+            router.message(active, conversation)(on_message)
+        dp.include_router(router)
+        self._record(module_name, keys_before, routers_before)
+
+    def _register_lazy(self, module_name: str, manifest: dict) -> bool:
+        """Модуль импортируется при первой команде или callback'е из манифеста."""
+        if self.context.get("dispatcher") is None or not any(self._triggers(manifest)):
+            return False
+        key = manifest.get("key", module_name)
+
+        async def on_message(message: Message, **data):
+            await self._load_and_forward(module_name, key, "message", message, data)
+
+        async def on_callback(query: CallbackQuery, **data):
+            await self._load_and_forward(module_name, key, "callback_query", query, data)
+
+        self._install_stub(module_name, key, LazyPlugin(module_name, manifest), "lazy", on_message, on_callback)
+        commands, prefixes = self._triggers(manifest)
+        logger.info("💤 %s: загрузка при первом вызове (%s)", module_name,
+                    ", ".join([f"/{c}" for c in commands] + [f"{p}*" for p in prefixes]))
+        return True
+
+    def _register_isolated(self, module_name: str, manifest: dict) -> bool:
+        """Плагин в отдельном процессе (core/plugin_process.py): сюда приходят только его апдейты и события."""
+        bot = self.context.get("bot")
+        if self.context.get("dispatcher") is None or bot is None or self.context.get("isolated"):
+            return False
+        key = manifest.get("key", module_name)
+        proxy = PluginProcess(module_name, manifest, self.plugins_dir, bot.token)
+
+        async def on_message(message: Message, event_update: Update):
+            if not await proxy.send_update(event_update):
+                await message.answer("⏳ Плагин занят или перезапускается, попробуйте позже.")
+
+        async def on_callback(query: CallbackQuery, event_update: Update):
+            if not await proxy.send_update(event_update):
+                await query.answer("⏳ Плагин занят, попробуйте позже")
+
+        # текст и файлы для FSM-состояний воркера — по чатам, где оно есть (см. PluginProcess.conversations)
+        self._install_stub(module_name, key, proxy, "isolated", on_message, on_callback,
+                           conversation=proxy.in_conversation)
+        for event in proxy.events:
+            self.events.subscribe(key, event, proxy.send_event)
+        logger.info("🧱 %s: изолированный режим (отдельный процесс)", module_name)
+        return True
+
+    async def ensure_loaded(self, module_name: str, key: Optional[str] = None) -> Any:
+        """Импорт (в потоке) и attach отложенного плагина; повторные вызовы ждут первый."""
+        key = key or module_name
+        lock = self._locks.setdefault(module_name, asyncio.Lock())
+        async with lock:
+            current = self.plugins.get(key)
+            if not isinstance(current, LazyPlugin):
+                return current
+            started = time.monotonic()
+            try:
+                module = await asyncio.to_thread(importlib.import_module, f"{self.plugins_dir}.{module_name}")
+                if hasattr(module, "warmup"):
+                    await asyncio.to_thread(module.warmup)
             except Exception as e:  # noqa: BLE001
                 logger.error("❌ Ошибка при загрузке %s: %s", module_name, e)
                 traceback.print_exc()
+                return None
+            del self.plugins[key]
+            self._activate(module_name, module)
+            plugin = self.plugins.get(key)
+            if plugin is None:
+                self.plugins[key] = current  # attach не удался — заглушка остаётся, попробуем в следующий раз
+                return None
+            if not current.enabled:
+                plugin.enabled = False
+            self.subscribe_events()
+            logger.info("⚡ %s загружен по требованию за %.2f с", module_name, time.monotonic() - started)
+            return plugin
 
-        logger.info("🔗 Загружено плагинов: %s", len(self.plugins))
-        return self.plugins
+    async def _load_and_forward(self, module_name: str, key: str, update_type: str, event: Any, data: dict) -> None:
+        plugin = await self.ensure_loaded(module_name, key)
+        router = getattr(plugin, "router", None)
+        if router is None:
+            if update_type == "callback_query":
+                await event.answer("Плагин недоступен")
+            return
+        # апдейт уже пойман заглушкой — передаём его роутеру плагина вручную
+        data.pop("handler", None)
+        await router.propagate_event(update_type=update_type, event=event, **data)
+
+    async def warmup(self, delay: float = WARMUP_DELAY) -> None:
+        """Фоновая загрузка плагинов с warmup: True в манифесте — когда бот уже отвечает."""
+        await asyncio.sleep(delay)
+        for key, plugin in list(self.plugins.items()):
+            if isinstance(plugin, LazyPlugin) and plugin.warmup:
+                await self.ensure_loaded(plugin.module_name, key)
+
+    def subscribe_events(self) -> None:
+        """Подписывает on_<событие> методы загруженных плагинов на шину событий."""
+        for name, plugin in self.plugins.items():
+            try:
+                count = self.events.subscribe_plugin(name, plugin)
+            except Exception as e:  # noqa: BLE001
+                logger.error("❌ Плагин %s: не удалось подписаться на события: %s", name, e)
+                continue
+            if count:
+                logger.info("📡 %s: подписок на события — %s", name, count)
 
     # ------------------------------------------------------------------
 
@@ -112,8 +357,162 @@ class PluginManager:
 
     # ------------------------------------------------------------------
 
+    def _module_of(self, name: str) -> Optional[str]:
+        if name in self._owned:
+            return name
+        return next((m for m, owned in self._owned.items() if name in owned["keys"]), None)
+
     def unload_plugin(self, name: str) -> None:
-        """Выгрузить (отключить) плагин по имени."""
-        if name in self.plugins:
-            del self.plugins[name]
-            logger.info("🧹 Плагин %s выгружен", name)
+        """
+        Выгрузить плагин (по ключу или имени модуля): stop(), отмена его задач,
+        отписка от событий и отключение роутеров от Dispatcher.
+        """
+        module_name = self._module_of(name)
+        owned = self._owned.pop(module_name, None) if module_name else None
+        keys = owned["keys"] if owned else [name]
+        nexus_plugins = getattr(self.context.get("nexus"), "plugins", None)
+
+        removed = False
+        for key in keys:
+            plugin = self.plugins.pop(key, None)
+            removed = removed or plugin is not None
+            if isinstance(nexus_plugins, dict):
+                nexus_plugins.pop(key, None)
+            self.events.unsubscribe_plugin(key)
+            self.context["scheduler"].cancel(key)
+            self.context["cache"].clear(prefix=key)
+            if plugin is not None and not isinstance(plugin, LazyPlugin):
+                self._stop(key, plugin)
+        for router in owned["routers"] if owned else ():
+            _detach_router(router)
+
+        if owned or removed:
+            logger.info("🧹 Плагин %s выгружен", module_name or name)
+
+    @staticmethod
+    def _stop(key: str, plugin: Any) -> None:
+        stop = getattr(plugin, "stop", None)
+        if callable(stop):
+            try:
+                result = stop()
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:  # noqa: BLE001
+                logger.error("❌ Ошибка stop() %s: %s", key, e)
+        for value in list(vars(plugin).values()) if hasattr(plugin, "__dict__") else ():
+            if isinstance(value, asyncio.Task) and not value.done():
+                value.cancel()
+
+    # ------------------------------------------------------------------
+    # Горячая перезагрузка
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stamps = {}
+        for file in sorted(Path(self.plugins_dir).glob("*.py")):
+            if file.stem.startswith("_"):
+                continue
+            try:
+                st = file.stat()
+            except OSError:
+                continue
+            stamps[file.stem] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    async def reload_plugin(self, module_name: str) -> Tuple[bool, str]:
+        """
+        Загрузить новую версию модуля. Исходник сначала компилируется, затем модуль
+        исполняется заново (importlib.reload) — и только если это удалось, старый плагин
+        выгружается и подключается новый. При ошибке продолжает работать старая версия.
+        """
+        file = Path(self.plugins_dir) / f"{module_name}.py"
+        full_name = f"{self.plugins_dir}.{module_name}"
+        lock = self._locks.setdefault(module_name, asyncio.Lock())
+        async with lock:
+            started = time.monotonic()
+            try:
+                st = file.stat()
+                source = file.read_bytes()
+            except OSError:
+                self.unload_plugin(module_name)
+                self._stamps.pop(module_name, None)
+                sys.modules.pop(full_name, None)
+                return True, "файл удалён, плагин выгружен"
+            self._stamps[module_name] = (st.st_mtime_ns, st.st_size)
+
+            try:
+                compile(source, str(file), "exec")
+            except SyntaxError as e:
+                logger.error("❌ %s: синтаксическая ошибка, оставляю старую версию: %s (строка %s)",
+                             module_name, e.msg, e.lineno)
+                return False, f"синтаксическая ошибка: {e.msg} (строка {e.lineno})"
+
+            manifest = self._read_manifest(file) or {}
+            if manifest.get("isolated") and self.context.get("bot") is not None and not self.context.get("isolated"):
+                self.unload_plugin(module_name)
+                self._register_isolated(module_name, manifest)
+                return True, "процесс плагина перезапущен"
+            if manifest.get("lazy") and self.context.get("dispatcher") is not None:
+                # новая версия загрузится при первом вызове
+                self.unload_plugin(module_name)
+                sys.modules.pop(full_name, None)
+                self._register_lazy(module_name, manifest)
+                return True, "обновлён, загрузится при первом вызове"
+
+            old_module = sys.modules.get(full_name)
+            try:
+                if old_module is not None:
+                    module = await asyncio.to_thread(importlib.reload, old_module)
+                else:
+                    module = await asyncio.to_thread(importlib.import_module, full_name)
+            except Exception as e:  # noqa: BLE001
+                logger.error("❌ %s: ошибка при импорте новой версии, оставляю старую: %s", module_name, e)
+                traceback.print_exc()
+                return False, f"ошибка импорта: {e}"
+
+            self.unload_plugin(module_name)
+            self._activate(module_name, module)
+            self.subscribe_events()
+            if not self._owned.get(module_name, {}).get("keys"):
+                return False, "модуль загружен, но плагин не подключился (см. лог)"
+            elapsed = time.monotonic() - started
+            logger.info("♻️ Плагин %s перезагружен за %.2f с", module_name, elapsed)
+            return True, f"перезагружен за {elapsed:.2f} с"
+
+    def delete_plugin(self, name: str) -> bool:
+        """Выгрузить плагин и удалить его файл."""
+        module_name = self._module_of(name) or name
+        file = Path(self.plugins_dir) / f"{module_name}.py"
+        self.unload_plugin(name)
+        self._stamps.pop(module_name, None)
+        sys.modules.pop(f"{self.plugins_dir}.{module_name}", None)
+        try:
+            file.unlink()
+        except FileNotFoundError:
+            return False
+        logger.info("🗑 Файл плагина %s удалён", file)
+        return True
+
+    async def watch(self, interval: float = WATCH_INTERVAL) -> None:
+        """Следит за plugins/*.py (по mtime/size): новые и изменённые перезагружаются, удалённые выгружаются."""
+        logger.debug("Слежу за %s", self.plugins_dir)
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                current = self._scan()
+                for module_name, stamp in current.items():
+                    if self._stamps.get(module_name) != stamp:
+                        await self.reload_plugin(module_name)
+                for module_name in [m for m in self._stamps if m not in current]:
+                    await self.reload_plugin(module_name)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:  # noqa: BLE001
+                logger.warning("⚠️ Слежение за плагинами: %s", e)
+
+
+def _detach_router(router: Router) -> None:
+    """Обратное include_router: в aiogram нет публичного API для отключения роутера."""
+    parent = router.parent_router
+    if parent is not None and router in parent.sub_routers:
+        parent.sub_routers.remove(router)
+    router._parent_router = None
@@ -0,0 +1,305 @@
+"""
+Изолированные плагины: модуль с MANIFEST = {"isolated": True, ...} работает в отдельном
+процессе, чтобы тяжёлые вычисления и блокирующий I/O не останавливали общий цикл событий.
+
+Основной процесс ловит команды и префиксы callback'ов плагина (как у lazy-плагинов) и
+пересылает апдейт воркеру строкой JSON через stdin; туда же идут события шины. Воркер
+кормит апдейты в собственный Dispatcher и отвечает в Telegram сам, через тот же токен
+бота, но без polling. На каждое сообщение приходит ack — пока их не хватает
+(MAX_IN_FLIGHT), новые сообщения плагину не отправляются, ядро не ждёт.
+
+FSM плагина живёт в Dispatcher'е воркера. В ack на апдейт воркер сообщает, есть ли у этого
+чата состояние; пока оно есть, основной процесс пересылает воркеру все сообщения чата,
+а не только команды манифеста — диалоги (ввод текста, файлы) работают как в основном процессе.
+
+Упавший воркер перезапускается с нарастающей паузой, превысивший memory_mb — убивается
+и перезапускается. В воркере нет Nexus: плагину доступны настройки, бот и события, но не
+зеркало лотов и не StarVell-аккаунт.
+
+Воркер:  python -m core.plugin_process <plugins_dir> <module>
+"""
+import asyncio
+import dataclasses
+import logging
+import os
+import sys
+import time
+import types
+from typing import Any, Dict, Optional, Set, Tuple
+
+from Utils import json_codec
+from core import event_bus
+
+logger = logging.getLogger("StarVell.PluginProcess")
+
+MAX_IN_FLIGHT = 32
+SEND_TIMEOUT = 2.0
+UPDATE_TIMEOUT = 60.0
+DEFAULT_MEMORY_MB = 512
+MEMORY_CHECK_INTERVAL = 5.0
+RESTART_DELAY_MAX = 60.0
+STABLE_AFTER = 60.0  # проработал дольше — пауза перезапуска сбрасывается
+TOKEN_ENV = "STARVELL_PLUGIN_BOT_TOKEN"
+
+EVENT_CLASSES = {
+    event_bus.NEW_MESSAGE: event_bus.NewMessageEvent,
+    event_bus.NEW_ORDER: event_bus.NewOrderEvent,
+    event_bus.NEW_REVIEW: event_bus.NewReviewEvent,
+    event_bus.ORDER_STATUS_CHANGED: event_bus.OrderStatusChangedEvent,
+}
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """RSS процесса из /proc (Linux); на других системах лимит памяти не проверяется."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class PluginProcess:
+    """Заглушка изолированного плагина в основном процессе: метаданные, пересылка, надзор."""
+
+    def __init__(self, module_name: str, manifest: dict, plugins_dir: str, bot_token: str) -> None:
+        self.module_name = module_name
+        self.plugins_dir = plugins_dir
+        self.bot_token = bot_token
+        self.name = manifest.get("name", module_name)
+        self.version = manifest.get("version", "1.0.0")
+        self.author = manifest.get("author", "Unknown")
+        self.description = manifest.get("description", "Нет описания")
+        self.commands = list(manifest.get("commands", []))
+        self.buttons = list(manifest.get("buttons", []))
+        self.events = [e for e in manifest.get("events", []) if e in EVENT_CLASSES]
+        self.memory_mb = float(manifest.get("memory_mb", DEFAULT_MEMORY_MB))
+        self.enabled = True
+        self.manifest = manifest
+
+        self.restarts = 0
+        self.dropped = 0
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._slots = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self._in_flight: Dict[int, float] = {}
+        self._next_id = 0
+        self.conversations: Set[Tuple[int, int]] = set()  # (chat_id, user_id) с состоянием FSM в воркере
+        self._ready = asyncio.Event()
+        self._stopping = False
+        self.task = asyncio.get_running_loop().create_task(self._supervise())
+
+    # ------------------------------------------------------------------
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        env = dict(os.environ, **{TOKEN_ENV: self.bot_token})
+        return await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "core.plugin_process", self.plugins_dir, self.module_name,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, env=env,
+        )
+
+    async def _supervise(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            started = time.monotonic()
+            try:
+                self._proc = await self._spawn()
+            except Exception as e:
+                logger.error(f"❌ Плагин {self.module_name}: не удалось запустить процесс: {e}")
+            else:
+                logger.info(f"🧱 Плагин {self.module_name} запущен в процессе {self._proc.pid}")
+                self._ready.set()
+                reader = asyncio.get_running_loop().create_task(self._read_acks(self._proc))
+                watchdog = asyncio.get_running_loop().create_task(self._watch_memory(self._proc))
+                try:
+                    code = await self._proc.wait()
+                finally:
+                    self._ready.clear()
+                    watchdog.cancel()
+                    reader.cancel()
+                    self._release_all()
+                    self.conversations.clear()  # состояния FSM были в памяти воркера
+                if self._stopping:
+                    break
+                logger.warning(f"⚠️ Процесс плагина {self.module_name} завершился (код {code})")
+
+            if time.monotonic() - started > STABLE_AFTER:
+                delay = 1.0
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RESTART_DELAY_MAX)
+
+    async def _read_acks(self, proc: asyncio.subprocess.Process) -> None:
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                return
+            try:
+                msg = json_codec.loads(line)
+            except json_codec.JSONDecodeError:
+                continue
+            if "chat" in msg:
+                key = (msg["chat"], msg["user"])
+                if msg.get("state"):
+                    self.conversations.add(key)
+                else:
+                    self.conversations.discard(key)
+            if self._in_flight.pop(msg.get("ack"), None) is not None:
+                self._slots.release()
+
+    async def _watch_memory(self, proc: asyncio.subprocess.Process) -> None:
+        while True:
+            await asyncio.sleep(MEMORY_CHECK_INTERVAL)
+            rss = _rss_mb(proc.pid)
+            if rss is not None and rss > self.memory_mb:
+                logger.error(f"❌ Плагин {self.module_name}: {rss:.0f} МБ > {self.memory_mb:.0f} МБ, перезапускаю")
+                proc.kill()
+                return
+
+    def _release_all(self) -> None:
+        for _ in range(len(self._in_flight)):
+            self._slots.release()
+        self._in_flight.clear()
+
+    # ------------------------------------------------------------------
+
+    async def send(self, kind: str, payload: Any) -> bool:
+        """Отправить сообщение воркеру. False — воркер недоступен или перегружен (сообщение отброшено)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), SEND_TIMEOUT)
+            await asyncio.wait_for(self._slots.acquire(), SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            return False
+        proc = self._proc
+        if not self._ready.is_set() or proc is None or proc.stdin is None or proc.returncode is not None:
+            self._slots.release()
+            self.dropped += 1
+            return False
+        self._next_id += 1
+        msg_id = self._next_id
+        self._in_flight[msg_id] = time.monotonic()
+        try:
+            proc.stdin.write(json_codec.dumpb({"id": msg_id, "kind": kind, "data": payload}) + b"\n")
+            await proc.stdin.drain()
+        except (ConnectionError, RuntimeError) as e:
+            if self._in_flight.pop(msg_id, None) is not None:
+                self._slots.release()
+            self.dropped += 1
+            logger.warning(f"⚠️ Плагин {self.module_name}: не удалось отправить сообщение: {e}")
+            return False
+        return True
+
+    def in_conversation(self, message) -> bool:
+        """У воркера есть состояние FSM для этого чата — сообщение нужно ему, даже если это не команда."""
+        return message.from_user is not None and (message.chat.id, message.from_user.id) in self.conversations
+
+    async def send_update(self, update) -> bool:
+        return await self.send("update", update.model_dump(mode="json", exclude_none=True))
+
+    async def send_event(self, event) -> None:
+        data = {f.name: getattr(event, f.name) for f in dataclasses.fields(event) if f.name != "raw"}
+        raw = getattr(event, "raw", None)
+        if isinstance(raw, (dict, list, str, int, float)):
+            data["raw"] = raw
+        await self.send("event", data)
+
+    def stop(self) -> None:
+        """Выгрузка: процесс завершается вместе с задачей надзора (её отменяет PluginManager)."""
+        self._stopping = True
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
+
+
+# ======================================================================
+# Воркер
+# ======================================================================
+
+
+async def worker_main(plugins_dir: str, module_name: str, proto_fd: int) -> None:
+    import importlib
+
+    from aiogram import Bot, Dispatcher
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.types import Update
+
+    from Utils.settings import Settings
+    from core.plugin_manager import PluginManager
+
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=16 * 1024 * 1024)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    out = os.fdopen(proto_fd, "wb", buffering=0)
+
+    settings, raw_cfg = Settings.load()
+    bot = Bot(token=os.environ.pop(TOKEN_ENV), default=DefaultBotProperties(parse_mode="HTML"))
+    dp = Dispatcher()
+    host = types.SimpleNamespace(
+        settings=settings,
+        plugins={},
+        telegram=types.SimpleNamespace(bot=bot, admin_ids=set(settings.telegram.admin_ids)),
+    )
+    pm = PluginManager({"nexus": host, "dispatcher": dp, "bot": bot, "config": raw_cfg, "isolated": True},
+                       plugins_dir=plugins_dir)
+    host.plugin_manager = pm
+    host.events = pm.events
+    pm._activate(module_name, importlib.import_module(f"{plugins_dir}.{module_name}"))
+    pm.subscribe_events()
+    if not pm.plugins:
+        raise SystemExit(f"{module_name}: плагин не подключился")
+
+    def chat_of(update: Update) -> Optional[Tuple[int, int]]:
+        if update.message and update.message.from_user:
+            return update.message.chat.id, update.message.from_user.id
+        query = update.callback_query
+        if query and query.message:
+            return query.message.chat.id, query.from_user.id
+        return None
+
+    async def handle(msg: dict) -> None:
+        reply = {"ack": msg["id"]}
+        try:
+            if msg["kind"] == "update":
+                update = Update.model_validate(msg["data"], context={"bot": bot})
+                try:
+                    await asyncio.wait_for(dp.feed_update(bot, update), UPDATE_TIMEOUT)
+                finally:
+                    chat = chat_of(update)
+                    if chat is not None:
+                        state = await dp.fsm.get_context(bot=bot, chat_id=chat[0], user_id=chat[1]).get_state()
+                        reply.update(chat=chat[0], user=chat[1], state=state is not None)
+            elif msg["kind"] == "event":
+                data = msg["data"]
+                # ack — только когда обработчики отработали, иначе основной процесс сочтёт событие доставленным
+                handlers = pm.events.emit(EVENT_CLASSES[data.pop("type")](**data))
+                if handlers:
+                    await asyncio.wait(handlers)
+        except Exception as e:
+            logger.error(f"❌ {module_name}: ошибка обработки {msg.get('kind')}: {e}", exc_info=True)
+        finally:
+            out.write(json_codec.dumpb(reply) + b"\n")
+
+    tasks = set()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break  # основной процесс закрыл канал
+        task = loop.create_task(handle(json_codec.loads(line)))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await bot.session.close()
+
+
+def _worker_entry() -> None:
+    plugins_dir, module_name = sys.argv[1], sys.argv[2]
+    # stdout — канал протокола; print() плагина уходит в stderr, чтобы не ломать его
+    proto_fd = os.dup(1)
+    os.dup2(2, 1)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format=f"%(asctime)s │ [{module_name}] %(message)s", datefmt="%H:%M:%S")
+    asyncio.run(worker_main(plugins_dir, module_name, proto_fd))
+
+
+if __name__ == "__main__":
+    _worker_entry()
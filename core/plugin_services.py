@@ -0,0 +1,180 @@
+"""
+Общие ресурсы для плагинов. PluginManager кладёт их в context, который получают
+attach / register / Plugin:
+
+  context["starvell"]   — общий асинхронный клиент StarVell (пул соединений и лимит запросов
+                          на процесс); всегда для текущей сессии, смена через reinit_account
+                          подхватывается без перезапуска
+  context["db"]         — база бота (tg_bot/database.py)
+  context["scheduler"]  — периодические и отложенные задачи; снимаются при выгрузке плагина
+  context["cache"]      — общий LRU-кэш с TTL и ограничением размера
+  context["kv"]         — kv("имя_плагина") → хранилище ключ-значение плагина в базе бота
+
+Плагинам не нужно заводить свои HTTP-сессии, искать session в файлах и писать свои JSON.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from core.starvell_client import StarVellClient, get_client
+
+logger = logging.getLogger("StarVell.PluginServices")
+
+CACHE_MAX_ITEMS = 4096
+CACHE_TTL = 600.0
+
+Job = Callable[[], Union[None, Awaitable[None]]]
+
+
+class SharedStarVellClient:
+    """Прокси на get_client(текущая сессия): ссылку можно хранить, сессия берётся при каждом вызове."""
+
+    def __init__(self, nexus) -> None:
+        self._nexus = nexus
+
+    @property
+    def session_id(self) -> str:
+        return self._nexus.settings.starvell.session_id
+
+    @property
+    def client(self) -> StarVellClient:
+        return get_client(self.session_id)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class TTLCache:
+    """LRU с временем жизни записей: при переполнении вытесняются самые давно использованные."""
+
+    def __init__(self, max_items: int = CACHE_MAX_ITEMS, ttl: float = CACHE_TTL) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]],
+                         ttl: Optional[float] = None) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = await factory()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self, prefix: Optional[str] = None) -> None:
+        """Всё или только ключи-кортежи, начинающиеся с prefix (например, имя плагина)."""
+        if prefix is None:
+            self._data.clear()
+            return
+        for key in [k for k in self._data if isinstance(k, tuple) and k and k[0] == prefix]:
+            del self._data[key]
+
+
+class Scheduler:
+    """Задачи плагинов на общем цикле; owner — ключ плагина, по нему задачи снимаются при выгрузке."""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[str, Set[asyncio.Task]] = {}
+
+    def _spawn(self, owner: str, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        tasks = self._tasks.setdefault(owner, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+
+    @staticmethod
+    async def _run_job(owner: str, job: Job) -> None:
+        try:
+            result = job()
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Задача плагина {owner}: {e}", exc_info=True)
+
+    def every(self, owner: str, interval: float, job: Job, first_delay: Optional[float] = None) -> asyncio.Task:
+        """Запускать job раз в interval секунд (первый раз — через first_delay, по умолчанию interval)."""
+        async def loop():
+            await asyncio.sleep(interval if first_delay is None else first_delay)
+            while True:
+                await self._run_job(owner, job)
+                await asyncio.sleep(interval)
+        return self._spawn(owner, loop())
+
+    def later(self, owner: str, delay: float, job: Job) -> asyncio.Task:
+        async def once():
+            await asyncio.sleep(delay)
+            await self._run_job(owner, job)
+        return self._spawn(owner, once())
+
+    def cancel(self, owner: str) -> int:
+        tasks = self._tasks.pop(owner, set())
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def jobs(self, owner: str) -> List[asyncio.Task]:
+        return [t for t in self._tasks.get(owner, ()) if not t.done()]
+
+
+class PluginKV:
+    """Ключ-значение плагина в таблице plugin_kv базы бота; значения — любые JSON-совместимые."""
+
+    def __init__(self, db, namespace: str) -> None:
+        self.db = db
+        self.namespace = namespace
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return await self.db.kv_get(self.namespace, key, default)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.db.kv_set(self.namespace, key, value)
+
+    async def delete(self, key: str) -> bool:
+        return await self.db.kv_delete(self.namespace, key)
+
+    async def items(self) -> Dict[str, Any]:
+        return await self.db.kv_items(self.namespace)
+
+
+def build_services(nexus) -> Dict[str, Any]:
+    """Ресурсы для context плагинов; db — None, пока Telegram-бот не создан."""
+    db = getattr(getattr(nexus, "telegram", None), "db", None)
+    return {
+        "starvell": SharedStarVellClient(nexus),
+        "db": db,
+        "scheduler": Scheduler(),
+        "cache": TTLCache(),
+        "kv": (lambda namespace: PluginKV(db, namespace)) if db is not None else None,
+    }
@@ -0,0 +1,255 @@
+import asyncio
+import bisect
+import logging
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import aiohttp
+
+from Utils import json_codec
+from core.starvell_client import BASE_URL, USER_AGENT, RateLimiter
+
+logger = logging.getLogger("StarVell.PriceScanner")
+
+CONCURRENCY = 16
+RATE = 20.0
+CHUNK_SIZE = 16 * 1024
+LADDER_DEPTH = 50
+NEXT_DATA_ID = "__NEXT_DATA__"
+
+
+@dataclass
+class PriceLadder:
+    """
+    Цены конкурентов в категории: по подкатегории (0 — без подкатегории) отсортированный
+    array('d') из первых LADDER_DEPTH цен. Наши лоты (по продавцу и по ID лота) в лестницу не попадают.
+    """
+    category_id: int
+    prices: Dict[int, array] = field(default_factory=dict)
+    total: int = 0
+    etag: str = ""
+    fetched_at: float = 0.0
+
+    def cheapest(self, sub_id: Optional[int] = None) -> Optional[float]:
+        prices = self.prices.get(sub_id or 0)
+        return prices[0] if prices else None
+
+    def position(self, price: float, sub_id: Optional[int] = None) -> int:
+        """Место цены среди конкурентов (0 — дешевле всех)."""
+        return bisect.bisect_left(self.prices.get(sub_id or 0, ()), price)
+
+
+def _walk_offers(node: Any, depth: int = 0) -> Iterator[Dict[str, Any]]:
+    """Ищет в JSON страницы словари, похожие на лоты (есть id и price)."""
+    if depth > 12:
+        return
+    if isinstance(node, dict):
+        if "price" in node and "id" in node:
+            yield node
+            return
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk_offers(value, depth + 1)
+    elif isinstance(node, list):
+        for value in node:
+            if isinstance(value, (dict, list)):
+                yield from _walk_offers(value, depth + 1)
+
+
+OfferTuple = Tuple[int, float, Any, str]
+
+
+def _offer_tuple(offer: Dict[str, Any]) -> Optional[OfferTuple]:
+    """(sub_id, price, seller_id, offer_id) или None для неактивных и кривых записей."""
+    if offer.get("isActive") is False:
+        return None
+    try:
+        price = float(offer["price"])
+    except (TypeError, ValueError):
+        return None
+    sub = offer.get("subCategory") if isinstance(offer.get("subCategory"), dict) else {}
+    user = offer.get("user") if isinstance(offer.get("user"), dict) else {}
+    seller = offer.get("userId") or user.get("id")
+    return int(offer.get("subCategoryId") or sub.get("id") or 0), price, seller, str(offer.get("id") or "")
+
+
+def build_ladder(category_id: int, offers: Iterable[OfferTuple],
+                 exclude_sellers: Collection[str] = (), exclude_offers: Collection[str] = ()) -> PriceLadder:
+    """
+    exclude_sellers — ID наших продавцов (строками), exclude_offers — ID наших лотов из зеркал
+    всех аккаунтов: у запасных data-price записей продавца может не быть, а ID лота есть всегда.
+    """
+    grouped: Dict[int, List[float]] = {}
+    total = 0
+    for sub_id, price, seller, offer_id in offers:
+        if offer_id in exclude_offers or (seller is not None and str(seller) in exclude_sellers):
+            continue
+        grouped.setdefault(sub_id, []).append(price)
+        total += 1
+    prices = {sub_id: array("d", sorted(values)[:LADDER_DEPTH]) for sub_id, values in grouped.items()}
+    return PriceLadder(category_id=category_id, prices=prices, total=total, fetched_at=time.time())
+
+
+class PageParser:
+    """
+    Потоковый разбор страницы категории: HTML скармливается lxml кусками по мере загрузки,
+    как только закрылся <script id="__NEXT_DATA__">, дальше не читаем. Запасной путь для
+    серверной вёрстки — элементы с data-price. Экземпляры переиспользуются через пул.
+    """
+
+    def __init__(self) -> None:
+        # lxml нужен только при обходе цен — импорт на первом парсере, а не при запуске бота
+        from lxml import etree
+
+        self._parser = etree.HTMLPullParser(events=("end",), tag="script", recover=True)
+        self._syntax_error = etree.XMLSyntaxError
+
+    def feed(self, chunk: bytes) -> Optional[List[OfferTuple]]:
+        """Возвращает лоты, как только они найдены, иначе None."""
+        self._parser.feed(chunk)
+        for _event, el in self._parser.read_events():
+            if el.tag == "script" and el.get("id") == NEXT_DATA_ID:
+                try:
+                    data = json_codec.loads(el.text or "")
+                except json_codec.JSONDecodeError:
+                    return []
+                return [t for t in map(_offer_tuple, _walk_offers(data)) if t]
+        return None
+
+    def finish(self) -> List[OfferTuple]:
+        """Конец документа без __NEXT_DATA__ — собираем data-price атрибуты."""
+        try:
+            root = self._parser.close()
+        except self._syntax_error:
+            return []
+        if root is None:
+            return []
+        offers = []
+        for el in root.iterfind(".//*[@data-price]"):
+            t = _offer_tuple({"id": el.get("data-offer-id", ""), "price": el.get("data-price"),
+                              "subCategoryId": el.get("data-subcategory-id"), "userId": el.get("data-user-id")})
+            if t:
+                offers.append(t)
+        return offers
+
+    def reset(self) -> None:
+        try:
+            self._parser.close()
+        except self._syntax_error:
+            pass
+        for _ in self._parser.read_events():
+            pass
+
+
+class PriceScanner:
+    """Параллельный обход страниц категорий с ограничением частоты и кэшем по ETag."""
+
+    def __init__(self, base_url: str = BASE_URL, concurrency: int = CONCURRENCY, rate: float = RATE,
+                 timeout: float = 20.0) -> None:
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate, burst=concurrency)
+        self.timeout = timeout
+        self.ladders: Dict[int, PriceLadder] = {}
+        self.exclude_sellers: Set[str] = set()
+        self.exclude_offers: Set[str] = set()
+        self._parsers: List[PageParser] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=self.base_url,
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html"},
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ------------------------------------------------------------------
+
+    async def fetch(self, category_id: int, path: str) -> PriceLadder:
+        cached = self.ladders.get(category_id)
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+
+        await self.limiter.acquire()
+        parser = self._parsers.pop() if self._parsers else PageParser()
+        try:
+            async with self._get_session().get(path, headers=headers) as resp:
+                if resp.status == 304 and cached:
+                    cached.fetched_at = time.time()
+                    return cached
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status}")
+
+                offers = None
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    offers = parser.feed(chunk)
+                    if offers is not None:
+                        break
+                if offers is None:
+                    offers = parser.finish()
+                ladder = build_ladder(category_id, offers, self.exclude_sellers, self.exclude_offers)
+                ladder.etag = resp.headers.get("ETag", "")
+        finally:
+            parser.reset()
+            self._parsers.append(parser)
+
+        self.ladders[category_id] = ladder
+        return ladder
+
+    async def scan(self, targets: Dict[int, str]) -> Dict[int, str]:
+        """targets: {category_id: путь страницы}. Возвращает {category_id: ошибка}."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        errors: Dict[int, str] = {}
+
+        async def one(category_id: int, path: str):
+            async with semaphore:
+                try:
+                    await self.fetch(category_id, path)
+                except Exception as e:
+                    errors[category_id] = str(e) or type(e).__name__
+
+        started = time.monotonic()
+        await asyncio.gather(*(one(c, p) for c, p in targets.items()))
+        logger.info("🔎 Цены: %s категорий за %.1f с, ошибок %s",
+                    len(targets), time.monotonic() - started, len(errors))
+        return errors
+
+
+@dataclass
+class RepriceRule:
+    """Ставим цену на delta ниже самого дешёвого конкурента, но не ниже floor (и не выше ceiling)."""
+    delta: float = 1.0
+    floor: float = 0.0
+    ceiling: Optional[float] = None
+    enabled: bool = True
+
+    def target(self, ladder: PriceLadder, sub_id: Optional[int]) -> Optional[float]:
+        cheapest = ladder.cheapest(sub_id)
+        if cheapest is None:
+            return None
+        price = max(round(cheapest - self.delta, 2), self.floor)
+        if self.ceiling is not None:
+            price = min(price, self.ceiling)
+        return price if price > 0 else None
+
+
+def plan_reprice(offers: Iterable[Dict[str, Any]], ladder: PriceLadder,
+                 rule: RepriceRule) -> Dict[str, Dict[str, Any]]:
+    """{offer_id: {'price': новая}} для наших активных лотов, чья цена отличается от целевой."""
+    changes = {}
+    for offer in offers:
+        if not offer.get("is_active"):
+            continue
+        target = rule.target(ladder, offer.get("subcategory_id"))
+        if target is not None and abs(target - float(offer["price"])) >= 0.01:
+            changes[offer["id"]] = {"price": target}
+    return changes
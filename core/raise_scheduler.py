@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import logging
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from Utils import json_codec
+
+logger = logging.getLogger("StarVell.RaiseScheduler")
+
+SCHEDULE_PATH = "storage/raise_schedule.json"
+BATCH_WINDOW = 5.0      # поднятия, наступающие в пределах окна, отправляются одной пачкой
+RETRY_DELAY = 600.0     # после ошибки без cooldown от сервера
+RESTART_STAGGER = 2.0   # просроченные после перезапуска разносятся с этим шагом
+IDLE_WAIT = 3600.0
+
+
+class RaiseScheduler:
+    """
+    Поднятие лотов по категориям. Время следующего поднятия каждой категории лежит в куче,
+    цикл спит до ближайшего и не опрашивает остальные. Устаревшие записи кучи отбрасываются
+    при извлечении (сверка с self.due), поэтому перенос — O(log n) без удаления из кучи.
+
+    raise_fn(category_id) -> (ok, data, cooldown | None); cooldown сервера важнее интервала.
+    """
+
+    def __init__(self, raise_fn: Callable[[int], Awaitable[Tuple[bool, Dict[str, Any], Optional[float]]]],
+                 interval: Callable[[], float], enabled: Callable[[], bool],
+                 path: str = SCHEDULE_PATH) -> None:
+        self.raise_fn = raise_fn
+        self.interval = interval
+        self.enabled = enabled
+        self.path = path
+        self.due: Dict[int, float] = {}
+        self.last_raised: Dict[int, float] = {}
+        self.listeners: List[Callable[[List[int]], Any]] = []
+        self._heap: List[Tuple[float, int]] = []
+        self._wakeup = asyncio.Event()
+        self._load()
+
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            data = json_codec.load_file(self.path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("⚠️ Не удалось прочитать %s: %s", self.path, e)
+            return
+        now = time.time()
+        overdue = 0
+        for cat_id, due in sorted(((int(k), float(v)) for k, v in (data.get("due") or {}).items()),
+                                  key=lambda item: item[1]):
+            if due < now:
+                due = now + overdue * RESTART_STAGGER
+                overdue += 1
+            self._schedule(cat_id, due, save=False)
+        self.last_raised = {int(k): float(v) for k, v in (data.get("last_raised") or {}).items()}
+
+    def _save(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        json_codec.dump_file(self.path, {
+            "due": {str(k): v for k, v in self.due.items()},
+            "last_raised": {str(k): v for k, v in self.last_raised.items()},
+        })
+
+    def _schedule(self, category_id: int, due: float, save: bool = True) -> None:
+        self.due[category_id] = due
+        heapq.heappush(self._heap, (due, category_id))
+        if save:
+            self._save()
+        self._wakeup.set()
+
+    def set_categories(self, category_ids: Iterable[int]) -> None:
+        """Набор категорий, где у нас есть активные лоты. Новые — в очередь сразу, пропавшие — убираются."""
+        wanted = {int(c) for c in category_ids if c is not None}
+        changed = False
+        for cat_id in set(self.due) - wanted:
+            del self.due[cat_id]
+            changed = True
+        now = time.time()
+        for cat_id in sorted(wanted - set(self.due)):
+            last = self.last_raised.get(cat_id, 0.0)
+            self._schedule(cat_id, max(now, last + self.interval()), save=False)
+            changed = True
+        if changed:
+            self._save()
+
+    def raise_now(self, category_id: int) -> None:
+        if category_id in self.due:
+            self._schedule(category_id, time.time())
+
+    def reschedule(self) -> None:
+        """Сменился интервал: поднятые категории переносятся на last_raised + новый интервал."""
+        now = time.time()
+        for cat_id in list(self.due):
+            if cat_id in self.last_raised:
+                self._schedule(cat_id, max(now, self.last_raised[cat_id] + self.interval()), save=False)
+        self._save()
+
+    def wake(self) -> None:
+        """Пересчитать ожидание (например, auto_raise включили в конфиге)."""
+        self._wakeup.set()
+
+    def schedule(self) -> List[Tuple[float, int]]:
+        """(время следующего поднятия, category_id) по возрастанию."""
+        return sorted((due, cat_id) for cat_id, due in self.due.items())
+
+    # ------------------------------------------------------------------
+
+    def _pop_due(self, now: float) -> List[int]:
+        """Все категории, чьё время наступит в пределах BATCH_WINDOW."""
+        batch = []
+        while self._heap and self._heap[0][0] <= now + BATCH_WINDOW:
+            due, cat_id = heapq.heappop(self._heap)
+            if self.due.get(cat_id) == due:  # иначе запись устарела
+                batch.append(cat_id)
+        return batch
+
+    def _next_due(self) -> Optional[float]:
+        while self._heap and self.due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                next_due = self._next_due()
+                timeout = IDLE_WAIT if next_due is None else max(0.0, next_due - time.time())
+                if timeout > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                        continue  # расписание изменилось — пересчитать
+                    except asyncio.TimeoutError:
+                        pass
+                if not self.enabled():
+                    # выключено в конфиге: ждём, не сжигая расписание; включение будит через wake()
+                    self._wakeup.clear()
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._wakeup.wait(), min(IDLE_WAIT, self.interval()))
+                    continue
+                batch = self._pop_due(time.time())
+                if batch:
+                    # не раньше самого позднего в пачке — иначе упрёмся в cooldown
+                    latest = max(self.due[c] for c in batch)
+                    await asyncio.sleep(max(0.0, latest - time.time()))
+                    await self._raise_batch(batch)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("⚠️ Планировщик поднятия: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _raise_batch(self, batch: List[int]) -> None:
+        results = await asyncio.gather(*(self.raise_fn(c) for c in batch), return_exceptions=True)
+        now = time.time()
+        raised = []
+        for cat_id, result in zip(batch, results):
+            if isinstance(result, Exception):
+                ok, data, cooldown = False, {"error": str(result)}, None
+            else:
+                ok, data, cooldown = result
+            if ok:
+                raised.append(cat_id)
+                self.last_raised[cat_id] = now
+                delay = max(cooldown or 0.0, self.interval())
+            else:
+                delay = cooldown if cooldown else RETRY_DELAY
+                logger.debug("raise %s: %s (повтор через %.0f с)", cat_id, data.get("error"), delay)
+            if cat_id in self.due:
+                self._schedule(cat_id, now + delay, save=False)
+        self._save()
+
+        if raised:
+            logger.info("⬆️ Подняты лоты в категориях: %s", ", ".join(map(str, raised)))
+            for listener in self.listeners:
+                try:
+                    res = listener(raised)
+                    if asyncio.iscoroutine(res):
+                        await res
+                except Exception as e:
+                    logger.error("❌ Обработчик поднятия лотов: %s", e)
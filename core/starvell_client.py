@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from Utils import json_codec
+
+logger = logging.getLogger("StarVell.StarVellClient")
+
+BASE_URL = "https://starvell.com"
+USER_AGENT = "StarVellBot/1.0"
+OFFERS_CREATE_PATH = "/api/offers/create"
+OFFERS_LIST_PATH = "/api/offers/list-my"
+OFFERS_UPDATE_PATH = "/api/offers/update"
+OFFERS_RAISE_PATH = "/api/offers/raise"
+
+
+MAX_RETRY_WAIT = 60.0
+SHARED_CONNECTIONS = 32  # на все аккаунты процесса; у каждого клиента свой предел max_connections
+
+_connector: Optional[aiohttp.TCPConnector] = None
+
+
+def shared_connector() -> aiohttp.TCPConnector:
+    """
+    Один пул TCP/TLS на все сессии: keep-alive соединения, DNS-кэш и SSL-контекст не
+    дублируются на каждый аккаунт. Cookie session живёт в ClientSession, а не в соединении.
+    """
+    global _connector
+    if _connector is None or _connector.closed:
+        _connector = aiohttp.TCPConnector(limit=SHARED_CONNECTIONS, ttl_dns_cache=300)
+    return _connector
+
+
+def retry_after(headers) -> Optional[float]:
+    value = (headers or {}).get("Retry-After")
+    return float(value) if value and value.isdigit() else None
+
+
+class RateLimiter:
+    """Token bucket: не больше `rate` запросов в секунду, всплеск до `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class StarVellClient:
+    """
+    Асинхронный клиент StarVell с пулом соединений и ограничением частоты запросов.
+    Один экземпляр на session_id — см. get_client(); TCP-пул общий для всех (shared_connector).
+    """
+
+    def __init__(self, session_id: str, rate: float = 8.0, burst: int = 8,
+                 max_connections: int = 8, timeout: float = 30.0, retries: int = 3) -> None:
+        self.session_id = session_id
+        self.limiter = RateLimiter(rate, burst)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.retries = retries
+        self._slots = asyncio.Semaphore(max_connections)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    # ------------------------------------------------------------------
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=BASE_URL,
+                connector=shared_connector(),
+                connector_owner=False,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                },
+                cookies={"session": self.session_id} if self.session_id else None,
+                json_serialize=json_codec.dumps,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ------------------------------------------------------------------
+
+    async def _send(self, method: str, path: str, **kwargs) -> Tuple[int, Any, Any]:
+        """Один запрос с учётом лимита, без повторов. Возвращает (status, json | text, headers)."""
+        await self.limiter.acquire()
+        async with self._slots, self._get_session().request(method, path, **kwargs) as resp:
+            raw = await resp.read()
+            try:
+                body = json_codec.loads(raw) if raw else None
+            except json_codec.JSONDecodeError:
+                body = raw.decode("utf-8", "replace")
+            return resp.status, body, resp.headers
+
+    async def request(self, method: str, path: str, **kwargs) -> Tuple[int, Any]:
+        """
+        Выполняет запрос с учётом лимита. На 429/5xx — повтор с паузой (Retry-After или экспонента).
+        Паузы длиннее MAX_RETRY_WAIT не ждём — сразу возвращаем ответ.
+        Возвращает (status, json | text). Сетевые ошибки после всех попыток пробрасываются.
+        """
+        delay = 1.0
+        for attempt in range(1, self.retries + 1):
+            try:
+                status, body, headers = await self._send(method, path, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries:
+                    raise
+                logger.warning("⏳ %s %s: %s, повтор через %.1f с", method, path, e, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+
+            if (status == 429 or status >= 500) and attempt < self.retries:
+                wait = retry_after(headers) or delay
+                if wait <= MAX_RETRY_WAIT:
+                    logger.warning("⏳ %s %s → HTTP %s, повтор через %.1f с", method, path, status, wait)
+                    await asyncio.sleep(wait)
+                    delay *= 2
+                    continue
+            return status, body
+        raise RuntimeError("unreachable")
+
+    async def _post_json(self, path: str, payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """POST с разбором ошибки в формате CreateLotPro._post_create: (ok, data | {'error': ...})."""
+        if not self.session_id:
+            return False, {"error": "SESSION_NOT_FOUND (нет session в configs/_main.cfg)"}
+        try:
+            status, body = await self.request("POST", path, json=payload)
+        except Exception as e:  # noqa: BLE001
+            return False, {"error": str(e)}
+
+        if 200 <= status < 300:
+            return True, body if isinstance(body, dict) else {"data": body}
+        if isinstance(body, dict):
+            detailed_error = f"HTTP {status}: {body.get('message', 'No message')}"
+            if body.get("data"):
+                detailed_error += f"\nDATA: {json_codec.dumps(body['data'])}"
+            return False, {"error": detailed_error}
+        return False, {"error": f"HTTP {status}: {body}"}
+
+    async def create_offer(self, payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        return await self._post_json(OFFERS_CREATE_PATH, payload)
+
+    async def update_offer(self, offer_id: str, changes: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """Частичное изменение лота: price / availability / isActive."""
+        return await self._post_json(OFFERS_UPDATE_PATH, {"id": offer_id, **changes})
+
+    async def raise_offers(self, category_id: int) -> Tuple[bool, Dict[str, Any], Optional[float]]:
+        """
+        Поднятие лотов категории. Третий элемент — через сколько секунд можно снова
+        (из Retry-After или полей ответа), если сервер его сообщил.
+        """
+        if not self.session_id:
+            return False, {"error": "SESSION_NOT_FOUND (нет session в configs/_main.cfg)"}, None
+        try:
+            status, body, headers = await self._send("POST", OFFERS_RAISE_PATH, json={"categoryId": category_id})
+        except Exception as e:  # noqa: BLE001
+            return False, {"error": str(e)}, None
+
+        data = body if isinstance(body, dict) else {"data": body}
+        cooldown = retry_after(headers)
+        for key in ("cooldown", "retryAfter", "secondsLeft", "nextRaiseIn"):
+            value = data.get(key)
+            if cooldown is None and isinstance(value, (int, float)) and value > 0:
+                cooldown = float(value)
+                break
+        if cooldown is None and isinstance(data.get("nextRaiseAt"), (int, float)):
+            # unix-время в секундах или миллисекундах
+            next_at = data["nextRaiseAt"] / (1000 if data["nextRaiseAt"] > 1e11 else 1)
+            cooldown = max(0.0, next_at - time.time())
+
+        if 200 <= status < 300:
+            return True, data, cooldown
+        return False, {"error": f"HTTP {status}: {data.get('message', body)}"}, cooldown
+
+    async def list_offers(self, user_id: Optional[int] = None, page_size: int = 100,
+                          max_pages: int = 100) -> List[Dict[str, Any]]:
+        """Все лоты продавца постранично. Ошибка ответа — RuntimeError (частичный список не возвращается)."""
+        offers: List[Dict[str, Any]] = []
+        for page in range(max_pages):
+            body_json = {"offset": page * page_size, "limit": page_size}
+            if user_id is not None:
+                body_json["userId"] = user_id
+            status, body = await self.request("POST", OFFERS_LIST_PATH, json=body_json)
+            if not 200 <= status < 300:
+                raise RuntimeError(f"HTTP {status}: {body}")
+
+            if isinstance(body, dict):
+                items = body.get("items") or body.get("offers") or body.get("data") or []
+            else:
+                items = body or []
+            offers.extend(items)
+            if len(items) < page_size:
+                break
+        else:
+            # короткой страницы не было — лотов больше, чем max_pages * page_size; обрезанный список
+            # OffersMirror принял бы за полный и удалил бы остальное
+            raise RuntimeError(f"больше {max_pages * page_size} лотов: увеличьте max_pages")
+        return offers
+
+
+_clients: Dict[str, StarVellClient] = {}
+
+
+def get_client(session_id: str) -> StarVellClient:
+    """Общий клиент для session_id (пул соединений и лимит делятся между всеми пользователями)."""
+    client = _clients.get(session_id)
+    if client is None:
+        client = _clients[session_id] = StarVellClient(session_id)
+    return client
+
+
+async def close_client(session_id: str) -> None:
+    """Закрыть пул старой сессии (после смены session через reinit_account)."""
+    client = _clients.pop(session_id, None)
+    if client is not None:
+        await client.close()
+
+
+async def close_all() -> None:
+    global _connector
+    for client in list(_clients.values()):
+        await client.close()
+    _clients.clear()
+    if _connector is not None:
+        await _connector.close()
+        _connector = None
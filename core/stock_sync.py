@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from Utils import json_codec
+from core.bulk_edit import push_changes
+
+logger = logging.getLogger("StarVell.StockSync")
+
+LINKS_PATH = "storage/stock_links.json"
+DEBOUNCE = 3.0
+MAX_DELAY = 30.0
+CONCURRENCY = 8
+RETRY_DELAY = 10.0   # первая пауза перед повтором неудачной отправки, дальше — вдвое
+MAX_RETRY_DELAY = 600.0
+
+
+class StockSync:
+    """
+    Связывает товары автовыдачи с лотами: наличие лота = остаток товара.
+    На нуле лот выключается, после пополнения включается обратно — но только если выключали мы,
+    лоты, выключенные вручную, не трогаем.
+
+    Изменения остатков копятся в mark_dirty() и отправляются одной пачкой после паузы DEBOUNCE
+    (не дольше MAX_DELAY с первого изменения), поэтому загрузка тысячи ключей — один запрос на лот.
+    Товары, чьи лоты не удалось обновить, возвращаются в очередь и повторяются с растущей паузой.
+    Лот, привязанный к нескольким товарам, получает сумму их остатков.
+    """
+
+    def __init__(self, counts: Callable[[], Awaitable[Dict[str, int]]], mirror, client_getter: Callable[[], Any],
+                 notify: Optional[Callable[[str, str], Awaitable[None]]] = None,
+                 path: str = LINKS_PATH, debounce: float = DEBOUNCE) -> None:
+        self.counts = counts
+        self.mirror = mirror
+        self.client_getter = client_getter
+        self.notify = notify
+        self.path = path
+        self.debounce = debounce
+
+        self.links: Dict[str, List[str]] = {}
+        self.auto_disabled: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._first_mark = 0.0
+        self._last_mark = 0.0
+        self._retry_at = 0.0
+        self._retry_delay = 0.0
+        self._wakeup = asyncio.Event()
+        self._load()
+
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        try:
+            data = json_codec.load_file(self.path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning("⚠️ Не удалось прочитать %s: %s", self.path, e)
+            return
+        self.links = {k: [str(i) for i in v] for k, v in (data.get("links") or {}).items()}
+        self.auto_disabled = set(map(str, data.get("auto_disabled") or []))
+
+    def _save(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        json_codec.dump_file(self.path, {"links": self.links, "auto_disabled": sorted(self.auto_disabled)}, pretty=True)
+
+    def link(self, product: str, offer_ids: List[str]) -> None:
+        current = self.links.setdefault(product, [])
+        current.extend(str(i) for i in offer_ids if str(i) not in current)
+        self._save()
+        self.mark_dirty(product)
+
+    def unlink(self, product: str, offer_ids: Optional[List[str]] = None) -> int:
+        current = self.links.get(product, [])
+        removed = [i for i in current if offer_ids is None or i in map(str, offer_ids)]
+        remaining = [i for i in current if i not in removed]
+        if remaining:
+            self.links[product] = remaining
+        else:
+            self.links.pop(product, None)
+        self.auto_disabled.difference_update(removed)
+        self._save()
+        return len(removed)
+
+    # ------------------------------------------------------------------
+
+    def mark_dirty(self, product: str) -> None:
+        """Слушатель Database.autodelivery_listeners."""
+        if product not in self.links:
+            return
+        now = time.monotonic()
+        if not self._dirty:
+            self._first_mark = now
+        self._last_mark = now
+        self._dirty.add(product)
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Стартовая сверка всех связок, затем — отложенная отправка по mark_dirty()."""
+        try:
+            await self.flush(list(self.links))
+        except Exception as e:
+            logger.warning("⚠️ Стартовая сверка остатков не удалась: %s", e)
+
+        while True:
+            try:
+                await self._wakeup.wait()
+                while True:
+                    now = time.monotonic()
+                    due = max(min(self._last_mark + self.debounce, self._first_mark + MAX_DELAY), self._retry_at)
+                    if now >= due:
+                        break
+                    await asyncio.sleep(due - now)
+                self._wakeup.clear()
+                products, self._dirty = list(self._dirty), set()
+                await self.flush(products)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("⚠️ Синхронизация остатков не удалась: %s", e)
+
+    async def flush(self, products: List[str]) -> Dict[str, str]:
+        """Приводит лоты указанных товаров к текущим остаткам. Возвращает {offer_id: ошибка}."""
+        if not products:
+            return {}
+        counts = await self.counts()
+        offer_products = self._offer_products()
+        plan: Dict[str, Dict[str, Any]] = {}
+        reasons: Dict[str, str] = {}
+        for offer_id in dict.fromkeys(i for product in products for i in self.links.get(product, [])):
+            offer = await self.mirror.get_offer(offer_id)
+            if offer is None:
+                continue
+            linked = offer_products[offer_id]
+            stock = sum(counts.get(product, 0) for product in linked)
+            changes: Dict[str, Any] = {}
+            if offer["availability"] != stock:
+                changes["availability"] = stock
+            if stock <= 0 and offer["is_active"]:
+                changes["isActive"] = False
+            elif stock > 0 and not offer["is_active"] and offer_id in self.auto_disabled:
+                changes["isActive"] = True
+            if changes:
+                plan[offer_id] = changes
+                reasons[offer_id] = "», «".join(linked)
+
+        if not plan:
+            self._retry_delay = 0.0
+            return {}
+
+        client = self.client_getter()
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        errors: Dict[str, str] = {}
+
+        async def send(offer_id: str, changes: Dict[str, Any]):
+            async with semaphore:
+                error = await push_changes(client, self.mirror, offer_id, changes)
+            if error:
+                errors[offer_id] = error
+                return
+            if "isActive" not in changes:
+                return
+            offer = await self.mirror.get_offer(offer_id)
+            title = (offer or {}).get("title") or offer_id
+            if changes["isActive"]:
+                self.auto_disabled.discard(offer_id)
+                await self._notify("restore", f"♻️ Лот «{title}» снова активен: пополнен товар «{reasons[offer_id]}»")
+            else:
+                self.auto_disabled.add(offer_id)
+                await self._notify("deactivate", f"⛔️ Лот «{title}» выключен: закончился товар «{reasons[offer_id]}»")
+
+        await asyncio.gather(*(send(i, c) for i, c in plan.items()))
+        self._save()
+        logger.info("📦 Остатки: обновлено лотов %s, ошибок %s", len(plan) - len(errors), len(errors))
+        for offer_id, error in errors.items():
+            logger.warning("⚠️ Лот %s не обновлён: %s", offer_id, error)
+        if errors:
+            self._requeue({product for offer_id in errors for product in offer_products[offer_id]})
+        else:
+            self._retry_delay = 0.0
+        return errors
+
+    def _offer_products(self) -> Dict[str, List[str]]:
+        """offer_id → все товары, к которым привязан лот."""
+        index: Dict[str, List[str]] = {}
+        for product, offer_ids in self.links.items():
+            for offer_id in offer_ids:
+                index.setdefault(offer_id, []).append(product)
+        return index
+
+    def _requeue(self, products: Set[str]) -> None:
+        """Неудачные товары — обратно в очередь; следующая попытка не раньше чем через паузу."""
+        self._retry_delay = min(max(self._retry_delay * 2, RETRY_DELAY), MAX_RETRY_DELAY)
+        self._retry_at = time.monotonic() + self._retry_delay
+        for product in products:
+            self.mark_dirty(product)
+        logger.info("🔁 Повтор синхронизации %s через %.0f с", ", ".join(sorted(products)), self._retry_delay)
+
+    async def _notify(self, kind: str, text: str) -> None:
+        if self.notify is None:
+            return
+        try:
+            await self.notify(kind, text)
+        except Exception as e:
+            logger.debug("stock notify: %s", e)
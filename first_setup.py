@@ -116,7 +116,7 @@ def first_setup():
     config["StarVell"] = {"session_id": session_id}
     config["Telegram"] = {"bot_token": bot_token, "admin_id": admin_id, "notifications": "true", "password": password}
     config["Proxy"] = {"enable": "0", "check": "1", "login": "", "password": "", "ip": "", "port": ""}
-    config["Other"] = {"language": "ru", "log_level": "INFO"}
+    config["Other"] = {"language": "ru", "log_level": "INFO", "log_format": "text"}
     config["Updates"] = {"github_token": github_token, "auto_update": "0"}
     
     with open("configs/_main.cfg", "w", encoding="utf-8") as f:
@@ -1,21 +1,27 @@
 import asyncio
+import importlib
+import importlib.util
 import logging
-import logging.config
 import os
 import sys
 import hashlib
+import time
 from contextlib import suppress
+from typing import TYPE_CHECKING
+
+STARTED_AT = time.perf_counter()
+
+from Utils.startup import ImportProfiler, StartupTimings, profiling_requested
+
+# --profile-startup: ставится до остальных импортов, чтобы отчёт видел их все
+import_profiler = ImportProfiler().install() if profiling_requested() else None
 
 REQUIRED_PACKAGES = ["lxml", "bcrypt", "colorama", "aiogram"]
 
 
 def check_dependencies() -> None:
-    missing = []
-    for pkg in REQUIRED_PACKAGES:
-        try:
-            __import__(pkg)
-        except ImportError:
-            missing.append(pkg)
+    # find_spec только ищет пакет, не выполняя его: lxml, bcrypt и aiogram не импортируются ради проверки
+    missing = [pkg for pkg in REQUIRED_PACKAGES if importlib.util.find_spec(pkg) is None]
     if missing:
         print(f"[!] Не хватает: {', '.join(missing)}")
         print(f"    pip install {' '.join(missing)}")
@@ -27,7 +33,18 @@ check_dependencies()
 from colorama import Fore, Style, init as colorama_init
 colorama_init(autoreset=True)
 
-from Utils.updater import Updater
+from Utils.update_paths import JOURNAL_PATH
+
+# обновление, прерванное посреди перестановки файлов, откатывается до импорта остального кода;
+# сам updater (и aiohttp) грузится, только если журнал перестановки есть
+if os.path.exists(JOURNAL_PATH):
+    from Utils.updater import Updater
+    if Updater.recover_interrupted():
+        Updater.restart_bot()
+
+from Utils.settings import Settings, ConfigWatcher
+from Utils.logger import set_log_format, set_log_level
+from Utils.exceptions import StarVellBotException, ConfigParseError
 
 VERSION = "0.1.0-beta"
 
@@ -46,15 +63,16 @@ print(f"{Fore.RED}{Style.BRIGHT}v{VERSION}{Style.RESET_ALL}\n")
 
 import config_loader as cfg_loader
 from nexus import Nexus
-from tg_bot.aio_bot import AioTGBot
-from core.plugin_manager import PluginManager
 from StarVellAPI.account import Account as StarVellAPI
-from aiogram.types import BotCommand
+
+if TYPE_CHECKING:
+    from tg_bot.aio_bot import AioTGBot
+    from Utils.updater import Updater
 
 def setup_logging(level: str = "INFO"):
     try:
-        from Utils.logger import get_logger_config
-        logging.config.dictConfig(get_logger_config(level))
+        from Utils.logger import setup_logging as setup_queue_logging
+        setup_queue_logging(level)
     except Exception:
         logging.basicConfig(level=logging.INFO, format="%(asctime)s │ %(message)s", datefmt="%H:%M:%S")
     logging.raiseExceptions = False
@@ -63,79 +81,88 @@ setup_logging("INFO")
 logger = logging.getLogger("StarVell.Main")
 
 
-async def start_aiogram_bot(nexus: Nexus, cfg, context: dict) -> None:
-    def cfg_get(section: str, option: str, fallback=None):
-        if isinstance(cfg, dict):
-            return cfg.get(section, {}).get(option, fallback)
-        try:
-            return cfg.get(section, option, fallback=fallback)
-        except Exception:
-            return fallback
-
-    notifications_enabled = str(cfg_get("Telegram", "notifications", "true")).lower() in {"1", "true", "yes", "on"}
-    if not notifications_enabled:
+async def start_aiogram_bot(nexus: Nexus, settings: Settings, context: dict, timings: StartupTimings) -> None:
+    tg = settings.telegram
+    if not tg.notifications:
         logger.info("🤖 Telegram-бот отключён в конфигурации.")
+        timings.ready("Бот (без Telegram)")
         return
 
-    token = (cfg_get("Telegram", "bot_token", "") or "").strip()
-    admin_id_str = (cfg_get("Telegram", "admin_id", "0") or "0").strip()
-    password = (cfg_get("Telegram", "password", "") or "admin").strip()
-
-    # Поддержка нескольких админов через запятую
-    admin_ids = []
-    for part in admin_id_str.replace(" ", "").split(","):
-        try:
-            if part:
-                admin_ids.append(int(part))
-        except ValueError:
-            pass
-    
-    main_admin_id = admin_ids[0] if admin_ids else 0
+    token = tg.bot_token
+    password = tg.password
+    admin_ids = list(tg.admin_ids)
+    main_admin_id = tg.main_admin_id
 
     if not token or main_admin_id == 0:
         logger.warning("⚠️ Не задан Telegram токен или admin_id — бот не будет запущен.")
+        timings.ready("Бот (без Telegram)")
         return
 
-    password_md5 = hashlib.md5(password.encode()).hexdigest()
-    aio_bot = AioTGBot(token, main_admin_id, nexus, password_md5, admin_ids=admin_ids)
-    nexus.telegram = aio_bot
+    # aiogram (pydantic-модели всех типов Telegram) — самый дорогой импорт; в потоке,
+    # чтобы авторизация StarVell и остальной старт шли параллельно с ним
+    aio_bot_module = await timings.measure("импорт aiogram", asyncio.to_thread(importlib.import_module, "tg_bot.aio_bot"))
+    with timings.phase("Telegram-бот"):
+        password_md5 = hashlib.md5(password.encode()).hexdigest()
+        aio_bot = aio_bot_module.AioTGBot(token, main_admin_id, nexus, password_md5, admin_ids=admin_ids)
+        nexus.set_telegram(aio_bot)
 
     context["dispatcher"] = aio_bot.dp
     context["bot"] = aio_bot.bot
 
+    async def on_ready() -> None:
+        timings.ready()
+
+    aio_bot.dp.startup.register(on_ready)
+
+    # /start работает с базой — её ждём; плагины и меню команд догружаются уже при работающем боте
+    db_task = asyncio.create_task(timings.measure("база данных", aio_bot.init_db()))
+    plugins_task = asyncio.create_task(timings.measure("плагины", load_plugins(nexus, context, timings)))
+    commands_task = asyncio.create_task(timings.measure("меню команд", set_bot_commands(aio_bot)))
+    plugins_task.add_done_callback(log_task_error)
+    commands_task.add_done_callback(log_task_error)
+    await db_task
+
+    await aio_bot.run()  # plugins_task / commands_task живут, пока идёт polling
+
+
+def log_task_error(task: "asyncio.Task") -> None:
+    """done-callback фоновых задач старта: их никто не ждёт, иначе исключение потеряется."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("❌ Фоновая задача: %s", task.exception(), exc_info=task.exception())
+
+
+async def load_plugins(nexus: Nexus, context: dict, timings: StartupTimings) -> None:
+    from core.plugin_manager import PluginManager
+
     try:
         plugin_manager = PluginManager(context)
         nexus.plugin_manager = plugin_manager
+        timings.plugin_init = plugin_manager.init_times
         plugin_manager.load_plugins()
-
-        commands = [
-            BotCommand(command="start", description="Главное меню"),
-            BotCommand(command="update", description="Проверка обновлений"),
-        ]
-        await aio_bot.bot.set_my_commands(commands)
-        
-        logger.info("✅ Telegram бот готов")
+        plugin_manager.watch_task = asyncio.create_task(plugin_manager.watch())
     except Exception as e:
         logger.error("💥 Плагины: %s", e)
+    timings.save_profile()
 
-    await aio_bot.run()
 
+async def set_bot_commands(aio_bot: "AioTGBot") -> None:
+    from aiogram.types import BotCommand
 
-async def main() -> None:
-    MAIN_CFG = cfg_loader.load_or_setup_config()
-
+    commands = [
+        BotCommand(command="start", description="Главное меню"),
+        BotCommand(command="update", description="Проверка обновлений"),
+        BotCommand(command="logs", description="Хвост логов или поиск: /logs 100, /logs ошибка, /logs re:<regex>"),
+    ]
     try:
-        log_level = MAIN_CFG.get("Other", {}).get("log_level", "INFO").upper()
-    except Exception:
-        log_level = "INFO"
-    logging.getLogger().setLevel(log_level)
-    
-    github_token = MAIN_CFG.get("Updates", {}).get("github_token", "")
-    updater = Updater(VERSION, github_token if github_token else None)
-    
-    print(f"{Fore.CYAN}🔍 Проверка обновлений...{Style.RESET_ALL}")
+        await aio_bot.bot.set_my_commands(commands)
+    except Exception as e:
+        logger.warning("⚠️ Меню команд: %s", e)
+
+
+async def check_updates_background(updater: "Updater") -> None:
+    """Проверка обновлений в фоне: запуск бота её не ждёт."""
     update_info = await updater.check_updates()
-    
+
     if update_info.get("available"):
         print(f"\n{Fore.YELLOW}{'='*50}")
         print(f"🆕 НАЙДЕНО ОБНОВЛЕНИЕ: v{VERSION} → v{update_info['version']}")
@@ -153,7 +180,7 @@ async def main() -> None:
             print(f"🔄 Перезапуск через 3 секунды...")
             print(f"{'='*50}{Style.RESET_ALL}\n")
             await asyncio.sleep(3)
-            Updater.restart_bot()
+            updater.restart_bot()
         else:
             print(f"{Fore.RED}❌ Ошибка обновления. Продолжаю с текущей версией.{Style.RESET_ALL}\n")
     elif update_info.get("error"):
@@ -162,49 +189,83 @@ async def main() -> None:
     else:
         print(f"{Fore.GREEN}✓ Версия актуальна (v{VERSION}){Style.RESET_ALL}\n")
 
-    starvell_section = MAIN_CFG.get("StarVell", {})
-    session_id = (starvell_section.get("session") or starvell_section.get("session_id") or "").strip()
-    
-    try:
-        api = StarVellAPI(session_id=session_id) if session_id else None
-    except Exception as e:
-        logger.warning("⚠️ StarVellAPI: %s", e)
-        api = None
 
-    from Utils.exceptions import StarVellBotException
-
-    nexus = None
+async def authenticate(nexus: Nexus) -> None:
+    """get_profile синхронный — в потоке, чтобы не держать цикл событий (бот в это время уже стартует)."""
     try:
-        nexus = Nexus(MAIN_CFG, {}, {}, {}, VERSION).init()
+        await asyncio.to_thread(nexus.init)
     except StarVellBotException as e:
         logger.warning("⚠️ %s", e)
-        nexus = Nexus(MAIN_CFG, {}, {}, {}, VERSION)
         nexus.account = None
     except Exception as e:
         logger.error("💥 Nexus: %s", e)
-        nexus = Nexus(MAIN_CFG, {}, {}, {}, VERSION)
         nexus.account = None
 
-    if not hasattr(nexus, "plugins") or nexus.plugins is None:
-        nexus.plugins = {}
+
+async def main() -> None:
+    timings = StartupTimings(STARTED_AT, import_profiler)
+    MAIN_CFG = cfg_loader.load_or_setup_config()
+
+    try:
+        settings = Settings.from_dict(MAIN_CFG)
+    except ConfigParseError as e:
+        logger.critical("💥 Ошибка в configs/_main.cfg: %s", e)
+        sys.exit(1)
+
+    set_log_level(settings.other.log_level)
+    set_log_format(settings.other.log_format)
+    
+    from Utils.updater import Updater
+
+    github_token = settings.updates.github_token
+    updater = Updater(VERSION, github_token if github_token else None)
+    print(f"{Fore.CYAN}🔍 Проверка обновлений (в фоне)...{Style.RESET_ALL}")
+    update_task = asyncio.create_task(timings.measure("проверка обновлений", check_updates_background(updater)))
+
+    session_id = settings.starvell.session_id
+    
+    try:
+        api = StarVellAPI(session_id=session_id) if session_id else None
+    except Exception as e:
+        logger.warning("⚠️ StarVellAPI: %s", e)
+        api = None
+
+    nexus = Nexus(MAIN_CFG, {}, {}, {}, VERSION, settings=settings)
+    # [Account:<имя>]: каждый со своим Runner'ом, бот, плагины, каталог и HTTP-пул — общие
+    for account in settings.accounts:
+        nexus.add_account(account)
+    if settings.accounts:
+        logger.info("👥 Аккаунтов: %d (%s)", len(nexus.accounts), ", ".join(nexus.accounts))
 
     context: dict = {"config": MAIN_CFG, "nexus": nexus, "api": api}
     tg_task = None
 
-    try:
-        tg_task = asyncio.create_task(start_aiogram_bot(nexus, MAIN_CFG, context))
-        
-        runner_task = asyncio.create_task(run_event_runner(nexus))
+    nexus.config_watcher = ConfigWatcher(settings, nexus.apply_settings)
 
-        done, pending = await asyncio.wait(
-            [tg_task, runner_task],
-            return_when=asyncio.FIRST_EXCEPTION
-        )
+    try:
+        tg_task = asyncio.create_task(start_aiogram_bot(nexus, settings, context, timings))
+        watcher_task = asyncio.create_task(nexus.config_watcher.run())
+        tasks = [tg_task, watcher_task]
+
+        # аккаунты авторизуются параллельно; Runner каждого ждёт только своей авторизации
+        for name, peer in nexus.accounts.items():
+            phase = "авторизация StarVell" if peer is nexus else f"авторизация {name}"
+            auth_task = asyncio.create_task(timings.measure(phase, authenticate(peer)))
+            tasks += [
+                asyncio.create_task(run_event_runner(peer, auth_task)),
+                asyncio.create_task(after_auth(auth_task, peer.offers_mirror.run)),
+                asyncio.create_task(after_auth(auth_task, peer.run_raise_scheduler)),
+            ]
+
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
         
         for task in pending:
             task.cancel()
             with suppress(asyncio.CancelledError):
                 await task
+        update_task.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await update_task
 
     except asyncio.CancelledError:
         pass
@@ -212,9 +273,17 @@ async def main() -> None:
         logger.critical("💥 %s", e, exc_info=True)
 
 
-async def run_event_runner(nexus: Nexus):
+async def after_auth(auth_task: "asyncio.Task", start) -> None:
+    """Зеркало лотов и поднятие без сессии только упрутся в ошибку и уйдут в долгую паузу — ждём авторизации."""
+    await asyncio.wait([auth_task])
+    await start()
+
+
+async def run_event_runner(nexus: Nexus, auth_task: "asyncio.Task" = None):
     """Запускает Runner для получения событий StarVell"""
-    logger.info("🔄 Event Runner: ожидание активной сессии...")
+    logger.info("🔄 Event Runner [%s]: ожидание активной сессии...", nexus.name)
+    if auth_task is not None:
+        await asyncio.wait([auth_task])
     
     while True:
         try:
@@ -229,14 +298,14 @@ async def run_event_runner(nexus: Nexus):
                 account.runner = None
             nexus.runner = None
             
-            logger.info("🚀 Event Runner: запуск...")
+            logger.info("🚀 Event Runner [%s]: запуск...", nexus.name)
             await nexus.run()
             
         except asyncio.CancelledError:
-            logger.info("🛑 Event Runner: остановлен")
+            logger.info("🛑 Event Runner [%s]: остановлен", nexus.name)
             break
         except Exception as e:
-            logger.error(f"💥 Event Runner: {e}")
+            logger.error("💥 Event Runner [%s]: %s", nexus.name, e)
             await asyncio.sleep(10)
 
 
@@ -1,32 +1,60 @@
 import asyncio
 import time
 import logging
-import json
 import os
+from collections import OrderedDict
 from pathlib import Path
 
 from StarVellAPI.account import Account
 from StarVellAPI.updater.runner import Runner
 from StarVellAPI.common.enums import EventTypes
 from Utils.exceptions import StarVellBotException
+from Utils.settings import MAIN_ACCOUNT, AccountSettings, Settings
+from Utils import json_codec
+from core.event_bus import EventBus, NewMessageEvent, NewOrderEvent, NewReviewEvent, OrderStatusChangedEvent
+from core.offers_mirror import DB_PATH as OFFERS_DB_PATH, OffersMirror
+from core.raise_scheduler import SCHEDULE_PATH as RAISE_SCHEDULE_PATH, RaiseScheduler
+from core.starvell_client import close_client, get_client
 
 logger = logging.getLogger("Nexus.core")
 
+OWNERS_LIMIT = 5000  # сколько последних чатов/заказов/отзывов помнят, какому аккаунту принадлежат
 
-class Nexus:
 
-    def __init__(self, main_cfg, ad_cfg, ar_cfg, raw_ar_cfg, version, telegram_bot=None):
+class Nexus:
+    """
+    Один аккаунт StarVell: Account, Runner, прочитанное, зеркало лотов и поднятие.
+    Дополнительные аккаунты ([Account:<имя>]) — такие же Nexus, созданные add_account();
+    шина событий, плагины, Telegram-бот и реестр accounts у них общие с основным.
+    """
+
+    def __init__(self, main_cfg, ad_cfg, ar_cfg, raw_ar_cfg, version, telegram_bot=None, settings=None,
+                 name: str = MAIN_ACCOUNT, parent: "Nexus" = None):
         self.main_cfg = main_cfg
+        self.settings: Settings = settings or Settings.from_dict(main_cfg)
+        self.config_watcher = None
         self.ad_cfg = ad_cfg
         self.ar_cfg = ar_cfg
         self.raw_ar_cfg = raw_ar_cfg
         self.version = version
+        self.name = name
 
         self.account = None
         self.runner = None
         self.running = False
-        self.plugins = {}
-        self.blacklist = set()
+        if parent is None:
+            self.accounts = {}
+            self.plugins = {}
+            self.blacklist = set()
+            self.events = EventBus()
+            self._owners = OrderedDict()
+        else:
+            self.accounts = parent.accounts
+            self.plugins = parent.plugins
+            self.blacklist = parent.blacklist
+            self.events = parent.events
+            self._owners = parent._owners
+        self.accounts[name] = self
 
         self.stats = {
             "orders_processed": 0,
@@ -37,11 +65,27 @@ class Nexus:
         self.telegram = telegram_bot
         self._tg_ready = telegram_bot is not None
         self._my_username = ""
+        self._my_user_id = None
 
         self._read_messages = set()
-        self._read_store_path = "storage/read_cache.json"
+        self._order_statuses = {}
+        self._read_store_path = self._storage_path("storage/read_cache.json")
         self._load_read_store()
 
+        self.offers_mirror = OffersMirror(
+            self.fetch_my_offers,
+            lambda: self.settings.starvell.offers_sync_interval,
+            path=self._storage_path(OFFERS_DB_PATH),
+        )
+        self.raise_scheduler = RaiseScheduler(
+            self.raise_offers,
+            lambda: self.settings.starvell.raise_interval,
+            lambda: self.settings.starvell.auto_raise,
+            path=self._storage_path(RAISE_SCHEDULE_PATH),
+        )
+        self.offers_mirror.listeners.append(self._refresh_raise_categories)
+        self.raise_scheduler.listeners.append(self._notify_lots_raised)
+
     # ============================================================
     # ============================================================
 
@@ -57,11 +101,7 @@ class Nexus:
             raise StarVellBotException(f"Ошибка инициализации: {e}")
 
     def init_account(self):
-        if not isinstance(self.main_cfg, dict):
-            raise StarVellBotException(f"Неверный тип конфига: {type(self.main_cfg)}")
-        
-        starvell_section = self.main_cfg.get("StarVell", {})
-        session_id = (starvell_section.get("session") or starvell_section.get("session_id") or "").strip()
+        session_id = self.settings.starvell.session_id
 
         if not session_id:
             raise StarVellBotException("Не указан session_id")
@@ -73,26 +113,27 @@ class Nexus:
             raise StarVellBotException("Ошибка авторизации")
 
         self._my_username = prof["user"].get("username") or ""
-        logger.info(f"✅ Авторизован: {self._my_username}")
+        self._my_user_id = prof["user"].get("id")
+        logger.info(f"✅ Авторизован: {self._my_username}" + (f" [{self.name}]" if self.name != MAIN_ACCOUNT else ""))
 
 
     # ============================================================
     # ============================================================
 
     async def run(self):
-        logger.info("🔁 Runner запущен")
+        logger.info(f"🔁 Runner запущен [{self.name}]")
 
         try:
             self.running = True
             self.runner = Runner(self.account)
 
-            async for event in self.runner.listen(delay=6.0):
+            async for event in self.runner.listen(delay=self.settings.starvell.poll_interval):
                 await self._handle_event(event)
 
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            logger.error(f"💥 Runner: {e}")
+            logger.error(f"💥 Runner [{self.name}]: {e}")
         finally:
             self.running = False
 
@@ -105,7 +146,7 @@ class Nexus:
 
             if event_type in ("new_message", EventTypes.NEW_MESSAGE):
                 await self._handle_new_message(event)
-            elif event_type in ("new_order", "order"):
+            elif event_type in ("new_order", "order", "order_status_changed", "order_status"):
                 await self._handle_new_order(event)
             elif event_type in ("new_review", "review"):
                 await self._handle_new_review(event)
@@ -142,6 +183,8 @@ class Nexus:
         if key in self._read_messages:
             return
 
+        self.events.emit(NewMessageEvent(str(chat_id), msg_id, author, content, raw=msg, account=self.name))
+
         text = f"💬 <b>{self._escape_html(author)}</b>\n\n{self._escape_html(content)[:1000]}"
 
         await self._safe_send_tg_with_buttons(text, chat_id, "message")
@@ -162,6 +205,13 @@ class Nexus:
         if not order_id:
             return
 
+        status = str(order.get("status") or "")
+        previous = self._order_statuses.get(order_id)
+        if status:
+            self._order_statuses[order_id] = status
+            if previous is not None and previous != status:
+                self.events.emit(OrderStatusChangedEvent(order_id, status, previous, raw=order, account=self.name))
+
         key = f"order:{order_id}"
         if key in self._read_messages:
             return
@@ -176,10 +226,15 @@ class Nexus:
         qty = order.get("quantity", 1)
         price = order.get("totalPrice") or order.get("basePrice") or 0
         try:
-            price_str = f"{int(price)/100:.2f} ₽"
+            price_rub = int(price) / 100
+            price_str = f"{price_rub:.2f} ₽"
         except Exception:
+            price_rub = 0.0
             price_str = "—"
 
+        self.events.emit(NewOrderEvent(order_id, buyer, product, int(qty or 1), price_rub, status, raw=order,
+                                       account=self.name))
+
         text = f"🛒 <b>Новый заказ:</b> {self._escape_html(product[:60])}\n"
         text += f"👤 Покупатель: {self._escape_html(buyer)}\n"
         if qty > 1:
@@ -223,6 +278,8 @@ class Nexus:
 
         stars = "⭐" * int(rating)
 
+        self.events.emit(NewReviewEvent(review_id, author, int(rating), comment, raw=review, account=self.name))
+
         text = f"📝 <b>Новый отзыв</b> {stars}\n"
         text += f"👤 От: {self._escape_html(author)}\n"
         if comment:
@@ -240,11 +297,15 @@ class Nexus:
 
     async def _safe_send_tg(self, text: str):
         try:
+            if not self.settings.telegram.notifications:
+                return
+
             if getattr(self, "telegram", None) is None:
                 logger.debug("Telegram-бот не инициализирован — сообщение не отправлено.")
                 return
 
             tg = self.telegram
+            text = self._tagged(text)
 
             if hasattr(tg, "send_notification"):
                 await tg.send_notification(text)
@@ -262,10 +323,15 @@ class Nexus:
     async def _safe_send_tg_with_buttons(self, text: str, entity_id: str, entity_type: str):
         """Отправляет уведомление с кнопками в Telegram"""
         try:
+            if not self.settings.telegram.notifications:
+                return
+
             if getattr(self, "telegram", None) is None:
                 return
 
             tg = self.telegram
+            text = self._tagged(text)
+            self._remember_owner(entity_id)
             
             if hasattr(tg, "send_notification_with_buttons"):
                 await tg.send_notification_with_buttons(text, entity_id, entity_type)
@@ -347,17 +413,158 @@ class Nexus:
                 pass
 
     def get_stats(self):
+        """Счётчики по всем аккаунтам процесса."""
         uptime_sec = int(time.time() - self.stats.get("start_time", time.time()))
         uptime_fmt = f"{uptime_sec // 3600}ч {uptime_sec % 3600 // 60}м"
+        peers = self.accounts.values()
         return {
-            "orders_processed": self.stats.get("orders_processed", 0),
-            "messages_sent": self.stats.get("messages_sent", 0),
+            "orders_processed": sum(p.stats.get("orders_processed", 0) for p in peers),
+            "messages_sent": sum(p.stats.get("messages_sent", 0) for p in peers),
             "uptime_formatted": uptime_fmt,
         }
 
+    # ============================================================
+    # ============================================================
+
+    def add_account(self, account: AccountSettings) -> "Nexus":
+        """Дополнительный аккаунт: свой Account, Runner и прочитанное, остальное — общее с этим Nexus."""
+        if account.name in self.accounts:
+            raise StarVellBotException(f"Аккаунт {account.name} уже добавлен")
+        peer = Nexus(self.main_cfg, self.ad_cfg, self.ar_cfg, self.raw_ar_cfg, self.version,
+                     telegram_bot=self.telegram, settings=self.settings.for_account(account),
+                     name=account.name, parent=self)
+        return peer
+
+    def _storage_path(self, path: str) -> str:
+        """Файл в storage/ для этого аккаунта: у основного — прежнее имя, у остальных — file.<имя>.ext."""
+        if self.name == MAIN_ACCOUNT:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}.{self.name}{ext}"
+
+    def set_telegram(self, telegram_bot):
+        for peer in self.accounts.values():
+            peer.telegram = telegram_bot
+            peer._tg_ready = telegram_bot is not None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} · {self._my_username}" if self._my_username else self.name
+
+    def _tagged(self, text: str) -> str:
+        """С одним аккаунтом уведомления как прежде, с несколькими — с подписью аккаунта."""
+        if len(self.accounts) < 2:
+            return text
+        return f"🏷 <b>{self._escape_html(self.label)}</b>\n{text}"
+
+    def _remember_owner(self, entity_id):
+        self._owners[str(entity_id)] = self.name
+        self._owners.move_to_end(str(entity_id))
+        while len(self._owners) > OWNERS_LIMIT:
+            self._owners.popitem(last=False)
+
+    def account_for(self, entity_id):
+        """Account, от которого пришло уведомление о чате/заказе/отзыве entity_id (по умолчанию — этот)."""
+        peer = self.accounts.get(self._owners.get(str(entity_id)), self)
+        return peer.account
+
+    async def apply_settings(self, settings: Settings, raw_cfg: dict, live: set, restart: set):
+        """Применяет перечитанный configs/_main.cfg без перезапуска (см. Utils.settings.LIVE_KEYS)."""
+        old = self.settings
+        self.settings = settings
+        self._apply_raise_settings(old)
+        self._apply_account_settings(settings)
+
+        if isinstance(self.main_cfg, dict):
+            self.main_cfg.clear()
+            self.main_cfg.update(raw_cfg)
+
+        if "Other.log_level" in live:
+            from Utils.logger import set_log_level
+            set_log_level(settings.other.log_level)
+        if "Other.log_format" in live:
+            from Utils.logger import set_log_format
+            set_log_format(settings.other.log_format)
+
+        tg = self.telegram
+        if tg is not None and "Telegram.admin_ids" in live:
+            admin_ids = getattr(tg, "admin_ids", None)
+            if isinstance(admin_ids, set):
+                admin_ids.difference_update(set(old.telegram.admin_ids) - set(settings.telegram.admin_ids))
+                admin_ids.update(settings.telegram.admin_ids)
+            if settings.telegram.main_admin_id:
+                tg.admin_id = settings.telegram.main_admin_id
+
+        if tg is not None and "Telegram.password" in live:
+            import hashlib
+            tg.password_md5 = hashlib.md5(settings.telegram.password.encode()).hexdigest()
+
+        # Runner читает интервал при старте: останавливаем его, run_event_runner поднимет заново
+        if "StarVell.poll_interval" in live and self.running:
+            self.stop()
+
+        if restart:
+            keys = ", ".join(sorted(restart))
+            await self._safe_send_tg(f"⚙️ Конфиг обновлён. Для применения <b>{keys}</b> нужен перезапуск.")
+
+    def _apply_account_settings(self, settings: Settings):
+        """Интервалы и auto_raise дополнительных аккаунтов; состав аккаунтов меняется только перезапуском."""
+        for acc in settings.accounts:
+            peer = self.accounts.get(acc.name)
+            if peer is None or peer is self:
+                continue
+            old_settings = peer.settings
+            peer.settings = settings.for_account(acc)
+            peer._apply_raise_settings(old_settings)
+            if peer.running and old_settings.starvell.poll_interval != acc.poll_interval:
+                peer.stop()
+
+    def _apply_raise_settings(self, old: Settings):
+        """raise_interval переносит уже запланированные поднятия, auto_raise будит планировщик."""
+        new = self.settings.starvell
+        if new.raise_interval != old.starvell.raise_interval:
+            self.raise_scheduler.reschedule()
+        if new.auto_raise != old.starvell.auto_raise:
+            self.raise_scheduler.wake()
+
+    async def fetch_my_offers(self) -> list:
+        """Список наших лотов для OffersMirror. Без активной сессии — исключение, а не пустой список."""
+        session_id = self.settings.starvell.session_id
+        if not session_id or not getattr(self.account, "is_initiated", False):
+            raise StarVellBotException("нет активной сессии StarVell")
+        return await get_client(session_id).list_offers(user_id=self._my_user_id)
+
+    async def raise_offers(self, category_id: int):
+        """Поднятие лотов категории для RaiseScheduler: (ok, data, cooldown)."""
+        session_id = self.settings.starvell.session_id
+        if not session_id or not getattr(self.account, "is_initiated", False):
+            return False, {"error": "нет активной сессии StarVell"}, None
+        return await get_client(session_id).raise_offers(category_id)
+
+    async def _refresh_raise_categories(self, _result=None):
+        self.raise_scheduler.set_categories(await self.offers_mirror.active_category_ids())
+
+    async def _notify_lots_raised(self, category_ids: list):
+        from plugins.utils.catalog import get_catalog
+        catalog = get_catalog()
+        names = []
+        for cat_id in category_ids:
+            cat = catalog.find_category(cat_id)
+            names.append(f"{catalog.get_game_name(cat.game_slug)} › {cat.name}" if cat else f"#{cat_id}")
+        await self._safe_send_tg("⬆️ Лоты подняты:\n" + "\n".join(f"• {n}" for n in names))
+
+    async def run_raise_scheduler(self):
+        """Категории берутся из зеркала лотов; без auto_raise планировщик только ведёт расписание."""
+        try:
+            await self._refresh_raise_categories()
+        except Exception as e:
+            logger.debug(f"raise categories: {e}")
+        await self.raise_scheduler.run()
+
     def reinit_account(self, new_session: str) -> str:
         if not new_session:
             raise StarVellBotException("Пустая сессия")
+        old_session = self.settings.starvell.session_id
 
         if isinstance(self.main_cfg, dict):
             self.main_cfg.setdefault("StarVell", {})
@@ -367,6 +574,9 @@ class Nexus:
         try:
             from Utils.config_loader import save_main_config
             save_main_config("configs/_main.cfg", self.main_cfg)
+            self.settings = Settings.from_dict(self.main_cfg)
+            if self.config_watcher is not None:
+                self.config_watcher.sync(self.settings)
             logger.info("✅ Сессия сохранена в configs/_main.cfg")
         except Exception as e:
             logger.warning(f"⚠️ Не удалось сохранить сессию в конфиг: {e}")
@@ -377,7 +587,15 @@ class Nexus:
             raise StarVellBotException("Не удалось авторизоваться с новой сессией")
 
         self._my_username = prof["user"].get("username") or ""
+        self._my_user_id = prof["user"].get("id")
         logger.info(f"✅ Сессия обновлена. Авторизован как {self._my_username}")
+
+        # общий клиент плагинов (context["starvell"]) берёт сессию из settings — старый пул больше не нужен
+        if old_session and old_session != self.settings.starvell.session_id:
+            try:
+                asyncio.get_running_loop().create_task(close_client(old_session))
+            except RuntimeError:
+                pass
         return self._my_username
 
 
@@ -386,15 +604,13 @@ class Nexus:
 
     def _load_auto_response_config(self) -> dict:
         try:
-            with open("configs/auto_response.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            return json_codec.load_file("configs/auto_response.json")
         except Exception:
             return {"enabled": False}
     
     def _save_auto_response_config(self, config: dict):
         try:
-            with open("configs/auto_response.json", "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False, indent=4)
+            json_codec.dump_file("configs/auto_response.json", config, pretty=True)
         except Exception:
             pass
 
@@ -481,8 +697,7 @@ class Nexus:
     def _load_read_store(self):
         if os.path.exists(self._read_store_path):
             try:
-                with open(self._read_store_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = json_codec.load_file(self._read_store_path)
                 if isinstance(data, list):
                     self._read_messages = set(data)
                 logger.info(f"📘 Загружено {len(self._read_messages)} ранее прочитанных сообщений.")
@@ -492,8 +707,7 @@ class Nexus:
     def _persist_read_store(self):
         try:
             data = list(self._read_messages)[-1000:]
-            with open(self._read_store_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            json_codec.dump_file(self._read_store_path, data)
         except Exception as e:
             logger.warning(f"⚠️ Не удалось записать {self._read_store_path}: {e}")
 
@@ -0,0 +1,303 @@
+"""
+Массовая правка своих лотов: цена, наличие, включение/выключение.
+
+/bulk_edit <операция> [game=<slug>] [cat=<id|game/cat>] [title=<текст>]
+  price +10%   — цена ± процент
+  price -50    — цена ± рубли
+  price =199   — фиксированная цена
+  stock 100    — наличие
+  on / off     — включить / выключить
+/bulk_edit_resume — продолжить прерванное задание
+
+Лоты выбираются из локального зеркала (core/offers_mirror.py), перед запуском показывается
+количество и примеры изменений. Новые значения рассчитываются один раз и пишутся в чекпоинт,
+поэтому перезапуск после обрыва досылает только оставшиеся лоты.
+"""
+import html
+import logging
+import shlex
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, CallbackQuery
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from core import bulk_edit
+from core.bulk_edit import BulkEditError, BulkEditJob
+from core.starvell_client import get_client
+from .utils.catalog import get_catalog
+
+logger = logging.getLogger("plugin.bulk_edit")
+
+MANIFEST = {
+    "name": "BulkEdit",
+    "author": "@AnastasiaPisun",
+    "description": "Массовая правка цены и наличия лотов",
+    "lazy": True,
+    "commands": [
+        {"command": "bulk_edit", "description": "Массовая правка лотов"},
+        {"command": "bulk_edit_resume", "description": "Продолжить массовую правку"},
+    ],
+    "callbacks": ["bedit:"],
+}
+
+PROGRESS_INTERVAL = 2.0
+PREVIEW_ROWS = 5
+FILTER_KEYS = {"game": "game", "игра": "game", "cat": "cat", "category": "cat", "категория": "cat",
+               "title": "title", "название": "title"}
+
+USAGE = (
+    "✏️ <b>Массовая правка лотов</b>\n\n"
+    "<code>/bulk_edit price +10% game=brawl-stars</code>\n"
+    "<code>/bulk_edit price -50 cat=128</code>\n"
+    "<code>/bulk_edit price =199 title=\"170 гемов\"</code>\n"
+    "<code>/bulk_edit stock 100 cat=brawl-stars/gems</code>\n"
+    "<code>/bulk_edit off game=roblox</code>\n\n"
+    "Продолжить прерванное: /bulk_edit_resume"
+)
+
+
+class BulkEdit:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "BulkEdit"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Массовая правка цены и наличия лотов"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "bulk_edit", "description": "Массовая правка лотов"},
+            {"command": "bulk_edit_resume", "description": "Продолжить массовую правку"},
+        ]
+        self.buttons = []
+
+        self._pending: Dict[int, BulkEditJob] = {}
+        self._running = False
+
+        self.router = Router(name="bulk_edit")
+        self.setup_handlers()
+
+    @property
+    def catalog(self):
+        return get_catalog()
+
+    @property
+    def mirror(self):
+        return self.nexus.offers_mirror
+
+    def setup_handlers(self):
+        self.router.message(Command("bulk_edit"))(self.cmd_bulk_edit)
+        self.router.message(Command("bulk_edit_resume"))(self.cmd_resume)
+        self.router.callback_query(F.data.in_({"bedit:run", "bedit:cancel"}))(self.handle_confirm)
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    # ------------------------------------------------------------------
+
+    def parse_args(self, args: str) -> Tuple[bulk_edit.Operation, dict, str]:
+        """Разделяет операцию и фильтры key=value. Возвращает (operation, kwargs для select_offers, описание)."""
+        try:
+            tokens = shlex.split(args)
+        except ValueError as e:
+            raise BulkEditError(f"не разобрать аргументы: {e}")
+
+        op_tokens, filters = [], {}
+        for token in tokens:
+            key, sep, value = token.partition("=")
+            if sep and key.lower() in FILTER_KEYS:
+                filters[FILTER_KEYS[key.lower()]] = value.strip()
+            else:
+                op_tokens.append(token)
+        operation = bulk_edit.parse_operation(" ".join(op_tokens))
+
+        query: dict = {}
+        labels: List[str] = []
+        if filters.get("game"):
+            game = filters["game"]
+            ids = [c.id for c in self.catalog.iter_categories() if c.game_slug == game]
+            if not ids:
+                raise BulkEditError(f"игра не найдена: {game}")
+            query["category_ids"] = ids
+            labels.append(f"игра {self.catalog.get_game_name(game)}")
+        if filters.get("cat"):
+            cat = self._resolve_category(filters["cat"])
+            if cat is None:
+                raise BulkEditError(f"категория не найдена: {filters['cat']}")
+            query["category_id"] = cat.id
+            labels.append(f"категория {self.catalog.get_game_name(cat.game_slug)} › {cat.name}")
+        if filters.get("title"):
+            query["query"] = filters["title"]
+            labels.append(f"название содержит «{filters['title']}»")
+        return operation, query, ", ".join(labels) or "все лоты"
+
+    def _resolve_category(self, value: str):
+        if value.isdigit():
+            return self.catalog.find_category(int(value))
+        for sep in ("/", "__"):
+            if sep in value:
+                game_slug, cat_slug = value.split(sep, 1)
+                return self.catalog.get_category(game_slug.strip(), cat_slug.strip())
+        return None
+
+    @staticmethod
+    def _format_change(job: BulkEditJob, offer: dict) -> str:
+        changes = job.items[offer["id"]]
+        title = html.escape((offer.get("title") or offer["id"])[:40])
+        if "price" in changes:
+            return f"• {title}: {offer['price']:g} → {changes['price']:g} ₽"
+        if "availability" in changes:
+            return f"• {title}: {offer['availability']} → {changes['availability']} шт."
+        return f"• {title}: {'🟢' if changes.get('isActive') else '⚪️'}"
+
+    # ------------------------------------------------------------------
+
+    async def cmd_bulk_edit(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        args = (command.args or "").strip() if command else ""
+        if not args:
+            await message.answer(USAGE)
+            return
+        try:
+            operation, query, label = self.parse_args(args)
+        except BulkEditError as e:
+            await message.answer(f"❌ {html.escape(str(e))}\n\n{USAGE}")
+            return
+
+        offers = await self.mirror.select_offers(**query)
+        job, skipped = bulk_edit.plan(offers, operation, filters=label)
+
+        text = [
+            f"✏️ <b>{html.escape(operation.describe())}</b> — {html.escape(label)}",
+            f"Подходит лотов: {len(offers)}, будет изменено: <b>{len(job.items)}</b>",
+        ]
+        if skipped:
+            text.append(f"Пропущено: {len(skipped)} ({html.escape(next(iter(skipped.values())))})")
+        by_id = {o["id"]: o for o in offers}
+        text += [self._format_change(job, by_id[i]) for i in list(job.items)[:PREVIEW_ROWS]]
+        if len(job.items) > PREVIEW_ROWS:
+            text.append(f"… и ещё {len(job.items) - PREVIEW_ROWS}")
+
+        if not job.items:
+            await message.answer("\n".join(text + ["", "Менять нечего."]))
+            return
+        if bulk_edit.load_checkpoint() is not None:
+            text += ["", "⚠️ Есть незавершённое задание — запуск нового заменит его (/bulk_edit_resume)."]
+
+        self._pending[message.chat.id] = job
+        kb = InlineKeyboardBuilder()
+        kb.button(text=f"🚀 Изменить {len(job.items)} лотов", callback_data="bedit:run")
+        kb.button(text="❌ Отмена", callback_data="bedit:cancel")
+        kb.adjust(1)
+        await message.answer("\n".join(text), reply_markup=kb.as_markup())
+
+    async def cmd_resume(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        job = bulk_edit.load_checkpoint()
+        if job is None:
+            await message.answer("Незавершённых заданий нет.")
+            return
+        await message.answer(
+            f"▶️ Продолжаю «{html.escape(job.operation.describe())}» ({html.escape(job.filters)}): "
+            f"осталось {len(job.pending)} из {len(job.items)}"
+        )
+        await self.run(message, job)
+
+    async def handle_confirm(self, query: CallbackQuery):
+        job = self._pending.pop(query.message.chat.id, None)
+        await query.answer()
+        if query.data == "bedit:cancel" or job is None:
+            await query.message.edit_text("❌ Массовая правка отменена.")
+            return
+        await query.message.edit_reply_markup(reply_markup=None)
+        await self.run(query.message, job)
+
+    # ------------------------------------------------------------------
+
+    async def run(self, message: Message, job: BulkEditJob):
+        if self._running:
+            await message.answer("⏳ Массовая правка уже выполняется.")
+            return
+        self._running = True
+        started = time.monotonic()
+        state = {"last_text": "", "last_edit": 0.0}
+
+        def progress_text(final: bool = False) -> str:
+            head = "✅ Готово" if final else "⏳ Меняю лоты"
+            return (f"{head}: {len(job.done)}/{len(job.items)}\n"
+                    f"Ошибок: {len(job.failed)}\n"
+                    f"Время: {time.monotonic() - started:.0f} с")
+
+        progress_msg = await message.answer(progress_text())
+
+        async def on_progress(_job: BulkEditJob):
+            now = time.monotonic()
+            text = progress_text()
+            if text == state["last_text"] or now - state["last_edit"] < PROGRESS_INTERVAL:
+                return
+            state["last_text"], state["last_edit"] = text, now
+            try:
+                await progress_msg.edit_text(text)
+            except Exception as e:  # "message is not modified", flood control — прогресс не критичен
+                logger.debug("progress edit: %s", e)
+
+        try:
+            client = get_client(self.nexus.settings.starvell.session_id)
+            await bulk_edit.run_job(job, client, mirror=self.mirror, on_progress=on_progress)
+        finally:
+            self._running = False
+
+        text = progress_text(final=True)
+        if job.failed:
+            text += "\n\nОшибки:\n" + "\n".join(
+                f"• {html.escape(job.titles.get(i) or i)[:40]}: {html.escape(err)[:200]}"
+                for i, err in list(job.failed.items())[:10]
+            )
+            text += "\n\nПовторить для оставшихся: /bulk_edit_resume"
+        try:
+            await progress_msg.edit_text(text)
+        except Exception as e:
+            logger.debug("progress edit: %s", e)
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+        if getattr(nexus, "offers_mirror", None) is None:
+            logger.warning("⚠️ BulkEdit: у nexus нет offers_mirror — пропуск.")
+            return
+
+        plugin = BulkEdit(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ BulkEdit не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["bulk_edit"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["bulk_edit"] = plugin
+
+        logger.info("✅ BulkEdit успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() BulkEdit: {e}")
@@ -0,0 +1,452 @@
+"""
+Массовое создание лотов из CSV/XLSX.
+
+/bulk_lots → бот ждёт файл. Колонки (первая строка — заголовки):
+  category     — ID категории или slug вида 'brawl-stars/gems' ('brawl-stars__gems')
+  subcategory  — ID, slug или название подкатегории (обязательно, если у категории есть подкатегории)
+  title, description, price
+  preset       — имя пресета (пусто = [ДЕФОЛТ])
+Остальные колонки считаются numeric-полями пресета (имя колонки = имя поля).
+
+Все строки сначала проверяются по каталогу, затем валидные лоты отправляются параллельно
+через общий клиент с лимитом запросов. Прогресс — в одном сообщении, в конце — CSV с результатами.
+"""
+import asyncio
+import csv
+import html
+import io
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiogram import F, Router
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Message, CallbackQuery, BufferedInputFile
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from core.starvell_client import get_client
+from .create_lot_pro import build_lot_payload
+from .preset_manager import PresetManager, get_preset_manager
+from .utils.catalog import Category, SubCategory, get_catalog
+from .utils.lot_validation import get_validation_tables
+
+try:
+    import openpyxl
+except ImportError:  # XLSX необязателен, CSV работает всегда
+    openpyxl = None
+
+logger = logging.getLogger("plugin.bulk_lots")
+
+MANIFEST = {
+    "name": "BulkLots",
+    "author": "@AnastasiaPisun",
+    "description": "Массовое создание лотов из CSV/XLSX",
+    "lazy": True,
+    "commands": [
+        {"command": "bulk_lots", "description": "Массовое создание лотов из файла"},
+        {"command": "bulk_lots_template", "description": "Шаблон CSV для массового создания"},
+    ],
+    "callbacks": ["bulk:start"],
+    "buttons": [{"text": "📥 Лоты из файла", "callback": "bulk:start"}],
+}
+
+CANCEL_COMMANDS = {"/cancel", "отмена"}
+MAX_FILE_SIZE = 5 * 1024 * 1024
+MAX_ROWS = 500
+CONCURRENCY = 4
+PROGRESS_INTERVAL = 2.0
+DEFAULT_PRESET = "[ДЕФОЛТ]"
+
+COLUMN_ALIASES = {
+    "category": "category", "категория": "category", "category_id": "category",
+    "subcategory": "subcategory", "подкатегория": "subcategory", "subcategory_id": "subcategory",
+    "title": "title", "название": "title", "заголовок": "title",
+    "description": "description", "описание": "description",
+    "price": "price", "цена": "price",
+    "preset": "preset", "пресет": "preset",
+}
+TEMPLATE_HEADER = ["category", "subcategory", "title", "description", "price", "preset"]
+TEMPLATE_EXAMPLE = ["brawl-stars/gems", "170 гемов", "170 гемов Brawl Stars", "Быстро и официально", "199", ""]
+
+
+class BulkLotsFSM(StatesGroup):
+    FILE = State()
+    CONFIRM = State()
+
+
+@dataclass
+class BulkRow:
+    line: int
+    raw: Dict[str, str]
+    category: Optional[Category] = None
+    subcategory: Optional[SubCategory] = None
+    payload: Optional[Dict[str, Any]] = None
+    errors: List[str] = field(default_factory=list)
+    lot_id: Optional[str] = None
+    status: str = "invalid"
+
+
+def read_table(filename: str, data: bytes) -> List[Dict[str, str]]:
+    """CSV/XLSX → список словарей с нормализованными заголовками."""
+    if filename.lower().endswith(".xlsx"):
+        if openpyxl is None:
+            raise ValueError("Для XLSX нужен пакет openpyxl (pip install openpyxl). Либо пришли CSV.")
+        workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        rows = [["" if v is None else str(v) for v in row] for row in workbook.active.iter_rows(values_only=True)]
+        workbook.close()
+    else:
+        try:
+            text = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            text = data.decode("cp1251")
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.reader(io.StringIO(text), dialect))
+
+    if not rows:
+        return []
+    header = [COLUMN_ALIASES.get(h.strip().lower(), h.strip()) for h in rows[0]]
+    table = []
+    for values in rows[1:]:
+        if not any(v.strip() for v in values):
+            continue
+        table.append({header[i]: values[i].strip() for i in range(min(len(header), len(values)))})
+    return table
+
+
+class BulkLots:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "BulkLots"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Массовое создание лотов из CSV/XLSX"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "bulk_lots", "description": "Массовое создание лотов из файла"},
+            {"command": "bulk_lots_template", "description": "Шаблон CSV для массового создания"},
+        ]
+        self.buttons = [
+            {"text": "📥 Лоты из файла", "callback": "bulk:start"},
+        ]
+
+        self._pending: Dict[int, List[BulkRow]] = {}
+
+        self.router = Router(name="bulk_lots")
+        self.setup_handlers()
+
+    def setup_handlers(self):
+        self.router.message(Command("bulk_lots"))(self.start)
+        self.router.message(Command("bulk_lots_template"))(self.send_template)
+        self.router.callback_query(F.data == "bulk:start")(self.start_from_button)
+        self.router.message(StateFilter(BulkLotsFSM), F.text.lower().in_(CANCEL_COMMANDS))(self.cancel)
+        self.router.message(BulkLotsFSM.FILE, F.document)(self.handle_file)
+        self.router.callback_query(BulkLotsFSM.CONFIRM, F.data.in_({"bulk:run", "bulk:cancel"}))(self.handle_confirm)
+
+    # ------------------------------------------------------------------
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    @property
+    def catalog(self):
+        return get_catalog()
+
+    @property
+    def validation(self):
+        return get_validation_tables(self.catalog)
+
+    @property
+    def preset_manager(self) -> PresetManager:
+        """Пресеты общие с CreateLotPro, чтобы не держать две рассинхронизированные копии."""
+        return get_preset_manager()
+
+    # ------------------------------------------------------------------
+
+    async def start(self, message: Message, state: FSMContext):
+        if not self._is_admin(message.from_user.id):
+            return
+        await state.clear()
+        await state.set_state(BulkLotsFSM.FILE)
+        xlsx_note = "" if openpyxl is not None else " (XLSX недоступен: не установлен openpyxl)"
+        await message.answer(
+            "📥 <b>Массовое создание лотов</b>\n\n"
+            f"Пришли CSV или XLSX{xlsx_note}. Колонки:\n"
+            "<code>category, subcategory, title, description, price, preset</code>\n\n"
+            "Шаблон: /bulk_lots_template\nОтмена: /cancel"
+        )
+
+    async def cancel(self, message: Message, state: FSMContext):
+        await state.clear()
+        self._pending.pop(message.chat.id, None)
+        await message.answer("❌ Массовое создание отменено.")
+
+    async def start_from_button(self, query: CallbackQuery, state: FSMContext):
+        await query.answer()
+        await self.start(query.message, state)
+
+    async def send_template(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(TEMPLATE_HEADER)
+        writer.writerow(TEMPLATE_EXAMPLE)
+        await message.answer_document(
+            BufferedInputFile(buf.getvalue().encode("utf-8-sig"), filename="bulk_lots_template.csv"),
+            caption="Шаблон для /bulk_lots",
+        )
+
+    async def handle_file(self, message: Message, state: FSMContext):
+        if not self._is_admin(message.from_user.id):
+            return
+        document = message.document
+        if document.file_size and document.file_size > MAX_FILE_SIZE:
+            await message.answer("❌ Файл больше 5 МБ.")
+            return
+
+        buf = io.BytesIO()
+        try:
+            await message.bot.download(document, destination=buf)
+            table = read_table(document.file_name or "", buf.getvalue())
+        except Exception as e:
+            await message.answer(f"❌ Не удалось прочитать файл: {html.escape(str(e))}")
+            return
+
+        if not table:
+            await message.answer("❌ В файле нет строк с данными.")
+            return
+        if len(table) > MAX_ROWS:
+            await message.answer(f"❌ Слишком много строк: {len(table)} (максимум {MAX_ROWS}).")
+            return
+
+        rows = [self.prepare_row(i + 2, raw) for i, raw in enumerate(table)]
+        valid = [r for r in rows if not r.errors]
+        invalid = [r for r in rows if r.errors]
+
+        text = [f"📋 Строк: {len(rows)}, готово к отправке: <b>{len(valid)}</b>, с ошибками: <b>{len(invalid)}</b>"]
+        for row in invalid[:10]:
+            text.append(f"• стр. {row.line}: {html.escape('; '.join(row.errors))}")
+        if len(invalid) > 10:
+            text.append(f"… и ещё {len(invalid) - 10} (полный список будет в файле результатов)")
+
+        if not valid:
+            await state.clear()
+            await message.answer("\n".join(text))
+            await self._send_results(message, rows)
+            return
+
+        self._pending[message.chat.id] = rows
+        kb = InlineKeyboardBuilder()
+        kb.button(text=f"🚀 Создать {len(valid)} лотов", callback_data="bulk:run")
+        kb.button(text="❌ Отмена", callback_data="bulk:cancel")
+        kb.adjust(1)
+        await state.set_state(BulkLotsFSM.CONFIRM)
+        await message.answer("\n".join(text), reply_markup=kb.as_markup())
+
+    async def handle_confirm(self, query: CallbackQuery, state: FSMContext):
+        await state.clear()
+        rows = self._pending.pop(query.message.chat.id, None)
+        await query.answer()
+        if query.data == "bulk:cancel" or not rows:
+            await query.message.edit_text("❌ Массовое создание отменено.")
+            return
+        await self.run_import(query.message, rows)
+
+    # ------------------------------------------------------------------
+
+    def _resolve_category(self, value: str) -> Optional[Category]:
+        value = value.strip()
+        if value.isdigit():
+            return self.catalog.find_category(int(value))
+        for sep in ("/", "__"):
+            if sep in value:
+                game_slug, cat_slug = value.split(sep, 1)
+                return self.catalog.get_category(game_slug.strip(), cat_slug.strip())
+        return None
+
+    @staticmethod
+    def _resolve_subcategory(category: Category, value: str) -> Optional[SubCategory]:
+        value = value.strip()
+        lowered = value.lower()
+        for sub in category.subcategories:
+            if not sub.is_active:
+                continue
+            if (value.isdigit() and sub.id == int(value)) or sub.slug == value or (sub.name or "").lower() == lowered:
+                return sub
+        return None
+
+    def prepare_row(self, line: int, raw: Dict[str, str]) -> BulkRow:
+        """Разбирает строку и собирает payload. Все проблемы — в row.errors, без исключений."""
+        row = BulkRow(line=line, raw=raw)
+
+        category = self._resolve_category(raw.get("category", ""))
+        if category is None:
+            row.errors.append(f"категория '{raw.get('category', '')}' не найдена")
+            return row
+        row.category = category
+
+        sub_value = raw.get("subcategory", "")
+        if sub_value:
+            row.subcategory = self._resolve_subcategory(category, sub_value)
+            if row.subcategory is None:
+                row.errors.append(f"подкатегория '{sub_value}' не найдена в '{category.name}'")
+        elif any(s.is_active for s in category.subcategories):
+            row.errors.append(f"для '{category.name}' нужна подкатегория")
+
+        title = raw.get("title", "")
+        description = raw.get("description", "")
+        if not title:
+            row.errors.append("пустой title")
+        if not description:
+            row.errors.append("пустой description")
+
+        price = raw.get("price", "").replace(",", ".").replace(" ", "")
+        try:
+            if float(price) <= 0:
+                row.errors.append("цена должна быть больше 0")
+        except ValueError:
+            row.errors.append(f"цена '{raw.get('price', '')}' — не число")
+
+        id_key = str(category.id)
+        slug_key = f"{category.game_slug}__{category.slug}"
+        preset_name = raw.get("preset") or DEFAULT_PRESET
+        if preset_name not in self.preset_manager.get_preset_names(id_key):
+            row.errors.append(f"пресет '{preset_name}' не найден")
+        if row.errors:
+            return row
+
+        preset_data = self.preset_manager.get_preset_data(id_key, slug_key, preset_name)
+        numeric_inputs = {}
+        for field_name in preset_data.get("numeric_to_ask", []):
+            if not raw.get(field_name):
+                row.errors.append(f"не заполнено numeric-поле '{field_name}'")
+            else:
+                numeric_inputs[field_name] = raw[field_name]
+        if row.errors:
+            return row
+
+        sub_id = row.subcategory.id if row.subcategory else None
+        try:
+            payload = build_lot_payload(category.id, slug_key, sub_id, preset_data,
+                                        title, description, price, numeric_inputs)
+        except Exception as e:
+            row.errors.append(f"ошибка сборки payload: {e}")
+            return row
+
+        check = self.validation.check_payload(payload)
+        row.errors.extend(check.errors)
+        if not row.errors:
+            row.payload = payload
+            row.status = "ready"
+        return row
+
+    # ------------------------------------------------------------------
+
+    async def run_import(self, message: Message, rows: List[BulkRow]):
+        ready = [r for r in rows if r.status == "ready"]
+        client = get_client(self.nexus.settings.starvell.session_id)
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        done = {"ok": 0, "fail": 0}
+        started = time.monotonic()
+
+        async def post(row: BulkRow):
+            async with semaphore:
+                ok, data = await client.create_offer(row.payload)
+            if ok:
+                row.status, row.lot_id = "created", str(data.get("id", ""))
+                done["ok"] += 1
+            else:
+                row.status = "failed"
+                row.errors.append(str(data.get("error", "Unknown error")))
+                done["fail"] += 1
+
+        def progress_text(final: bool = False) -> str:
+            total = done["ok"] + done["fail"]
+            head = "✅ Готово" if final else "⏳ Создаю лоты"
+            return (f"{head}: {total}/{len(ready)}\n"
+                    f"Создано: {done['ok']}, ошибок: {done['fail']}\n"
+                    f"Время: {time.monotonic() - started:.0f} с")
+
+        progress_msg = await message.answer(progress_text())
+        tasks = [asyncio.create_task(post(r)) for r in ready]
+
+        last_text = ""
+        pending = set(tasks)
+        while pending:
+            _done, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL)
+            text = progress_text()
+            if text != last_text:
+                last_text = text
+                try:
+                    await progress_msg.edit_text(text)
+                except Exception as e:  # "message is not modified", flood control — прогресс не критичен
+                    logger.debug("progress edit: %s", e)
+
+        try:
+            await progress_msg.edit_text(progress_text(final=True))
+        except Exception as e:
+            logger.debug("progress edit: %s", e)
+        logger.info("BulkLots: создано %s, ошибок %s, невалидных строк %s",
+                    done["ok"], done["fail"], len(rows) - len(ready))
+        await self._send_results(message, rows)
+
+    async def _send_results(self, message: Message, rows: List[BulkRow]):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["line", "status", "lot_id", "category_id", "subcategory_id", "title", "error"])
+        for row in rows:
+            writer.writerow([
+                row.line,
+                row.status,
+                row.lot_id or "",
+                row.category.id if row.category else "",
+                row.subcategory.id if row.subcategory else "",
+                row.raw.get("title", ""),
+                "; ".join(row.errors),
+            ])
+        await message.answer_document(
+            BufferedInputFile(buf.getvalue().encode("utf-8-sig"), filename="bulk_lots_result.csv"),
+            caption="📄 Результаты массового создания",
+        )
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+
+        plugin = BulkLots(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ BulkLots не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["bulk_lots"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["bulk_lots"] = plugin
+
+        logger.info("✅ BulkLots успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() BulkLots: {e}")
@@ -0,0 +1,123 @@
+"""
+Фоновое обновление каталога игр/категорий (plugins/utils/catalog_refresh.py).
+
+Раз в REFRESH_INTERVAL — условные запросы по каждой игре, изменения вливаются и каталог
+подменяется целиком. /catalog_refresh — проверить сейчас, /catalog_refresh force — без кэша.
+"""
+import asyncio
+import html
+import logging
+from typing import Optional
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from .utils.catalog import get_catalog
+from .utils.catalog_refresh import CatalogRefresher, RefreshResult
+
+logger = logging.getLogger("plugin.catalog_updater")
+
+FIRST_REFRESH_DELAY = 120.0
+REFRESH_INTERVAL = 24 * 3600.0
+
+
+class CatalogUpdater:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "CatalogUpdater"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Обновление каталога категорий StarVell"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "catalog_refresh", "description": "Обновить каталог категорий"},
+        ]
+        self.buttons = []
+
+        self.refresher = CatalogRefresher()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+        self.router = Router(name="catalog_updater")
+        self.router.message(Command("catalog_refresh"))(self.cmd_refresh)
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    async def run(self):
+        delay = FIRST_REFRESH_DELAY
+        while True:
+            try:
+                await asyncio.sleep(delay)
+                await self.refresher.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"⚠️ Обновление каталога не удалось: {e}")
+            delay = REFRESH_INTERVAL
+
+    @staticmethod
+    def _summary(result: RefreshResult) -> str:
+        lines = [f"📚 Проверено игр: {result.games_checked} (без изменений: {result.games_not_modified})"]
+        if result.added:
+            lines.append(f"➕ Новые: {html.escape(', '.join(result.added))}")
+        if result.changed:
+            lines.append(f"✏️ Изменены: {html.escape(', '.join(result.changed))}")
+        if result.removed:
+            lines.append(f"➖ Удалены: {html.escape(', '.join(result.removed))}")
+        if result.swapped:
+            lines.append(f"✅ Каталог обновлён: игр {len(get_catalog().list_games())}")
+        elif not result.has_changes:
+            lines.append("Каталог актуален.")
+        if result.errors:
+            lines.append("⚠️ Ошибки: " + html.escape("; ".join(f"{k}: {v}" for k, v in result.errors.items()))[:1000])
+        lines.append(f"⏱ {result.duration:.1f} с")
+        return "\n".join(lines)
+
+    async def cmd_refresh(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        force = bool(command and (command.args or "").strip().lower() == "force")
+        progress = await message.answer("🔄 Проверяю каталог…")
+        try:
+            result = await self.refresher.refresh(force=force)
+        except Exception as e:
+            await progress.edit_text(f"❌ {html.escape(str(e))}")
+            return
+        await progress.edit_text(self._summary(result))
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+
+        plugin = CatalogUpdater(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ CatalogUpdater не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["catalog_updater"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["catalog_updater"] = plugin
+
+        logger.info("✅ CatalogUpdater успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() CatalogUpdater: {e}")
@@ -1,9 +1,8 @@
-import json
+import html
 import re
 import time
 import uuid
 import logging
-from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 
 from StarVellAPI.starvell_config_FINAL_v14 import (
@@ -11,11 +10,15 @@ from StarVellAPI.starvell_config_FINAL_v14 import (
     NUMERIC_ATTRIBUTES_MAP,
     get_default_basic_attributes
 )
-from .preset_manager import PresetManager
+from .preset_manager import get_preset_manager
+from .utils.catalog import get_catalog
+from .utils.catalog_search import get_search_index
+from .utils.lot_validation import get_validation_tables
+from Utils import json_codec
+from core.plugin_services import SharedStarVellClient
 
-import requests
 from aiogram import F, Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, Document
@@ -25,9 +28,26 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 logger = logging.getLogger("plugin.create_lot_pro")
 logger.setLevel(logging.INFO)
 
-API_CREATE_URL = "https://starvell.com/api/offers/create" 
-CATALOG_JSON_PATH = Path("plugins") / "utils" / "complete_categories_map.json"
-SESSION_FILES = [Path("StarVellAPI") / "session.json", Path("session.json")]
+MANIFEST = {
+    "name": "CreateLotPro",
+    "version": "4.5.0",
+    "author": "@AnastasiaPisun",
+    "description": "Создание лотов",
+    "lazy": True,
+    "warmup": True,
+    "commands": [
+        {"command": "create_lot", "description": "Создать новый лот"},
+        {"command": "create_lot_cancel", "description": "Отменить создание лота"},
+        {"command": "manage_presets", "description": "Управление пресетами"},
+        {"command": "plugin_diag", "description": "Диагностика плагина"},
+    ],
+    "callbacks": ["pick_game:", "pick_cat:", "pick_sub:", "pick_hit:", "confirm_lot:"],
+    "buttons": [
+        {"text": "➕ Новый лот", "callback": "clp:start"},
+        {"text": "📋 Пресеты", "callback": "clp:presets"},
+    ],
+}
+
 
 
 class CreateLotFSM(StatesGroup):
@@ -55,119 +75,74 @@ class CreateLotFSM(StatesGroup):
 CANCEL_COMMANDS = {"/create_lot_cancel", "отмена", "/cancel"}
 
 
-# ==============================================================================
-# ==============================================================================
-class Catalog:
-    """
-    Парсит 'complete_categories_map.json' и предоставляет
-    методы для навигации по играм, категориям и подкатегориям.
-    """
-    def __init__(self, json_path: Path = CATALOG_JSON_PATH):
-        self.path = json_path
-        self.data = self._load_data()
-
-    def _load_data(self) -> Dict[str, Any]:
-        if not self.path.exists():
-            logger.critical(f"ФАЙЛ КАТАЛОГА НЕ НАЙДЕН: {self.path}")
-            return {}
-        try:
-            with open(self.path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if "all_categories_detailed" in data:
-                logger.info(f"✅ Catalog: Успешно загружен {self.path}")
-                return data["all_categories_detailed"]
-            else:
-                logger.error("❌ Catalog: 'all_categories_detailed' не найден в JSON.")
-                return {}
-        except (json.JSONDecodeError, IOError) as e:
-            logger.critical(f"❌ Catalog: Ошибка загрузки/парсинга {self.path}: {e}")
-            return {}
-
-    def _get_game_name(self, game_slug: str) -> str:
-        """Пытается угадать имя игры."""
-        name = game_slug.replace('-', ' ').title()
-        if "brawl-stars" in game_slug: name = "Brawl Stars"
-        if "roblox" in game_slug: name = "Roblox"
-        if "clash-royale" in game_slug: name = "Clash Royale"
-        if "clash-of-clans" in game_slug: name = "Clash of Clans"
-        return name
-
-    def list_games(self) -> List[Tuple[str, str]]:
-        """Возвращает список игр: (slug, name)"""
-        games = []
-        for slug in self.data.keys():
-            games.append((slug, self._get_game_name(slug)))
-        return sorted(games, key=lambda g: g[1])
-
-    def get_game_name(self, slug: str) -> str:
-        return self._get_game_name(slug)
-
-    def list_categories(self, game_slug: str) -> List[Tuple[str, str, int]]:
-        """
-        Возвращает список категорий (продуктов) для игры.
-        Формат: (slug, name, id)
-        """
-        game_data = self.data.get(game_slug, {})
-        categories = []
-        for cat_slug, cat_details in game_data.items():
-            if cat_details.get("isActive", True): 
-                categories.append((
-                    cat_slug, # e.g. 'gems'
-                    cat_details.get("name", cat_slug.title()), # e.g. 'Гемы'
-                    cat_details.get("id") # e.g. 128
-                ))
-        categories.sort(key=lambda c: (game_data[c[0]].get("position", 99), c[1]))
-        return categories
-
-    def get_category_name(self, game_slug: str, cat_slug: str) -> str:
-        """Возвращает имя категории по slug."""
-        cat_details = self.data.get(game_slug, {}).get(cat_slug, {})
-        return cat_details.get("name", cat_slug.title())
-
-    def list_subcategories(self, game_slug: str, cat_slug: str) -> List[Tuple[str, str, int]]:
-        """
-        Возвращает список ПОДкатегорий, отсортированный по 'position'.
-        Формат: (slug, name, id)
-        """
-        cat_details = self.data.get(game_slug, {}).get(cat_slug, {})
-        sub_cats_list = cat_details.get("subCategories", [])
-        
-        if not sub_cats_list:
-            return []
-            
-        subcategories_with_pos = []
-        for sub_details in sub_cats_list:
-            if sub_details.get("isActive", True):
-                subcategories_with_pos.append((
-                    sub_details.get("slug"), # [0] e.g. null
-                    sub_details.get("name"), # [1] e.g. '30 гемов'
-                    sub_details.get("id"),   # [2] e.g. 438
-                    sub_details.get("position", 99) # [3] e.g. 1
-                ))
-        
-        subcategories_with_pos.sort(key=lambda s: s[3])
-        
-        return [(slug, name, _id) for slug, name, _id, pos in subcategories_with_pos]
-
-    def get_subcategory_details(self, game_slug: str, cat_slug: str, sub_id: int) -> Optional[Dict[str, Any]]:
-        """Находит subcategory по ID и возвращает ее dict."""
-        cat_details = self.data.get(game_slug, {}).get(cat_slug, {})
-        sub_cats_list = cat_details.get("subCategories", [])
-        for sub in sub_cats_list:
-            if sub.get("id") == sub_id:
-                return sub
-        return None
-
-    def get_category_details(self, game_slug: str, cat_slug: str) -> Optional[Dict[str, Any]]:
-        """Возвращает dict категории (продукта)."""
-        return self.data.get(game_slug, {}).get(cat_slug, {})
+def build_lot_payload(id_key: int, slug_key: str, sub_id: Optional[int], preset_data: Dict[str, Any],
+                      title_str: str, desc_str: str, price_str: str,
+                      user_numeric_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Собирает payload для /api/offers/create: дефолтные атрибуты + атрибуты пресета + numeric-поля."""
+    default_attrs_list = get_default_basic_attributes(slug_key)
+    custom_attrs_list = preset_data.get("basic", [])
+
+    merged_attrs_map = {}
+    for attr in default_attrs_list:
+        if 'id' in attr and 'optionId' in attr:
+            merged_attrs_map[attr['id']] = attr['optionId']
+
+    for attr in custom_attrs_list:
+        if 'id' in attr and 'optionId' in attr:
+            merged_attrs_map[attr['id']] = attr['optionId']
+
+    basic_attrs = [{"id": k, "optionId": v} for k, v in merged_attrs_map.items()]
+
+    numeric_attrs = build_numeric_attributes(
+        slug_key, 
+        sub_id,
+        user_numeric_inputs,
+    )
+
+    if slug_key.endswith("__gems"):
+        availability_value = 4999
+    else:
+        availability_value = 99999
+
+    payload = {
+        "type": "LOT",
+        "isActive": True,
+        "categoryId": id_key,        # e.g. 128
+        "subCategoryId": sub_id,    # e.g. 449 (или None, если нет)
+
+        "price": price_str,         # e.g. "499" (СТРОКА)
+
+        "availability": availability_value, # e.g. 4999 (ЧИСЛО)
+
+        "goods": [],
+
+        "postPaymentMessage": preset_data.get("postPaymentMessage", "Спасибо за покупку!"), 
+        "deliveryTime": preset_data.get("deliveryTime", { 
+            "from": {"unit": "MINUTES", "value": 15},
+            "to": {"unit": "MINUTES", "value": 60}
+        }),
+
+        "descriptions": {
+            "rus": {
+                "briefDescription": title_str,
+                "description": desc_str
+            }
+        },
+
+        "basicAttributes": basic_attrs,
+        "numericAttributes": numeric_attrs,
+    }
+
+    return {k: v for k, v in payload.items() if v is not None}
+
 
 # ==============================================================================
 # ==============================================================================
 class CreateLotPro:
-    def __init__(self, nexus):
+    def __init__(self, nexus, context=None):
         self.nexus = nexus
+        # общий клиент из context плагинов: пул соединений и текущая сессия из nexus.settings
+        self.starvell = (context or {}).get("starvell") or SharedStarVellClient(nexus)
         
         self.name = "CreateLotPro"
         self.version = "4.5.0"
@@ -186,53 +161,38 @@ class CreateLotPro:
             {"text": "📋 Пресеты", "callback": "clp:presets"},
         ]
         
-        self.catalog = Catalog(json_path=CATALOG_JSON_PATH) 
-        self.preset_manager = PresetManager()
+        self.preset_manager = get_preset_manager()
+        self.preset_problems = self._check_presets()
         
-        self.sid = self._load_session_from_config()
         if not self.sid:
-            logger.error("КРИТИЧЕСКАЯ ОШИБКА: Не удалось загрузить session из конфига.")
-            
-        self.session = self._get_session(self.sid)
-        
+            logger.error("КРИТИЧЕСКАЯ ОШИБКА: в configs/_main.cfg нет session.")
+
         self.router = Router(name="create_lot_pro")
         self.setup_handlers()
 
-    def _load_session_from_config(self) -> Optional[str]:
-        try:
-            if self.nexus and hasattr(self.nexus, 'account') and self.nexus.account:
-                if hasattr(self.nexus.account, 'session_id'):
-                    sid = self.nexus.account.session_id
-                    if sid:
-                        logger.info(f"Сессия {sid[:10]}... загружена из nexus.account")
-                        return sid
-            
-            if self.nexus and hasattr(self.nexus, 'main_cfg'):
-                main_cfg = self.nexus.main_cfg
-                if isinstance(main_cfg, dict):
-                    starvell_section = main_cfg.get("StarVell", {})
-                    sid = (starvell_section.get("session") or starvell_section.get("session_id") or "").strip()
-                    if sid:
-                        logger.info(f"Сессия {sid[:10]}... загружена из configs/_main.cfg")
-                        return sid
-            
-            for f in SESSION_FILES:
-                if f.exists():
-                    try:
-                        with open(f, 'r') as file:
-                            data = json.load(file)
-                            sid = data.get("session_id")
-                            if sid:
-                                logger.warning(f"⚠️ Сессия {sid[:10]}... загружена из {f} (старый способ, рекомендуется использовать configs/_main.cfg)")
-                                return sid
-                    except Exception:
-                        continue
-            
-            logger.error("Не удалось найти session ни в конфиге, ни в session.json")
-            return None
-        except Exception as e:
-            logger.error(f"Ошибка загрузки сессии: {e}")
-            return None
+    @property
+    def catalog(self):
+        """Всегда текущий каталог: фоновое обновление (catalog_refresh) подменяет его целиком."""
+        return get_catalog()
+
+    @property
+    def validation(self):
+        return get_validation_tables(self.catalog)
+
+    @property
+    def sid(self) -> str:
+        """Сессия всегда текущая: смена через reinit_account подхватывается без перезагрузки плагина."""
+        return self.starvell.session_id
+
+    def _check_presets(self) -> dict:
+        """Проверяет все сохранённые пресеты по текущему каталогу."""
+        problems = self.validation.check_presets(self.preset_manager.presets)
+        for (id_key, name), result in problems.items():
+            for msg in result.errors:
+                logger.warning(f"Пресет '{name}' ({id_key}): {msg}")
+            for msg in result.warnings:
+                logger.info(f"Пресет '{name}' ({id_key}): {msg}")
+        return problems
 
     def setup_handlers(self):
         logger.info("CreateLotPro (Preset Logic v4.5): Регистрация обработчиков...")
@@ -246,6 +206,7 @@ class CreateLotPro:
         self.router.callback_query(F.data.startswith("pick_game:"))(self.handle_game_choice)
         self.router.callback_query(F.data.startswith("pick_cat:"))(self.handle_category_choice)
         self.router.callback_query(F.data.startswith("pick_sub:"))(self.handle_subcategory_choice)
+        self.router.callback_query(F.data.startswith("pick_hit:"))(self.handle_search_pick)
         
         self.router.callback_query(CreateLotFSM.PRESET_CHOICE, F.data.startswith("preset_pick:"))(self.handle_preset_pick)
         self.router.callback_query(CreateLotFSM.PRESET_CHOICE, F.data == "preset_create_new")(self.handle_preset_create_start)
@@ -277,6 +238,7 @@ class CreateLotPro:
             f"✅ CreateLotPro (Preset Logic v4.5) активен.\n"
             f"📚 Игр загружено: {len(self.catalog.list_games())}\n"
             f"🔑 Сессия: {session_status}\n"
+            f"🧩 Пресетов с ошибками: {sum(1 for r in self.preset_problems.values() if not r.ok)}\n"
             f"FSM Состояние: {st or 'IDLE'}"
         )
 
@@ -289,12 +251,16 @@ class CreateLotPro:
         await state.clear()
         await message.answer("❌ Мастер создания лота отменен.")
 
-    async def start(self, message: Message, state: FSMContext):
+    async def start(self, message: Message, state: FSMContext, command: Optional[CommandObject] = None):
         if not self.sid:
             await message.answer("⚠️ <b>Критическая ошибка:</b>\nSession не найдена в `configs/_main.cfg` (секция [StarVell], ключ 'session' или 'session_id').\nПлагин не может отправлять запросы. Проверь конфиг и перезапусти бота.")
             return
 
         await state.clear()
+
+        query = (command.args or "").strip() if command else ""
+        if query and await self._show_search_results(message, state, query):
+            return
         
         games = self.catalog.list_games()
         if not games:
@@ -334,10 +300,52 @@ class CreateLotPro:
         )
         await query.answer()
 
+    async def _show_search_results(self, message: Message, state: FSMContext, text: str) -> bool:
+        """/create_lot <запрос>: кнопки с лучшими совпадениями. False — ничего не найдено."""
+        hits = get_search_index(self.catalog).search(text)
+        if not hits:
+            await message.answer(f"🔎 По запросу «{html.escape(text)}» ничего не найдено, выбери игру вручную.")
+            return False
+
+        kb = InlineKeyboardBuilder()
+        for hit in hits:
+            if hit.cat_id is None:
+                kb.button(text=hit.label, callback_data=f"pick_game:{hit.game_slug}")
+            else:
+                kb.button(text=hit.label, callback_data=f"pick_hit:{hit.cat_id}:{hit.sub_id or 0}")
+        kb.adjust(1)
+
+        await state.set_state(CreateLotFSM.GAME)
+        await message.answer(f"🔎 <b>Результаты по запросу «{html.escape(text)}»</b>", reply_markup=kb.as_markup())
+        return True
+
+    async def handle_search_pick(self, query: CallbackQuery, state: FSMContext):
+        _parts = query.data.split(":")
+        cat_id, sub_id = int(_parts[1]), int(_parts[2])
+
+        cat = self.catalog.find_category(cat_id)
+        if not cat:
+            await query.answer("Ошибка: категория не найдена в каталоге.", show_alert=True)
+            return
+
+        await state.update_data(game_slug=cat.game_slug, game_name=self.catalog.get_game_name(cat.game_slug))
+        if not sub_id:
+            await self._pick_category(query, state, cat.slug, cat.id)
+            return
+
+        await state.update_data(
+            cat_slug=cat.slug,
+            cat_id=cat.id,
+            cat_name=cat.name,
+            cat_slug_for_filters=cat.slug
+        )
+        await self._pick_subcategory(query, state, sub_id)
+
     async def handle_category_choice(self, query: CallbackQuery, state: FSMContext):
         _parts = query.data.split(":")
-        cat_slug, cat_id = _parts[1], int(_parts[2])
-        
+        await self._pick_category(query, state, _parts[1], int(_parts[2]))
+
+    async def _pick_category(self, query: CallbackQuery, state: FSMContext, cat_slug: str, cat_id: int):
         data = await state.get_data()
         game_slug = data["game_slug"]
         cat_name = self.catalog.get_category_name(game_slug, cat_slug)
@@ -372,8 +380,9 @@ class CreateLotPro:
         await query.answer()
 
     async def handle_subcategory_choice(self, query: CallbackQuery, state: FSMContext):
-        sub_id = int(query.data.split(":")[-1])
+        await self._pick_subcategory(query, state, int(query.data.split(":")[-1]))
 
+    async def _pick_subcategory(self, query: CallbackQuery, state: FSMContext, sub_id: int):
         data = await state.get_data()
         game_slug = data["game_slug"]
         cat_slug = data["cat_slug"]
@@ -483,11 +492,7 @@ class CreateLotPro:
         game_slug = data["game_slug"]
         cat_slug = data["cat_slug"]
         
-        all_filters = []
-        
-        cat_details = self.catalog.get_category_details(game_slug, cat_slug)
-        if cat_details:
-             all_filters = cat_details.get("filters", [])
+        all_filters = self.catalog.get_category_filters(game_slug, cat_slug)
         
         if not all_filters:
             await message.answer(f"⚠️ Не найдены Basic-атрибуты (filters) в JSON для '{cat_slug}'.\n\nПерехожу к Numeric-полям...")
@@ -877,66 +882,30 @@ class CreateLotPro:
             await state.clear()
             return
             
-        default_attrs_list = get_default_basic_attributes(slug_key)
-        custom_attrs_list = preset_data.get("basic", [])
-
-        merged_attrs_map = {}
-        for attr in default_attrs_list:
-            if 'id' in attr and 'optionId' in attr:
-                merged_attrs_map[attr['id']] = attr['optionId']
-
-        for attr in custom_attrs_list:
-            if 'id' in attr and 'optionId' in attr:
-                merged_attrs_map[attr['id']] = attr['optionId']
-        
-        basic_attrs = [{"id": k, "optionId": v} for k, v in merged_attrs_map.items()]
-        
-        user_numeric_inputs = data.get("user_numeric_inputs", {})
-        numeric_attrs = build_numeric_attributes(
-            slug_key, 
-            sub_id,
-            user_numeric_inputs,
+        payload = build_lot_payload(
+            id_key, slug_key, sub_id, preset_data,
+            title_str, desc_str, price_str,
+            data.get("user_numeric_inputs", {}),
         )
-
-        if slug_key.endswith("__gems"):
-            availability_value = 4999
-        else:
-            availability_value = 99999
-
-        payload = {
-            "type": "LOT",
-            "isActive": True,
-            "categoryId": id_key,        # e.g. 128
-            "subCategoryId": sub_id,    # e.g. 449 (или None, если нет)
-            
-            "price": price_str,         # e.g. "499" (СТРОКА)
-            
-            "availability": availability_value, # e.g. 4999 (ЧИСЛО)
-            
-            "goods": [],
-            
-            "postPaymentMessage": preset_data.get("postPaymentMessage", "Спасибо за покупку!"), 
-            "deliveryTime": preset_data.get("deliveryTime", { 
-                "from": {"unit": "MINUTES", "value": 15},
-                "to": {"unit": "MINUTES", "value": 60}
-            }),
-            
-            "descriptions": {
-                "rus": {
-                    "briefDescription": title_str,
-                    "description": desc_str
-                }
-            },
-            
-            "basicAttributes": basic_attrs,
-            "numericAttributes": numeric_attrs,
-        }
         
-        payload = {k: v for k, v in payload.items() if v is not None}
+        logger.info(f"Chat {query.message.chat.id}: Создаю лот в категории {id_key} (подкатегория {sub_id})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("PAYLOAD: %s", json_codec.dumps(payload))
         
-        logger.info(f"Chat {query.message.chat.id}: Отправка PAYLOAD:\n{json.dumps(payload, indent=2)}")
-        
-        response_ok, response_data = self._post_create(payload)
+        check = self.validation.check_payload(payload)
+        for msg in check.warnings:
+            logger.warning(f"Chat {query.message.chat.id}: {msg}")
+        if not check.ok:
+            errors = "\n".join(f"• {html.escape(msg)}" for msg in check.errors)
+            await query.message.edit_text(
+                f"⚠️ <b>Лот не отправлен — атрибуты не прошли проверку:</b>\n\n{errors}\n\n"
+                f"Исправь пресет и начни заново /create_lot"
+            )
+            await query.answer()
+            await state.clear()
+            return
+
+        response_ok, response_data = await self._post_create(payload)
         
         if response_ok:
             lot_id = response_data.get('id', 'N/A')
@@ -966,52 +935,22 @@ class CreateLotPro:
         await message.answer("🕹 <b>[Менеджер Пресетов]</b>\n\nВыбери игру, категорию и подкатегорию, для которой хочешь посмотреть/создать/удалить пресет.")
     
     
-    def _get_session(self, sid: Optional[str]):
-        s = requests.Session()
-        
-        s.headers.update({
-            "User-Agent": "StarVellBot/1.0",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        })
-        
-        if sid:
-            s.cookies.set("session", sid, domain="starvell.com")
-            logger.info(f"Установка SID: {sid[:10]}...")
-        else:
-            logger.warning("sid не передан в _get_session. Запросы будут анонимными.")
-            
-        return s 
-
-    def _post_create(self, payload) -> Tuple[bool, dict]:
-        
+    async def _post_create(self, payload) -> Tuple[bool, dict]:
         if not self.sid:
-            return False, {"error": "SESSION_NOT_FOUND (Бот не смог загрузить session из configs/_main.cfg при старте)"}
-            
+            return False, {"error": "SESSION_NOT_FOUND (нет session в configs/_main.cfg)"}
         try:
-            r = self.session.post(API_CREATE_URL, json=payload, timeout=30)
-            r.raise_for_status()
-            return True, r.json()
-
-        except requests.exceptions.HTTPError as e:
-            try: 
-                error_json = e.response.json()
-                error_message = error_json.get('message', 'No message')
-                error_data = error_json.get('data', {})
-                
-                detailed_error = f"HTTP {e.response.status_code}: {error_message}\n"
-                if error_data:
-                    detailed_error += f"DATA: {json.dumps(error_data)}"
-                
-                return False, {"error": detailed_error}
-            
-            except json.JSONDecodeError: 
-                return False, {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
+            return await self.starvell.create_offer(payload)
         except Exception as e:
             logger.exception(f"Критическая ошибка в _post_create: {e}")
             return False, {"error": str(e)}
 
 
+def warmup():
+    """Фоновый прогрев (PluginManager.warmup): каталог, поисковый индекс и таблицы валидации."""
+    get_search_index(get_catalog())
+    get_validation_tables()
+
+
 def attach(dp=None, bot=None, context=None):
     try:
         nexus = None
@@ -1021,7 +960,7 @@ def attach(dp=None, bot=None, context=None):
             logger.warning("⚠️ attach() вызван без nexus — пропуск.")
             return
         
-        plugin = CreateLotPro(nexus)
+        plugin = CreateLotPro(nexus, context)
         
         if dp:
             dp.include_router(plugin.router)
@@ -0,0 +1,207 @@
+"""
+Наши лоты из локального зеркала (core/offers_mirror.py): список, поиск и пагинация
+без запросов к StarVell.
+
+/offers           — все лоты
+/offers <текст>   — поиск по названию
+"""
+import html
+import logging
+import time
+from typing import Optional
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message, CallbackQuery
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from .utils.catalog import get_catalog
+
+logger = logging.getLogger("plugin.my_offers")
+
+MANIFEST = {
+    "name": "MyOffers",
+    "author": "@AnastasiaPisun",
+    "description": "Список и поиск своих лотов",
+    "lazy": True,
+    "commands": [{"command": "offers", "description": "Мои лоты (поиск: /offers текст)"}],
+    "callbacks": ["offers:"],
+    "buttons": [{"text": "📦 Мои лоты", "callback": "offers:p:0"}],
+}
+
+PAGE_SIZE = 8
+
+
+class MyOffers:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "MyOffers"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Список и поиск своих лотов"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "offers", "description": "Мои лоты (поиск: /offers текст)"},
+        ]
+        self.buttons = [
+            {"text": "📦 Мои лоты", "callback": "offers:p:0"},
+        ]
+
+        self.router = Router(name="my_offers")
+        self.setup_handlers()
+
+    @property
+    def catalog(self):
+        return get_catalog()
+
+    @property
+    def mirror(self):
+        return self.nexus.offers_mirror
+
+    def setup_handlers(self):
+        self.router.message(Command("offers"))(self.cmd_offers)
+        self.router.callback_query(F.data.startswith("offers:p:"))(self.handle_page)
+        self.router.callback_query(F.data.startswith("offers:v:"))(self.handle_view)
+        self.router.callback_query(F.data == "offers:sync")(self.handle_sync)
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    # ------------------------------------------------------------------
+
+    def _category_label(self, category_id: Optional[int], subcategory_id: Optional[int]) -> str:
+        cat = self.catalog.find_category(category_id) if category_id is not None else None
+        if cat is None:
+            return f"#{category_id}"
+        label = f"{self.catalog.get_game_name(cat.game_slug)} › {cat.name}"
+        sub = self.catalog.find_subcategory(subcategory_id) if subcategory_id is not None else None
+        return f"{label} › {sub.name}" if sub else label
+
+    async def _render_page(self, page: int, query: str):
+        total = await self.mirror.count_offers(query=query)
+        pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+        page = min(max(0, page), pages - 1)
+        offers = await self.mirror.list_offers(query=query, offset=page * PAGE_SIZE, limit=PAGE_SIZE)
+
+        kb = InlineKeyboardBuilder()
+        for offer in offers:
+            mark = "🟢" if offer["is_active"] else "⚪️"
+            title = offer["title"] or offer["id"]
+            kb.button(text=f"{mark} {title[:40]} — {offer['price']:g} ₽", callback_data=f"offers:v:{offer['id']}")
+        kb.adjust(1)
+
+        nav = InlineKeyboardBuilder()
+        if page > 0:
+            nav.button(text="◀️", callback_data=f"offers:p:{page - 1}")
+        nav.button(text=f"{page + 1}/{pages}", callback_data=f"offers:p:{page}")
+        if page < pages - 1:
+            nav.button(text="▶️", callback_data=f"offers:p:{page + 1}")
+        nav.button(text="🔄", callback_data="offers:sync")
+        kb.attach(nav)
+
+        synced = self.mirror.last_sync
+        synced_text = time.strftime("%H:%M:%S", time.localtime(synced)) if synced else "ещё не было"
+        header = f"📦 <b>Мои лоты</b>: {total}"
+        if query:
+            header += f" (поиск: «{html.escape(query)}»)"
+        return f"{header}\n🕒 Синхронизация: {synced_text}", kb.as_markup()
+
+    # ------------------------------------------------------------------
+
+    async def cmd_offers(self, message: Message, state: FSMContext, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        query = (command.args or "").strip() if command else ""
+        await state.update_data(offers_query=query)
+        text, markup = await self._render_page(0, query)
+        await message.answer(text, reply_markup=markup)
+
+    async def handle_page(self, query: CallbackQuery, state: FSMContext):
+        page = int(query.data.split(":")[-1])
+        data = await state.get_data()
+        text, markup = await self._render_page(page, data.get("offers_query", ""))
+        await state.update_data(offers_page=page)
+        try:
+            await query.message.edit_text(text, reply_markup=markup)
+        except Exception as e:  # message is not modified
+            logger.debug("offers page edit: %s", e)
+        await query.answer()
+
+    async def handle_view(self, query: CallbackQuery, state: FSMContext):
+        offer_id = query.data.split(":", 2)[-1]
+        offer = await self.mirror.get_offer(offer_id)
+        if not offer:
+            await query.answer("Лот не найден в зеркале — обнови список.", show_alert=True)
+            return
+
+        data = await state.get_data()
+        kb = InlineKeyboardBuilder()
+        kb.button(text="🔗 Открыть на StarVell", url=f"https://starvell.com/offers/{offer['id']}")
+        kb.button(text="◀️ Назад", callback_data=f"offers:p:{data.get('offers_page', 0)}")
+        kb.adjust(1)
+
+        status = "🟢 активен" if offer["is_active"] else "⚪️ выключен"
+        await query.message.edit_text(
+            f"<b>{html.escape(offer['title'] or offer['id'])}</b>\n\n"
+            f"🆔 <code>{offer['id']}</code>\n"
+            f"📂 {html.escape(self._category_label(offer['category_id'], offer['subcategory_id']))}\n"
+            f"💰 {offer['price']:g} ₽\n"
+            f"📦 В наличии: {offer['availability']}\n"
+            f"Статус: {status}",
+            reply_markup=kb.as_markup(),
+        )
+        await query.answer()
+
+    async def handle_sync(self, query: CallbackQuery, state: FSMContext):
+        try:
+            result = await self.mirror.sync()
+        except Exception as e:
+            await query.answer(f"Не удалось обновить: {e}", show_alert=True)
+            return
+        await query.answer(f"+{len(result.added)} ~{len(result.changed)} -{len(result.removed)}")
+        data = await state.get_data()
+        text, markup = await self._render_page(data.get("offers_page", 0), data.get("offers_query", ""))
+        try:
+            await query.message.edit_text(text, reply_markup=markup)
+        except Exception as e:
+            logger.debug("offers page edit: %s", e)
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+        if getattr(nexus, "offers_mirror", None) is None:
+            logger.warning("⚠️ MyOffers: у nexus нет offers_mirror — пропуск.")
+            return
+
+        plugin = MyOffers(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ MyOffers не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["my_offers"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["my_offers"] = plugin
+
+        logger.info("✅ MyOffers успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() MyOffers: {e}")
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
-import json
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from Utils import json_codec
 from StarVellAPI.starvell_config_FINAL_v14 import (
     get_default_basic_attributes,
     get_default_numeric_fields
@@ -35,17 +36,15 @@ class PresetManager:
         if not PRESETS_FILE.exists():
             return {}
         try:
-            with open(PRESETS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            return json_codec.load_file(PRESETS_FILE)
+        except (json_codec.JSONDecodeError, IOError) as e:
             logger.error(f"Ошибка загрузки {PRESETS_FILE}: {e}")
             return {}
 
     def _save(self):
         """Сохраняет пресеты в JSON-файл."""
         try:
-            with open(PRESETS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.presets, f, indent=2, ensure_ascii=False)
+            json_codec.dump_file(PRESETS_FILE, self.presets)
         except IOError as e:
             logger.error(f"Ошибка сохранения {PRESETS_FILE}: {e}")
 
@@ -114,4 +113,21 @@ class PresetManager:
             return True
         
         logger.warning(f"Пресет '{preset_name}' для {id_key} не найден для удаления.")
-        return False
\ No newline at end of file
+        return False
+
+
+_shared_manager: Optional[PresetManager] = None
+_shared_lock = threading.Lock()
+
+
+def get_preset_manager() -> PresetManager:
+    """
+    Общие пресеты для CreateLotPro и BulkLots: правка в мастере сразу видна массовому созданию,
+    независимо от того, загружен ли уже ленивый create_lot_pro.
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_lock:
+            if _shared_manager is None:
+                _shared_manager = PresetManager()
+    return _shared_manager
@@ -0,0 +1,287 @@
+"""
+Цены конкурентов и автоматическая подстройка своих цен (core/price_scanner.py).
+
+/prices                                        — обойти категории, где у нас есть лоты, и показать сводку
+/reprice <категория> <дельта> <минимум> [макс]  — держать цену на <дельта> ₽ ниже самого дешёвого конкурента
+/reprice_off <категория>                       — выключить правило
+/reprice_list                                  — правила
+
+Категория — ID или slug вида 'brawl-stars/gems'. Правила применяются при каждом фоновом
+проходе (раз в SCAN_INTERVAL) только к активным лотам, цены сравниваются внутри подкатегории.
+"""
+import asyncio
+import html
+import logging
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from Utils import json_codec
+from core.bulk_edit import push_changes
+from core.price_scanner import PriceScanner, RepriceRule, plan_reprice
+from core.starvell_client import get_client
+from .utils.catalog import get_catalog
+
+logger = logging.getLogger("plugin.price_scanner")
+
+RULES_PATH = "storage/reprice_rules.json"
+SCAN_INTERVAL = 600.0
+REPRICE_CONCURRENCY = 8
+
+
+class PriceScannerPlugin:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "PriceScanner"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Цены конкурентов и автоподстройка цен"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "prices", "description": "Цены конкурентов в моих категориях"},
+            {"command": "reprice", "description": "Правило автоцены для категории"},
+            {"command": "reprice_off", "description": "Выключить автоцену категории"},
+            {"command": "reprice_list", "description": "Правила автоцены"},
+        ]
+        self.buttons = []
+
+        self.scanner = PriceScanner()
+        self.rules: Dict[int, RepriceRule] = self._load_rules()
+        self._lock = asyncio.Lock()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+        self.router = Router(name="price_scanner")
+        self.setup_handlers()
+
+    @property
+    def catalog(self):
+        return get_catalog()
+
+    @property
+    def mirror(self):
+        return self.nexus.offers_mirror
+
+    def setup_handlers(self):
+        self.router.message(Command("prices"))(self.cmd_prices)
+        self.router.message(Command("reprice"))(self.cmd_reprice)
+        self.router.message(Command("reprice_off"))(self.cmd_reprice_off)
+        self.router.message(Command("reprice_list"))(self.cmd_reprice_list)
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_rules() -> Dict[int, RepriceRule]:
+        try:
+            data = json_codec.load_file(RULES_PATH)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("⚠️ Не удалось прочитать %s: %s", RULES_PATH, e)
+            return {}
+        return {int(k): RepriceRule(**v) for k, v in data.items()}
+
+    def _save_rules(self):
+        Path(RULES_PATH).parent.mkdir(parents=True, exist_ok=True)
+        json_codec.dump_file(RULES_PATH, {str(k): asdict(v) for k, v in self.rules.items()}, pretty=True)
+
+    def _resolve_category(self, value: str):
+        if value.isdigit():
+            return self.catalog.find_category(int(value))
+        for sep in ("/", "__"):
+            if sep in value:
+                game_slug, cat_slug = value.split(sep, 1)
+                return self.catalog.get_category(game_slug.strip(), cat_slug.strip())
+        return None
+
+    def _label(self, category_id: int) -> str:
+        cat = self.catalog.find_category(category_id)
+        return f"{self.catalog.get_game_name(cat.game_slug)} › {cat.name}" if cat else f"#{category_id}"
+
+    async def _targets(self) -> Dict[int, str]:
+        targets = {}
+        for category_id in await self.mirror.active_category_ids():
+            cat = self.catalog.find_category(category_id)
+            if cat is not None:
+                targets[category_id] = f"/{cat.game_slug}/{cat.slug}"
+        return targets
+
+    # ------------------------------------------------------------------
+
+    async def _exclude_own(self):
+        """Наши продавцы и лоты всех аккаунтов процесса — чтобы не считать себя конкурентом."""
+        accounts = getattr(self.nexus, "accounts", None) or {"": self.nexus}
+        self.scanner.exclude_sellers = {str(p._my_user_id) for p in accounts.values()
+                                        if getattr(p, "_my_user_id", None) is not None}
+        offer_ids = set()
+        for peer in accounts.values():
+            offer_ids |= await peer.offers_mirror.offer_ids()
+        self.scanner.exclude_offers = offer_ids
+
+    async def scan_and_reprice(self) -> Dict[int, str]:
+        """Один проход: цены всех наших категорий, затем правила. Возвращает ошибки загрузки."""
+        async with self._lock:
+            await self._exclude_own()
+            errors = await self.scanner.scan(await self._targets())
+            if getattr(self.nexus, "_my_user_id", None) is None:
+                # без своего ID продавца наш лот может оказаться «самым дешёвым конкурентом»
+                logger.warning("⚠️ Автоцена пропущена: аккаунт ещё не авторизован")
+            else:
+                await self.reprice()
+            return errors
+
+    async def reprice(self):
+        plan = {}
+        for category_id, rule in self.rules.items():
+            ladder = self.scanner.ladders.get(category_id)
+            if not rule.enabled or ladder is None:
+                continue
+            plan.update(plan_reprice(await self.mirror.select_offers(category_id=category_id), ladder, rule))
+        if not plan:
+            return
+
+        client = get_client(self.nexus.settings.starvell.session_id)
+        semaphore = asyncio.Semaphore(REPRICE_CONCURRENCY)
+        failed = 0
+
+        async def send(offer_id: str, changes: dict):
+            nonlocal failed
+            async with semaphore:
+                error = await push_changes(client, self.mirror, offer_id, changes)
+            if error:
+                failed += 1
+                logger.warning("⚠️ Автоцена лота %s: %s", offer_id, error)
+
+        await asyncio.gather(*(send(i, c) for i, c in plan.items()))
+        logger.info("💱 Автоцена: изменено %s, ошибок %s", len(plan) - failed, failed)
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.sleep(SCAN_INTERVAL)
+                if self.rules:
+                    await self.scan_and_reprice()
+            except asyncio.CancelledError:
+                await self.scanner.close()
+                break
+            except Exception as e:
+                logger.warning("⚠️ Сканер цен: %s", e)
+
+    # ------------------------------------------------------------------
+
+    async def cmd_prices(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        progress = await message.answer("🔎 Собираю цены…")
+        errors = await self.scan_and_reprice()
+
+        lines = ["💹 <b>Цены конкурентов</b>"]
+        for category_id in sorted(self.scanner.ladders, key=self._label):
+            ladder = self.scanner.ladders[category_id]
+            offers = await self.mirror.select_offers(category_id=category_id, active=True)
+            if not offers:
+                continue
+            lines.append(f"\n<b>{html.escape(self._label(category_id))}</b> — конкурентов: {ladder.total}")
+            for offer in offers[:5]:
+                cheapest = ladder.cheapest(offer["subcategory_id"])
+                place = ladder.position(offer["price"], offer["subcategory_id"]) + 1
+                other = f"мин. {cheapest:g} ₽, место {place}" if cheapest is not None else "конкурентов нет"
+                lines.append(f"• {html.escape(offer['title'][:35])}: {offer['price']:g} ₽ ({other})")
+        if errors:
+            lines.append(f"\n⚠️ Не загрузились: {', '.join(html.escape(self._label(c)) for c in errors)}")
+        await progress.edit_text("\n".join(lines)[:4000])
+
+    async def cmd_reprice(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        args = (command.args or "").split() if command else []
+        usage = "Использование: <code>/reprice &lt;категория&gt; &lt;дельта&gt; &lt;минимум&gt; [максимум]</code>"
+        if len(args) < 3:
+            await message.answer(usage)
+            return
+        cat = self._resolve_category(args[0])
+        if cat is None:
+            await message.answer(f"❌ Категория не найдена: {html.escape(args[0])}")
+            return
+        try:
+            numbers = [float(a.replace(",", ".")) for a in args[1:4]]
+        except ValueError:
+            await message.answer(usage)
+            return
+        rule = RepriceRule(delta=numbers[0], floor=numbers[1], ceiling=numbers[2] if len(numbers) > 2 else None)
+        if rule.floor <= 0 or (rule.ceiling is not None and rule.ceiling < rule.floor):
+            await message.answer("❌ Минимум должен быть больше нуля и не больше максимума.")
+            return
+        self.rules[cat.id] = rule
+        self._save_rules()
+        await message.answer(
+            f"💱 {html.escape(self._label(cat.id))}: самый дешёвый конкурент − {rule.delta:g} ₽, "
+            f"не ниже {rule.floor:g} ₽" + (f", не выше {rule.ceiling:g} ₽" if rule.ceiling is not None else "")
+        )
+
+    async def cmd_reprice_off(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        cat = self._resolve_category((command.args or "").strip()) if command and command.args else None
+        if cat is None or self.rules.pop(cat.id, None) is None:
+            await message.answer("❌ Правило не найдено.")
+            return
+        self._save_rules()
+        await message.answer(f"⏹ Автоцена выключена: {html.escape(self._label(cat.id))}")
+
+    async def cmd_reprice_list(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        if not self.rules:
+            await message.answer("Правил автоцены нет.")
+            return
+        lines = ["💱 <b>Автоцена</b>"]
+        for category_id, rule in self.rules.items():
+            limit = f"{rule.floor:g}–{rule.ceiling:g}" if rule.ceiling is not None else f"от {rule.floor:g}"
+            lines.append(f"• {html.escape(self._label(category_id))}: −{rule.delta:g} ₽, {limit} ₽")
+        await message.answer("\n".join(lines))
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+        if getattr(nexus, "offers_mirror", None) is None:
+            logger.warning("⚠️ PriceScanner: у nexus нет offers_mirror — пропуск.")
+            return
+
+        plugin = PriceScannerPlugin(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ PriceScanner не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["price_scanner"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["price_scanner"] = plugin
+
+        logger.info("✅ PriceScanner успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() PriceScanner: {e}")
@@ -0,0 +1,182 @@
+"""
+Наличие лотов по остаткам автовыдачи (core/stock_sync.py).
+
+/stock_link <товар> <id лота> [id ...]  — привязать лоты к товару автовыдачи
+/stock_unlink <товар> [id ...]          — отвязать (без ID — все лоты товара)
+/stock_links                            — связки и текущие остатки
+/stock_sync                             — сверить всё сейчас
+
+Имя товара — как в меню «⚡ Автовыдача»; если в нём есть пробелы, возьми его в кавычки.
+"""
+import asyncio
+import html
+import logging
+import shlex
+from typing import Optional
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from core.starvell_client import get_client
+from core.stock_sync import StockSync
+from tg_bot.utils import NotificationTypes, is_notification_enabled
+
+logger = logging.getLogger("plugin.stock_sync")
+
+
+class StockSyncPlugin:
+    def __init__(self, nexus):
+        self.nexus = nexus
+
+        self.name = "StockSync"
+        self.version = "1.0.0"
+        self.author = "@AnastasiaPisun"
+        self.description = "Наличие и автоактивация лотов по остаткам автовыдачи"
+        self.enabled = True
+
+        self.commands = [
+            {"command": "stock_link", "description": "Привязать лоты к товару автовыдачи"},
+            {"command": "stock_unlink", "description": "Отвязать лоты от товара"},
+            {"command": "stock_links", "description": "Связки товаров и лотов"},
+            {"command": "stock_sync", "description": "Сверить наличие лотов сейчас"},
+        ]
+        self.buttons = []
+
+        self.db = nexus.telegram.db
+        self.stock = StockSync(
+            counts=self._counts,
+            mirror=nexus.offers_mirror,
+            client_getter=lambda: get_client(nexus.settings.starvell.session_id),
+            notify=self._notify,
+        )
+        self.db.autodelivery_listeners.append(self.stock.mark_dirty)
+        self.task: Optional[asyncio.Task] = asyncio.get_running_loop().create_task(self.stock.run())
+
+        self.router = Router(name="stock_sync")
+        self.setup_handlers()
+
+    def stop(self):
+        """Выгрузка плагина: отписка от изменений автовыдачи (задача отменяется PluginManager'ом)."""
+        if self.stock.mark_dirty in self.db.autodelivery_listeners:
+            self.db.autodelivery_listeners.remove(self.stock.mark_dirty)
+
+    def setup_handlers(self):
+        self.router.message(Command("stock_link"))(self.cmd_link)
+        self.router.message(Command("stock_unlink"))(self.cmd_unlink)
+        self.router.message(Command("stock_links"))(self.cmd_links)
+        self.router.message(Command("stock_sync"))(self.cmd_sync)
+
+    def _is_admin(self, user_id: int) -> bool:
+        tg = getattr(self.nexus, "telegram", None)
+        admin_ids = getattr(tg, "admin_ids", None)
+        if admin_ids is None:
+            admin_ids = self.nexus.settings.telegram.admin_ids
+        return user_id in admin_ids
+
+    async def _counts(self):
+        return dict(await self.db.list_autodelivery())
+
+    async def _notify(self, kind: str, text: str):
+        notification_type = {"deactivate": NotificationTypes.lots_deactivate,
+                             "restore": NotificationTypes.lots_restore}.get(kind)
+        admin_id = getattr(self.nexus.telegram, "admin_id", None)
+        if notification_type and admin_id and not is_notification_enabled(admin_id, notification_type):
+            return
+        await self.nexus._safe_send_tg(html.escape(text))
+
+    @staticmethod
+    def _split(command: Optional[CommandObject]):
+        try:
+            return shlex.split(command.args or "") if command else []
+        except ValueError:
+            return []
+
+    # ------------------------------------------------------------------
+
+    async def cmd_link(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        args = self._split(command)
+        if len(args) < 2:
+            await message.answer("Использование: <code>/stock_link &lt;товар&gt; &lt;id лота&gt; [id ...]</code>")
+            return
+        product, offer_ids = args[0], args[1:]
+        unknown = [i for i in offer_ids if await self.nexus.offers_mirror.get_offer(i) is None]
+        self.stock.link(product, offer_ids)
+        text = f"🔗 «{html.escape(product)}» → {', '.join(offer_ids)}"
+        if unknown:
+            text += f"\n⚠️ Пока нет в зеркале лотов: {', '.join(unknown)} (обновятся после синхронизации /offers)"
+        await message.answer(text)
+
+    async def cmd_unlink(self, message: Message, command: Optional[CommandObject] = None):
+        if not self._is_admin(message.from_user.id):
+            return
+        args = self._split(command)
+        if not args:
+            await message.answer("Использование: <code>/stock_unlink &lt;товар&gt; [id ...]</code>")
+            return
+        removed = self.stock.unlink(args[0], args[1:] or None)
+        await message.answer(f"✂️ Отвязано лотов: {removed}")
+
+    async def cmd_links(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        if not self.stock.links:
+            await message.answer("Связок нет. Пример: <code>/stock_link \"Гемы 170\" 12345</code>")
+            return
+        counts = await self._counts()
+        lines = ["📦 <b>Товары автовыдачи → лоты</b>"]
+        for product, offer_ids in sorted(self.stock.links.items()):
+            lines.append(f"\n<b>{html.escape(product)}</b> — остаток {counts.get(product, 0)}")
+            for offer_id in offer_ids:
+                offer = await self.nexus.offers_mirror.get_offer(offer_id)
+                if offer is None:
+                    lines.append(f"• <code>{offer_id}</code> (нет в зеркале)")
+                    continue
+                mark = "🟢" if offer["is_active"] else "⚪️"
+                lines.append(f"• {mark} <code>{offer_id}</code> {html.escape(offer['title'][:40])} — {offer['availability']} шт.")
+        await message.answer("\n".join(lines))
+
+    async def cmd_sync(self, message: Message):
+        if not self._is_admin(message.from_user.id):
+            return
+        errors = await self.stock.flush(list(self.stock.links))
+        if errors:
+            await message.answer("⚠️ Ошибки:\n" + "\n".join(
+                f"• <code>{i}</code>: {html.escape(e)[:200]}" for i, e in errors.items()))
+        else:
+            await message.answer("✅ Наличие лотов сверено.")
+
+
+def attach(dp=None, bot=None, context=None):
+    try:
+        nexus = None
+        if context: nexus = context.get("nexus")
+        elif bot and hasattr(bot, "nexus"): nexus = bot.nexus
+        if not nexus:
+            logger.warning("⚠️ attach() вызван без nexus — пропуск.")
+            return
+        if getattr(nexus, "offers_mirror", None) is None or getattr(nexus.telegram, "db", None) is None:
+            logger.warning("⚠️ StockSync: нет offers_mirror или базы бота — пропуск.")
+            return
+
+        plugin = StockSyncPlugin(nexus)
+
+        if dp:
+            dp.include_router(plugin.router)
+        else:
+            logger.error("❌ StockSync не смог подключиться: `dp` (Dispatcher) не передан.")
+            return
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm and hasattr(pm, "plugins"):
+            pm.plugins["stock_sync"] = plugin
+        else:
+            if not hasattr(nexus, "plugins"): nexus.plugins = {}
+            nexus.plugins["stock_sync"] = plugin
+
+        logger.info("✅ StockSync успешно подключен.")
+
+    except Exception as e:
+        logger.exception(f"КРИТИЧЕСКАЯ ОШИБКА при attach() StockSync: {e}")
@@ -0,0 +1,364 @@
+"""
+Каталог StarVell: игры → категории → подкатегории.
+
+Исходник — complete_categories_map.json. При первом запуске он компилируется в компактные
+записи (__slots__, интернированные строки), фильтры и опции хранятся сжатым JSON-блоком
+и разворачиваются только по запросу. Результат сохраняется бинарным снимком в storage/cache,
+ключом служит хэш исходного файла. Следующие запуски читают только снимок.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from Utils import json_codec
+
+logger = logging.getLogger("plugin.catalog")
+
+CATALOG_JSON_PATH = Path("plugins") / "utils" / "complete_categories_map.json"
+SNAPSHOT_DIR = Path("storage") / "cache"
+# Обновлённая копия от catalog_refresh.py; используется, если не старше поставляемой
+REFRESHED_JSON_PATH = SNAPSHOT_DIR / "complete_categories_map.json"
+SNAPSHOT_VERSION = 4
+
+# Редко нужные поля; уходят в блок вместе с фильтрами. SEO-тексты, даты и т.п. отбрасываются
+CATEGORY_EXTRA_FIELDS = (
+    "offerType", "priceType", "maxLotCount", "minCurrencyAmount", "instantDelivery",
+    "orderArgs", "serviceFeeRate", "offersPriceScale", "currencyDisplayUnits",
+)
+SUBCATEGORY_EXTRA_FIELDS = ("priceType", "maxOffersCount", "instantDelivery", "orderArgs")
+FILTER_FIELDS = (
+    "id", "nameRu", "options", "position", "range", "isHiddenInDescription", "displayWithFilterName",
+    "isRequired", "required",
+)
+
+GAME_NAMES = {
+    "brawl-stars": "Brawl Stars",
+    "roblox": "Roblox",
+    "clash-royale": "Clash Royale",
+    "clash-of-clans": "Clash of Clans",
+}
+
+
+def guess_game_name(game_slug: str) -> str:
+    """Пытается угадать имя игры."""
+    for key, name in GAME_NAMES.items():
+        if key in game_slug:
+            return name
+    return game_slug.replace('-', ' ').title()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pack(record: dict, extra_fields: Tuple[str, ...]) -> bytes:
+    """Фильтры + редкие поля одним компактным JSON-блоком."""
+    block = {k: record[k] for k in extra_fields if k in record}
+    for key in ("filters", "numericFilters"):
+        block[key] = [{k: f[k] for k in FILTER_FIELDS if k in f} for f in record.get(key) or []]
+    return json_codec.dumpb(block)
+
+
+class SubCategory:
+    __slots__ = ("id", "name", "slug", "position", "is_active", "category_id", "game_slug", "cat_slug", "_block")
+
+    def __init__(self, raw: dict, game_slug: str, cat_slug: str):
+        self.id = raw.get("id")
+        self.name = _intern(raw.get("name"))
+        self.slug = _intern(raw.get("slug"))
+        self.position = raw.get("position", 99)
+        self.is_active = raw.get("isActive", True)
+        self.category_id = raw.get("categoryId")
+        self.game_slug = _intern(game_slug)
+        self.cat_slug = _intern(cat_slug)
+        self._block = _pack(raw, SUBCATEGORY_EXTRA_FIELDS)
+
+    def filters(self) -> List[Dict[str, Any]]:
+        return json_codec.loads(self._block)["filters"]
+
+    def numeric_filters(self) -> List[Dict[str, Any]]:
+        return json_codec.loads(self._block)["numericFilters"]
+
+    def details(self) -> Dict[str, Any]:
+        """Полный dict подкатегории (фильтры разворачиваются при каждом вызове)."""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "slug": self.slug,
+            "position": self.position,
+            "isActive": self.is_active,
+            "categoryId": self.category_id,
+        }
+        data.update(json_codec.loads(self._block))
+        return data
+
+
+class Category:
+    __slots__ = ("id", "name", "slug", "position", "is_active", "game_id", "game_slug", "subcategories", "_block")
+
+    def __init__(self, raw: dict, game_slug: str, cat_slug: str):
+        self.id = raw.get("id")
+        self.name = _intern(raw.get("name", cat_slug.title()))
+        self.slug = _intern(cat_slug)
+        self.position = raw.get("position", 99)
+        self.is_active = raw.get("isActive", True)
+        self.game_id = raw.get("gameId")
+        self.game_slug = _intern(game_slug)
+        # Порядок как в исходнике; активные по position — индекс subcategories в compile_catalog
+        self.subcategories = tuple(
+            SubCategory(sub, game_slug, cat_slug) for sub in raw.get("subCategories") or []
+        )
+        self._block = _pack(raw, CATEGORY_EXTRA_FIELDS)
+
+    def filters(self) -> List[Dict[str, Any]]:
+        return json_codec.loads(self._block)["filters"]
+
+    def numeric_filters(self) -> List[Dict[str, Any]]:
+        return json_codec.loads(self._block)["numericFilters"]
+
+    def details(self) -> Dict[str, Any]:
+        """Полный dict категории (фильтры разворачиваются при каждом вызове)."""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "slug": self.slug,
+            "position": self.position,
+            "gameId": self.game_id,
+            "isActive": self.is_active,
+        }
+        data.update(json_codec.loads(self._block))
+        data["subCategories"] = [sub.details() for sub in self.subcategories]
+        return data
+
+
+def compile_catalog(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Превращает 'all_categories_detailed' в индексы:
+      games             — [(slug, name)], отсортировано по имени
+      categories        — {game: [Category]}, только активные, по position
+      category_by_slug  — {(game, cat): Category}, включая неактивные
+      subcategories     — {(game, cat): ((slug, name, id), ...)}, только активные, по position
+      category_by_id    — {cat_id: Category}
+      subcategory_by_id — {sub_id: SubCategory}
+    """
+    games = []
+    categories = {}
+    category_by_slug = {}
+    subcategories = {}
+    category_by_id = {}
+    subcategory_by_id = {}
+
+    for game_slug, game_data in raw.items():
+        games.append((_intern(game_slug), guess_game_name(game_slug)))
+
+        cats = []
+        for cat_slug, cat_raw in game_data.items():
+            cat = Category(cat_raw, game_slug, cat_slug)
+            category_by_slug[(cat.game_slug, cat.slug)] = cat
+            active = sorted((s for s in cat.subcategories if s.is_active), key=lambda s: s.position)
+            subcategories[(cat.game_slug, cat.slug)] = tuple((s.slug, s.name, s.id) for s in active)
+            if cat.id is not None:
+                category_by_id[cat.id] = cat
+            for sub in cat.subcategories:
+                subcategory_by_id[sub.id] = sub
+            if cat.is_active:
+                cats.append(cat)
+
+        cats.sort(key=lambda c: (c.position, c.name))
+        categories[game_slug] = cats
+
+    games.sort(key=lambda g: g[1])
+
+    return {
+        "games": games,
+        "categories": categories,
+        "category_by_slug": category_by_slug,
+        "subcategories": subcategories,
+        "category_by_id": category_by_id,
+        "subcategory_by_id": subcategory_by_id,
+    }
+
+
+class Catalog:
+    """
+    Парсит 'complete_categories_map.json' и предоставляет
+    методы для навигации по играм, категориям и подкатегориям.
+    """
+
+    def __init__(self, json_path: Path = CATALOG_JSON_PATH, snapshot_dir: Optional[Path] = SNAPSHOT_DIR):
+        self.path = Path(json_path)
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.source_hash = ""
+        self._index = self._load_index()
+
+    # ------------------------------------------------------------------
+
+    def _snapshot_path(self, source_hash: str) -> Path:
+        return self.snapshot_dir / f"catalog-{SNAPSHOT_VERSION}-{source_hash[:16]}.pickle"
+
+    def _load_index(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            logger.critical(f"ФАЙЛ КАТАЛОГА НЕ НАЙДЕН: {self.path}")
+            return compile_catalog({})
+
+        try:
+            source = self.path.read_bytes()
+        except IOError as e:
+            logger.critical(f"❌ Catalog: Ошибка чтения {self.path}: {e}")
+            return compile_catalog({})
+
+        self.source_hash = hashlib.sha256(source).hexdigest()
+
+        if self.snapshot_dir:
+            index = self._read_snapshot()
+            if index is not None:
+                logger.info(f"✅ Catalog: загружен снимок {self.path.name} ({self.source_hash[:8]})")
+                return index
+
+        try:
+            data = json_codec.loads(source)
+        except json_codec.JSONDecodeError as e:
+            logger.critical(f"❌ Catalog: Ошибка загрузки/парсинга {self.path}: {e}")
+            return compile_catalog({})
+        del source
+
+        if "all_categories_detailed" not in data:
+            logger.error("❌ Catalog: 'all_categories_detailed' не найден в JSON.")
+            return compile_catalog({})
+
+        index = compile_catalog(data["all_categories_detailed"])
+        logger.info(f"✅ Catalog: Успешно загружен {self.path}")
+
+        if self.snapshot_dir:
+            self._write_snapshot(index)
+        return index
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        path = self._snapshot_path(self.source_hash)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog: снимок {path} повреждён, пересобираю: {e}")
+            return None
+
+    def _write_snapshot(self, index: Dict[str, Any]):
+        path = self._snapshot_path(self.source_hash)
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            for old in self.snapshot_dir.glob("catalog-*.pickle"):
+                if old != path:
+                    old.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"⚠️ Catalog: не удалось сохранить снимок {path}: {e}")
+
+    # ------------------------------------------------------------------
+
+    def list_games(self) -> List[Tuple[str, str]]:
+        """Возвращает список игр: (slug, name)"""
+        return self._index["games"]
+
+    def get_game_name(self, slug: str) -> str:
+        return guess_game_name(slug)
+
+    def list_categories(self, game_slug: str) -> List[Tuple[str, str, int]]:
+        """
+        Возвращает список категорий (продуктов) для игры.
+        Формат: (slug, name, id)
+        """
+        return [(c.slug, c.name, c.id) for c in self._index["categories"].get(game_slug, [])]
+
+    def get_category_name(self, game_slug: str, cat_slug: str) -> str:
+        """Возвращает имя категории по slug."""
+        cat = self._index["category_by_slug"].get((game_slug, cat_slug))
+        return cat.name if cat else cat_slug.title()
+
+    def list_subcategories(self, game_slug: str, cat_slug: str) -> Tuple[Tuple[str, str, int], ...]:
+        """
+        Возвращает активные ПОДкатегории, отсортированные по 'position' (готовый кортеж из индекса).
+        Формат: (slug, name, id)
+        """
+        return self._index["subcategories"].get((game_slug, cat_slug), ())
+
+    def get_subcategory_details(self, game_slug: str, cat_slug: str, sub_id: int) -> Optional[Dict[str, Any]]:
+        """Находит subcategory по ID и возвращает ее dict."""
+        sub = self._index["subcategory_by_id"].get(sub_id)
+        if not sub or sub.game_slug != game_slug or sub.cat_slug != cat_slug:
+            return None
+        return sub.details()
+
+    def get_category_details(self, game_slug: str, cat_slug: str) -> Optional[Dict[str, Any]]:
+        """Возвращает dict категории (продукта)."""
+        cat = self._index["category_by_slug"].get((game_slug, cat_slug))
+        return cat.details() if cat else {}
+
+    def get_category_filters(self, game_slug: str, cat_slug: str) -> List[Dict[str, Any]]:
+        """Только фильтры категории, без разворачивания подкатегорий."""
+        cat = self._index["category_by_slug"].get((game_slug, cat_slug))
+        return cat.filters() if cat else []
+
+    def get_category(self, game_slug: str, cat_slug: str) -> Optional[Category]:
+        return self._index["category_by_slug"].get((game_slug, cat_slug))
+
+    def find_category(self, cat_id: int) -> Optional[Category]:
+        return self._index["category_by_id"].get(cat_id)
+
+    def find_subcategory(self, sub_id: int) -> Optional[SubCategory]:
+        return self._index["subcategory_by_id"].get(sub_id)
+
+    def iter_categories(self):
+        """Все категории, включая неактивные."""
+        return iter(self._index["category_by_slug"].values())
+
+    def sub_category_map(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{'game__cat': [{'id', 'name'}]} — формат бывшего SUB_CATEGORY_MAP."""
+        return {
+            f"{game_slug}__{cat_slug}": [{"id": s.id, "name": s.name} for s in cat.subcategories]
+            for (game_slug, cat_slug), cat in self._index["category_by_slug"].items()
+            if cat.subcategories
+        }
+
+
+_shared_catalog: Optional[Catalog] = None
+_shared_lock = threading.Lock()
+
+
+def catalog_source_path() -> Path:
+    """Обновлённый каталог из storage/cache, если он есть и не старше того, что пришёл с релизом."""
+    try:
+        if REFRESHED_JSON_PATH.stat().st_mtime >= CATALOG_JSON_PATH.stat().st_mtime:
+            return REFRESHED_JSON_PATH
+    except OSError:
+        pass
+    return CATALOG_JSON_PATH
+
+
+def get_catalog() -> Catalog:
+    """
+    Общий для всего процесса экземпляр каталога (каталог грузится один раз).
+    Держать ссылку у себя не стоит: после обновления set_catalog() подменяет экземпляр.
+    """
+    global _shared_catalog
+    if _shared_catalog is None:
+        with _shared_lock:
+            if _shared_catalog is None:
+                _shared_catalog = Catalog(catalog_source_path())
+    return _shared_catalog
+
+
+def set_catalog(catalog: Catalog) -> None:
+    """Атомарная подмена общего каталога. Запросы, начатые на старом, дорабатывают на нём."""
+    global _shared_catalog
+    with _shared_lock:
+        _shared_catalog = catalog
@@ -0,0 +1,224 @@
+"""
+Инкрементальное обновление каталога из API StarVell.
+
+Список игр и категории каждой игры запрашиваются условно (If-None-Match / If-Modified-Since),
+304 означает «без изменений» и ничего не стоит. Изменившиеся игры вливаются в копию исходного
+JSON, она пишется атомарно в storage/cache, компилируется в отдельном потоке и только потом
+подменяет общий каталог (set_catalog) — до этого момента все продолжают работать со старым.
+
+base_url настраивается, так что всё проверяется против локальной заглушки.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from Utils import json_codec
+from core.starvell_client import BASE_URL, USER_AGENT
+from .catalog import REFRESHED_JSON_PATH, SNAPSHOT_DIR, Catalog, get_catalog, set_catalog
+
+logger = logging.getLogger("plugin.catalog_refresh")
+
+GAMES_PATH = "/api/games"
+GAME_CATEGORIES_PATH = "/api/games/{slug}/categories"
+VALIDATORS_PATH = SNAPSHOT_DIR / "catalog_validators.json"
+CONCURRENCY = 8
+
+
+@dataclass
+class RefreshResult:
+    games_checked: int = 0
+    games_not_modified: int = 0
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    swapped: bool = False
+    duration: float = 0.0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha1(json_codec.dumpb(obj)).hexdigest()
+
+
+def _game_categories(body: Any) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Ответ API → {cat_slug: категория}. Принимает список категорий или уже словарь по slug."""
+    if isinstance(body, dict):
+        body = body.get("categories", body.get("items", body))
+    if isinstance(body, dict):
+        return {slug: cat for slug, cat in body.items() if isinstance(cat, dict)}
+    if isinstance(body, list):
+        return {cat["slug"]: cat for cat in body if isinstance(cat, dict) and cat.get("slug")}
+    return None
+
+
+class CatalogRefresher:
+    def __init__(self, base_url: str = BASE_URL, target_path: Path = REFRESHED_JSON_PATH,
+                 validators_path: Path = VALIDATORS_PATH, snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+                 concurrency: int = CONCURRENCY, timeout: float = 30.0) -> None:
+        self.base_url = base_url
+        self.target_path = Path(target_path)
+        self.snapshot_dir = snapshot_dir
+        self.validators_path = Path(validators_path)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.validators: Dict[str, Dict[str, str]] = self._load_validators()
+        self._lock = asyncio.Lock()
+
+    def _load_validators(self) -> Dict[str, Dict[str, str]]:
+        try:
+            return json_codec.load_file(self.validators_path)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog: не удалось прочитать {self.validators_path}: {e}")
+            return {}
+
+    def _save_validators(self) -> None:
+        self.validators_path.parent.mkdir(parents=True, exist_ok=True)
+        json_codec.dump_file(self.validators_path, self.validators)
+
+    # ------------------------------------------------------------------
+
+    async def _get(self, session: aiohttp.ClientSession, path: str) -> Tuple[int, Any]:
+        """Условный GET: 304 → (304, None). Валидаторы сохраняются только вместе с принятым ответом."""
+        cached = self.validators.get(path, {})
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        async with session.get(path, headers=headers) as resp:
+            if resp.status == 304:
+                return 304, None
+            raw = await resp.read()
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            body = json_codec.loads(raw)
+            self.validators[path] = {
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+            }
+            return 200, body
+
+    async def refresh(self, force: bool = False) -> RefreshResult:
+        """Один проход. force=True — без валидаторов (полная перезагрузка)."""
+        async with self._lock:
+            started = time.monotonic()
+            result = RefreshResult()
+            current = get_catalog()
+            if force:
+                self.validators = {}
+            old_validators = dict(self.validators)
+
+            try:
+                raw_doc = await asyncio.to_thread(json_codec.load_file, current.path)
+            except Exception as e:
+                logger.warning(f"⚠️ Catalog: не удалось прочитать {current.path}: {e}")
+                raw_doc = {}
+            raw = dict(raw_doc.get("all_categories_detailed") or {})
+
+            async with aiohttp.ClientSession(
+                base_url=self.base_url,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
+            ) as session:
+                game_slugs = await self._game_list(session, raw, result)
+                semaphore = asyncio.Semaphore(self.concurrency)
+                updates: Dict[str, Dict[str, Any]] = {}
+
+                async def one(slug: str):
+                    path = GAME_CATEGORIES_PATH.format(slug=slug)
+                    async with semaphore:
+                        try:
+                            status, body = await self._get(session, path)
+                        except Exception as e:
+                            result.errors[slug] = str(e) or type(e).__name__
+                            return
+                    result.games_checked += 1
+                    if status == 304:
+                        result.games_not_modified += 1
+                        return
+                    categories = _game_categories(body)
+                    if categories is None:
+                        result.errors[slug] = "неожиданный формат ответа"
+                        self.validators.pop(path, None)
+                        return
+                    updates[slug] = categories
+
+                await asyncio.gather(*(one(slug) for slug in (game_slugs if game_slugs is not None else list(raw))))
+
+            for slug, categories in updates.items():
+                old = raw.get(slug)
+                if old is None:
+                    result.added.append(slug)
+                elif {k: _digest(v) for k, v in old.items()} != {k: _digest(v) for k, v in categories.items()}:
+                    result.changed.append(slug)
+                else:
+                    continue
+                raw[slug] = categories
+            if game_slugs is not None:
+                for slug in [s for s in raw if s not in game_slugs]:
+                    result.removed.append(slug)
+                    del raw[slug]
+
+            if result.has_changes:
+                raw_doc["all_categories_detailed"] = raw
+                try:
+                    await asyncio.to_thread(self._write_and_swap, raw_doc)
+                    result.swapped = True
+                except Exception as e:
+                    # каталог не подменён — валидаторы тоже откатываем, иначе следующий проход получит 304
+                    self.validators = old_validators
+                    logger.error(f"❌ Catalog: обновление не применено: {e}")
+                    result.errors["swap"] = str(e)
+            self._save_validators()
+
+            result.duration = time.monotonic() - started
+            if result.has_changes:
+                logger.info(f"🔄 Catalog: +{len(result.added)} ~{len(result.changed)} -{len(result.removed)} игр "
+                            f"за {result.duration:.1f} с")
+            return result
+
+    async def _game_list(self, session: aiohttp.ClientSession, raw: Dict[str, Any],
+                         result: RefreshResult) -> Optional[List[str]]:
+        """Slug'и игр. На 304/ошибке — известные игры; None = удалять отсутствующие нельзя."""
+        try:
+            status, body = await self._get(session, GAMES_PATH)
+        except Exception as e:
+            result.errors["games"] = str(e) or type(e).__name__
+            return None
+        if status == 304:
+            return list(self.validators.get(GAMES_PATH, {}).get("slugs") or raw)
+        items = body.get("items", body.get("games")) if isinstance(body, dict) else body
+        slugs = [g["slug"] for g in items or [] if isinstance(g, dict) and g.get("slug")]
+        if not slugs:
+            result.errors["games"] = "пустой список игр"
+            self.validators.pop(GAMES_PATH, None)
+            return None
+        self.validators[GAMES_PATH]["slugs"] = slugs
+        return slugs
+
+    def _write_and_swap(self, raw_doc: Dict[str, Any]) -> None:
+        """Запись, компиляция и проверка — в потоке; подмена — одним присваиванием в set_catalog()."""
+        self.target_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.target_path.with_suffix(".new.json")
+        json_codec.dump_file(tmp_path, raw_doc)
+        # снимок ключуется хэшем содержимого — следующий запуск прочитает его без компиляции
+        catalog = Catalog(tmp_path, self.snapshot_dir)
+        if not catalog.list_games():
+            tmp_path.unlink(missing_ok=True)
+            raise RuntimeError("новый каталог пуст")
+        tmp_path.replace(self.target_path)
+        catalog.path = self.target_path
+        set_catalog(catalog)
@@ -0,0 +1,189 @@
+"""
+Нечёткий поиск по каталогу: «робуксы 800», «brawl gems» → (игра, категория, подкатегория).
+
+Индекс строится один раз по именам и slug'ам игр, категорий и подкатегорий.
+Кириллические токены дополнительно транслитерируются в латиницу, поэтому
+«гемы» находит 'gems', а «robux» — «Робуксы». Опечатки ловятся по триграммам.
+"""
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .catalog import Catalog, get_catalog
+
+TOKEN_RE = re.compile(r"[0-9a-zа-я]+")
+
+TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p",
+    "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "h", "ц": "c", "ч": "ch",
+    "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+})
+
+MIN_SIMILARITY = 0.34
+EXACT, PREFIX = 1.0, 0.85
+
+# Уровни документа
+GAME, CATEGORY, SUBCATEGORY = 0, 1, 2
+
+
+def variants(text: str) -> List[Tuple[str, ...]]:
+    """Для каждого слова: (слово в нижнем регистре[, его латинская транслитерация])."""
+    result = []
+    for token in TOKEN_RE.findall((text or "").lower().replace("ё", "е")):
+        latin = token.translate(TRANSLIT)
+        result.append((token, latin) if latin != token else (token,))
+    return result
+
+
+def normalize(text: str) -> List[str]:
+    return [token for group in variants(text) for token in group]
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Максимум из Жаккара по триграммам и доли общего префикса (от 3 символов)."""
+    ta, tb = trigrams(a), trigrams(b)
+    score = len(ta & tb) / len(ta | tb)
+    prefix = 0
+    for ca, cb in zip(a, b):
+        if ca != cb:
+            break
+        prefix += 1
+    if prefix >= 3:
+        score = max(score, prefix / max(len(a), len(b)))
+    return score
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    game_slug: str
+    cat_slug: Optional[str]
+    cat_id: Optional[int]
+    sub_id: Optional[int]
+    label: str
+    score: float
+
+
+class CatalogSearch:
+    """Токенный + триграммный индекс по каталогу."""
+
+    def __init__(self, catalog: Catalog):
+        # doc: (level, parent_doc, game_slug, cat_slug, cat_id, sub_id, label)
+        self.docs: List[Tuple[int, int, str, Optional[str], Optional[int], Optional[int], str]] = []
+        # токен → {doc_id}; у записи индексируется только её собственное имя и slug,
+        # совпадения с родителями добавляются при ранжировании
+        self.postings: Dict[str, Set[int]] = {}
+        self.trigram_index: Dict[str, Set[str]] = {}
+        self._build(catalog)
+        self.vocabulary = sorted(self.postings)
+
+    def _add(self, level: int, parent: int, texts: Tuple[str, ...], *payload) -> int:
+        doc_id = len(self.docs)
+        self.docs.append((level, parent, *payload))
+        for text in texts:
+            for token in normalize(text):
+                self.postings.setdefault(token, set()).add(doc_id)
+        return doc_id
+
+    def _build(self, catalog: Catalog):
+        for game_slug, game_name in catalog.list_games():
+            game_doc = self._add(GAME, -1, (game_name, game_slug), game_slug, None, None, None, game_name)
+
+            for cat_slug, cat_name, cat_id in catalog.list_categories(game_slug):
+                cat_doc = self._add(CATEGORY, game_doc, (cat_name, cat_slug),
+                                    game_slug, cat_slug, cat_id, None, f"{game_name} › {cat_name}")
+
+                for sub_slug, sub_name, sub_id in catalog.list_subcategories(game_slug, cat_slug):
+                    self._add(SUBCATEGORY, cat_doc, (sub_name, sub_slug),
+                              game_slug, cat_slug, cat_id, sub_id, f"{game_name} › {cat_name} › {sub_name}")
+
+        for token in self.postings:
+            for gram in trigrams(token):
+                self.trigram_index.setdefault(gram, set()).add(token)
+
+    def _expand(self, query_token: str) -> Dict[str, float]:
+        """Токены словаря, похожие на токен запроса, с весом совпадения."""
+        matches = {}
+        if query_token in self.postings:
+            matches[query_token] = EXACT
+        if len(query_token) >= 2:
+            i = bisect_left(self.vocabulary, query_token)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(query_token):
+                matches.setdefault(self.vocabulary[i], PREFIX)
+                i += 1
+        if len(query_token) >= 3:
+            candidates = set()
+            for gram in trigrams(query_token):
+                candidates |= self.trigram_index.get(gram, set())
+            for token in candidates:
+                if token in matches:
+                    continue
+                score = similarity(query_token, token)
+                if score >= MIN_SIMILARITY:
+                    matches[token] = score * PREFIX
+        return matches
+
+    def search(self, query: str, limit: int = 8) -> List[SearchHit]:
+        terms = {group[0]: group for group in variants(query)}
+        if not terms:
+            return []
+
+        # doc_id → {токен запроса: лучший вес} — только собственные совпадения записи
+        own: Dict[int, Dict[str, float]] = {}
+        # Слово и его транслитерация считаются одним термом
+        for q, group in terms.items():
+            for variant in group:
+                for token, weight in self._expand(variant).items():
+                    for doc_id in self.postings[token]:
+                        per_doc = own.setdefault(doc_id, {})
+                        if weight > per_doc.get(q, 0):
+                            per_doc[q] = weight
+
+        ranked = []
+        for doc_id, own_matches in own.items():
+            level, parent = self.docs[doc_id][0], self.docs[doc_id][1]
+            inherited: Dict[str, float] = {}
+            while parent >= 0:
+                for q, weight in own.get(parent, {}).items():
+                    if weight > inherited.get(q, 0):
+                        inherited[q] = weight
+                parent = self.docs[parent][1]
+            # Запись, все совпадения которой не лучше, чем у родителя, — просто его ребёнок
+            if not any(weight > inherited.get(q, 0) for q, weight in own_matches.items()):
+                continue
+            best = dict(inherited)
+            for q, weight in own_matches.items():
+                if weight > best.get(q, 0):
+                    best[q] = weight
+            # При равенстве выше более общая запись
+            ranked.append((sum(best.values()) - 0.01 * level, doc_id))
+
+        ranked.sort(key=lambda x: (-x[0], x[1]))
+        hits = []
+        for score, doc_id in ranked[:limit]:
+            _level, _parent, game_slug, cat_slug, cat_id, sub_id, label = self.docs[doc_id]
+            hits.append(SearchHit(game_slug, cat_slug, cat_id, sub_id, label, round(score, 3)))
+        return hits
+
+
+_search_cache: Tuple[Optional[Catalog], Optional[CatalogSearch]] = (None, None)
+_search_lock = threading.Lock()
+
+
+def get_search_index(catalog: Optional[Catalog] = None) -> CatalogSearch:
+    """Индекс для общего каталога; пересобирается, если каталог сменился."""
+    global _search_cache
+    catalog = catalog or get_catalog()
+    with _search_lock:
+        cached_catalog, index = _search_cache
+        if cached_catalog is not catalog or index is None:
+            index = CatalogSearch(catalog)
+            _search_cache = (catalog, index)
+        return index
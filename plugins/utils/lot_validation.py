@@ -0,0 +1,192 @@
+"""
+Локальная проверка атрибутов лота до отправки на StarVell.
+
+Для каждой пары (категория, подкатегория) из фильтров каталога заранее собирается таблица:
+допустимые optionId по каждому фильтру, обязательные фильтры, диапазоны numeric-полей.
+Проверка payload'а или пресета — O(число атрибутов).
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .catalog import Catalog, get_catalog
+
+logger = logging.getLogger("plugin.lot_validation")
+
+
+@dataclass(frozen=True)
+class AttributeRules:
+    options: Dict[str, FrozenSet[str]]                   # filter_id → допустимые optionId
+    undesirable: Dict[Tuple[str, str], Optional[str]]    # (filter_id, optionId) → рекомендуемый optionId
+    names: Dict[str, str]                                # filter_id → nameRu (для сообщений)
+    required: FrozenSet[str]
+    numeric: Dict[str, Tuple[Optional[float], Optional[float]]]  # numeric filter_id → (min, max)
+
+
+@dataclass
+class ValidationResult:
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _is_required(flt: Dict[str, Any]) -> bool:
+    return bool(flt.get("isRequired") or flt.get("required"))
+
+
+def build_rules(filters: Iterable[Dict[str, Any]], numeric_filters: Iterable[Dict[str, Any]]) -> AttributeRules:
+    options, undesirable, names, required, numeric = {}, {}, {}, set(), {}
+    for flt in filters:
+        filter_id = flt.get("id")
+        if filter_id is None:
+            continue
+        names[filter_id] = flt.get("nameRu") or str(filter_id)
+        options[filter_id] = frozenset(opt.get("id") for opt in flt.get("options") or [])
+        for opt in flt.get("options") or []:
+            if opt.get("isUndesirable"):
+                undesirable[(filter_id, opt.get("id"))] = opt.get("desiredId")
+        if _is_required(flt):
+            required.add(filter_id)
+
+    for flt in numeric_filters:
+        filter_id = flt.get("id")
+        if filter_id is None:
+            continue
+        names[filter_id] = flt.get("nameRu") or str(filter_id)
+        value_range = flt.get("range") or {}
+        numeric[filter_id] = (value_range.get("min"), value_range.get("max"))
+        if _is_required(flt):
+            required.add(filter_id)
+
+    return AttributeRules(options, undesirable, names, frozenset(required), numeric)
+
+
+class ValidationTables:
+    """Таблицы правил для всех категорий и подкатегорий каталога."""
+
+    def __init__(self, catalog: Catalog):
+        # (cat_id, sub_id | None) → AttributeRules
+        self.rules: Dict[Tuple[int, Optional[int]], AttributeRules] = {}
+        # cat_id → правила по всем фильтрам категории и её подкатегорий (пресеты не привязаны к подкатегории)
+        self.category_wide: Dict[int, AttributeRules] = {}
+        self.sub_parent: Dict[int, int] = {}
+        for cat in catalog.iter_categories():
+            cat_filters = cat.filters()
+            cat_numeric = cat.numeric_filters()
+            self.rules[(cat.id, None)] = build_rules(cat_filters, cat_numeric)
+            all_filters = {f.get("id"): f for f in cat_filters}
+            all_numeric = {f.get("id"): f for f in cat_numeric}
+            for sub in cat.subcategories:
+                self.sub_parent[sub.id] = cat.id
+                # Фильтры подкатегории дополняют (и перекрывают) фильтры категории
+                sub_filters = {f.get("id"): f for f in cat_filters + sub.filters()}
+                sub_numeric = {f.get("id"): f for f in cat_numeric + sub.numeric_filters()}
+                self.rules[(cat.id, sub.id)] = build_rules(sub_filters.values(), sub_numeric.values())
+                all_filters.update(sub_filters)
+                all_numeric.update(sub_numeric)
+            self.category_wide[cat.id] = build_rules(all_filters.values(), all_numeric.values())
+
+    def get(self, cat_id: int, sub_id: Optional[int] = None) -> Optional[AttributeRules]:
+        return self.rules.get((cat_id, sub_id))
+
+    def check_attributes(self, cat_id: int, sub_id: Optional[int],
+                         basic: List[Dict[str, Any]],
+                         numeric: Optional[List[Dict[str, Any]]] = None,
+                         check_required: bool = True,
+                         rules: Optional[AttributeRules] = None) -> ValidationResult:
+        result = ValidationResult()
+        rules = rules or self.get(cat_id, sub_id)
+        if rules is None:
+            result.errors.append(f"Категория {cat_id}" + (f" / подкатегория {sub_id}" if sub_id else "")
+                                 + " не найдена в каталоге")
+            return result
+
+        seen = set()
+        for attr in basic or []:
+            filter_id, option_id = attr.get("id"), attr.get("optionId")
+            seen.add(filter_id)
+            allowed = rules.options.get(filter_id)
+            if allowed is None:
+                # Часть атрибутов подставляется по умолчанию и в фильтрах каталога может отсутствовать
+                result.warnings.append(f"Атрибут {filter_id} не найден в каталоге")
+                continue
+            name = rules.names[filter_id]
+            if option_id not in allowed:
+                result.errors.append(f"«{name}»: недопустимое значение {option_id}")
+            elif (filter_id, option_id) in rules.undesirable:
+                result.warnings.append(f"«{name}»: выбран нерекомендуемый вариант")
+
+        for attr in numeric or []:
+            filter_id = attr.get("id")
+            seen.add(filter_id)
+            if filter_id not in rules.numeric:
+                # Numeric-поля собираются из внешнего конфига, их ID могут не совпадать с каталогом
+                result.warnings.append(f"Числовое поле {filter_id} не найдено в каталоге")
+                continue
+            if "value" not in attr:
+                continue
+            name = rules.names[filter_id]
+            try:
+                value = float(attr.get("value"))
+            except (TypeError, ValueError):
+                result.errors.append(f"«{name}»: значение должно быть числом, а не {attr.get('value')!r}")
+                continue
+            low, high = rules.numeric[filter_id]
+            if (low is not None and value < low) or (high is not None and value > high):
+                result.errors.append(f"«{name}»: {value:g} вне диапазона {low}…{high}")
+
+        if check_required:
+            for filter_id in rules.required - seen:
+                result.errors.append(f"Не заполнен обязательный атрибут «{rules.names[filter_id]}»")
+        return result
+
+    def check_payload(self, payload: Dict[str, Any]) -> ValidationResult:
+        """Проверяет payload для /api/offers/create."""
+        return self.check_attributes(
+            payload.get("categoryId"),
+            payload.get("subCategoryId"),
+            payload.get("basicAttributes", []),
+            payload.get("numericAttributes", []),
+        )
+
+    def check_presets(self, presets: Dict[str, Dict[str, Any]]) -> Dict[Tuple[str, str], ValidationResult]:
+        """
+        Проверяет все пресеты ({id_key: {name: data}}) разом.
+        Возвращает только проблемные: {(id_key, name): ValidationResult}.
+        Numeric-значения в пресете не хранятся, обязательность проверяется уже на payload'е.
+        """
+        problems = {}
+        for id_key, by_name in presets.items():
+            try:
+                cat_id = int(id_key)
+            except (TypeError, ValueError):
+                cat_id = id_key
+            # Старые пресеты могли сохраняться по ID подкатегории
+            cat_id = cat_id if cat_id in self.category_wide else self.sub_parent.get(cat_id, cat_id)
+            rules = self.category_wide.get(cat_id)
+            for name, data in (by_name or {}).items():
+                result = self.check_attributes(cat_id, None, data.get("basic", []),
+                                               check_required=False, rules=rules)
+                if not result.ok or result.warnings:
+                    problems[(id_key, name)] = result
+        return problems
+
+
+_tables_cache: Tuple[Optional[Catalog], Optional[ValidationTables]] = (None, None)
+_tables_lock = threading.Lock()
+
+
+def get_validation_tables(catalog: Optional[Catalog] = None) -> ValidationTables:
+    """Таблицы для общего каталога; пересобираются, если каталог сменился."""
+    global _tables_cache
+    catalog = catalog or get_catalog()
+    with _tables_lock:
+        cached_catalog, tables = _tables_cache
+        if cached_catalog is not catalog or tables is None:
+            tables = ValidationTables(catalog)
+            _tables_cache = (catalog, tables)
+        return tables
@@ -1,472 +1,26 @@
-SUB_CATEGORY_MAP = {   'brawl-stars__gems': [   {'id': 438, 'name': '30 гемов'},
-                             {'id': 442, 'name': '80 гемов'},
-                             {'id': 450, 'name': '110 гемов'},
-                             {'id': 439, 'name': '170 гемов'},
-                             {'id': 443, 'name': '200 гемов'},
-                             {'id': 444, 'name': '250 гемов'},
-                             {'id': 440, 'name': '360 гемов'},
-                             {'id': 445, 'name': '530 гемов'},
-                             {'id': 446, 'name': '720 гемов'},
-                             {'id': 441, 'name': '950 гемов'},
-                             {'id': 448, 'name': '1310 гемов'},
-                             {'id': 449, 'name': '2000 гемов'},
-                             {'id': 447, 'name': '4000 гемов'},
-                             {'id': 451, 'name': 'Особая акция'},
-                             {'id': 452, 'name': 'Другое количество'}],
-    'brawl-stars__brawl-pass': [   {'id': 465, 'name': 'Brawl Pass'},
-                                   {'id': 466, 'name': 'Brawl Pass Plus'},
-                                   {   'id': 467,
-                                       'name': 'Улучшение до Brawl Pass Plus'}],
-    'brawl-stars__donate': [   {'id': 460, 'name': 'Бойцы'},
-                               {'id': 459, 'name': 'Скины'},
-                               {'id': 462, 'name': 'Боец + скин'},
-                               {'id': 461, 'name': 'Гиперзаряд'},
-                               {'id': 463, 'name': 'Пины'},
-                               {'id': 458, 'name': 'Ресурсы'},
-                               {'id': 464, 'name': 'Особая акция'}],
-    'brawl-stars__design': [   {'id': 454, 'name': 'Аватарка'},
-                               {'id': 453, 'name': 'Баннер'},
-                               {'id': 455, 'name': 'Паки для дизайна'},
-                               {'id': 456, 'name': 'Видео-монтаж'},
-                               {'id': 457, 'name': 'Другое'}],
-    'roblox__packages': [   {'id': 64, 'name': '40 робуксов'},
-                            {'id': 65, 'name': '80 робуксов'},
-                            {'id': 66, 'name': '200 робуксов'},
-                            {'id': 67, 'name': '400 робуксов'},
-                            {'id': 333, 'name': '500 робуксов'},
-                            {'id': 69, 'name': '800 робуксов'},
-                            {'id': 70, 'name': '1000 робуксов'},
-                            {'id': 71, 'name': '1200 робуксов'},
-                            {'id': 72, 'name': '1700 робуксов'},
-                            {'id': 334, 'name': '2000 робуксов'},
-                            {'id': 73, 'name': '2100 робуксов'},
-                            {'id': 74, 'name': '2500 робуксов'},
-                            {'id': 75, 'name': '3600 робуксов'},
-                            {'id': 76, 'name': '4500 робуксов'},
-                            {'id': 77, 'name': '10000 робуксов'},
-                            {'id': 78, 'name': '22500 робуксов'},
-                            {'id': 79, 'name': 'Другое количество'}],
-    'roblox__gift-cards': [   {'id': 38, 'name': '100 робуксов'},
-                              {'id': 39, 'name': '200 робуксов'},
-                              {'id': 40, 'name': '300 робуксов'},
-                              {'id': 41, 'name': '400 робуксов'},
-                              {'id': 42, 'name': '450 робуксов'},
-                              {'id': 43, 'name': '500 робуксов'},
-                              {'id': 44, 'name': '600 робуксов'},
-                              {'id': 45, 'name': '800 робуксов'},
-                              {'id': 46, 'name': '1000 робуксов'},
-                              {'id': 47, 'name': '1200 робуксов'},
-                              {'id': 48, 'name': '1400 робуксов'},
-                              {'id': 49, 'name': '1700 робуксов'},
-                              {'id': 50, 'name': '2000 робуксов'},
-                              {'id': 51, 'name': '2200 робуксов'},
-                              {'id': 52, 'name': '2400 робуксов'},
-                              {'id': 53, 'name': '2700 робуксов'},
-                              {'id': 54, 'name': '3200 робуксов'},
-                              {'id': 55, 'name': '3600 робуксов'},
-                              {'id': 56, 'name': '4000 робуксов'},
-                              {'id': 57, 'name': '4500 робуксов'},
-                              {'id': 58, 'name': '5000 робуксов'},
-                              {'id': 59, 'name': '6000 робуксов'},
-                              {'id': 60, 'name': '7000 робуксов'},
-                              {'id': 61, 'name': '10000 робуксов'},
-                              {'id': 62, 'name': '13000 робуксов'},
-                              {'id': 63, 'name': '22500 робуксов'}],
-    'roblox__premium': [   {'id': 33, 'name': 'Premium 450'},
-                           {'id': 34, 'name': 'Premium 1000'},
-                           {'id': 35, 'name': 'Premium 2200'}],
-    'roblox__accounts': [   {'id': 36, 'name': 'Продажа'},
-                            {'id': 37, 'name': 'Аренда'}],
-    'roblox__skins': [   {'id': 80, 'name': 'Аксессуары'},
-                         {'id': 81, 'name': 'Промокоды'},
-                         {'id': 326, 'name': 'Услуги'},
-                         {'id': 82, 'name': 'Прочее'}],
-    'roblox__limiteds': [   {'id': 553, 'name': 'Шляпы'},
-                            {'id': 554, 'name': 'Лица'},
-                            {'id': 555, 'name': 'Волосы'},
-                            {'id': 556, 'name': 'Аксессуары'},
-                            {'id': 557, 'name': 'Gears'},
-                            {'id': 558, 'name': 'Шея'},
-                            {'id': 559, 'name': 'Плечи'},
-                            {'id': 560, 'name': 'Перед'},
-                            {'id': 561, 'name': 'Зад'},
-                            {'id': 562, 'name': 'Талия'}],
-    'roblox__studio': [   {'id': 87, 'name': 'Плейсы'},
-                          {'id': 83, 'name': 'Модели'},
-                          {'id': 84, 'name': 'Скриптинг'},
-                          {'id': 85, 'name': 'Билдинг'},
-                          {'id': 512, 'name': 'Услуги'},
-                          {'id': 86, 'name': 'Прочее'}],
-    'roblox__services': [   {'id': 507, 'name': 'Войс-чат'},
-                            {'id': 508, 'name': 'Друг для игры'},
-                            {'id': 509, 'name': 'Обучение'},
-                            {'id': 510, 'name': 'Дизайн скина'},
-                            {'id': 511, 'name': 'Другое'}],
-    'roblox__other': [   {'id': 8, 'name': 'Коды'},
-                         {'id': 9, 'name': 'Гайды'},
-                         {'id': 10, 'name': 'VIP-сервер'},
-                         {'id': 332, 'name': 'Услуги'},
-                         {'id': 11, 'name': 'Прочее'}],
-    'roblox__99-nights-in-the-forest': [   {'id': 392, 'name': 'Предметы'},
-                                           {'id': 393, 'name': 'Геймпассы'},
-                                           {'id': 394, 'name': 'Аккаунты'},
-                                           {'id': 395, 'name': 'Услуги'},
-                                           {'id': 396, 'name': 'Прочее'}],
-    'roblox__adopt-me': [   {'id': 88, 'name': 'Питомцы'},
-                            {'id': 89, 'name': 'Яйца'},
-                            {'id': 91, 'name': 'Зелья'},
-                            {'id': 90, 'name': 'Транспорт'},
-                            {'id': 92, 'name': 'Баксы'},
-                            {'id': 93, 'name': 'Аккаунты'},
-                            {'id': 94, 'name': 'Услуги'},
-                            {'id': 95, 'name': 'Прочее'}],
-    'roblox__anime-adventures': [   {'id': 96, 'name': 'Предметы'},
-                                    {'id': 340, 'name': 'Геймпассы'},
-                                    {'id': 97, 'name': 'Аккаунты'},
-                                    {'id': 98, 'name': 'Услуги'},
-                                    {'id': 99, 'name': 'Прочее'}],
-    'roblox__anime-crusaders': [   {'id': 426, 'name': 'Геймпассы'},
-                                   {'id': 427, 'name': 'Акккаунты'},
-                                   {'id': 428, 'name': 'Услуги'},
-                                   {'id': 429, 'name': 'Прочее'}],
-    'roblox__anime-eternal': [   {'id': 468, 'name': 'Предметы'},
-                                 {'id': 469, 'name': 'Геймпассы'},
-                                 {'id': 470, 'name': 'Аккаунты'},
-                                 {'id': 471, 'name': 'Услуги'},
-                                 {'id': 472, 'name': 'Прочее'}],
-    'roblox__anime-last-stand': [   {'id': 109, 'name': 'Предметы'},
-                                    {'id': 341, 'name': 'Геймпассы'},
-                                    {'id': 110, 'name': 'Аккаунты'},
-                                    {'id': 111, 'name': 'Услуги'},
-                                    {'id': 112, 'name': 'Прочее'}],
-    'roblox__anime-vanguards': [   {'id': 113, 'name': 'Предметы'},
-                                   {'id': 342, 'name': 'Геймпассы'},
-                                   {'id': 114, 'name': 'Аккаунты'},
-                                   {'id': 115, 'name': 'Услуги'},
-                                   {'id': 116, 'name': 'Прочее'}],
-    'roblox__arise-crossover': [   {'id': 305, 'name': 'Предметы'},
-                                   {'id': 343, 'name': 'Геймпассы'},
-                                   {'id': 306, 'name': 'Аккаунты'},
-                                   {'id': 307, 'name': 'Услуги'},
-                                   {'id': 308, 'name': 'Прочее'}],
-    'roblox__all-star-tower-defense': [   {'id': 336, 'name': 'Предметы'},
-                                          {'id': 344, 'name': 'Геймпассы'},
-                                          {'id': 337, 'name': 'Аккаунты'},
-                                          {'id': 338, 'name': 'Услуги'},
-                                          {'id': 339, 'name': 'Прочее'}],
-    'roblox__attack-on-titan-revolution': [   {'id': 121, 'name': 'Предметы'},
-                                              {'id': 122, 'name': 'Валюта'},
-                                              {'id': 425, 'name': 'Геймпассы'},
-                                              {'id': 123, 'name': 'Аккаунты'},
-                                              {'id': 124, 'name': 'Услуги'},
-                                              {'id': 125, 'name': 'Прочее'}],
-    'roblox__aut': [   {'id': 126, 'name': 'Предметы'},
-                       {'id': 345, 'name': 'Геймпассы'},
-                       {'id': 127, 'name': 'Аккаунты'},
-                       {'id': 128, 'name': 'Услуги'},
-                       {'id': 129, 'name': 'Прочее'}],
-    'roblox__basketball-zero': [   {'id': 346, 'name': 'Геймпассы'},
-                                   {'id': 130, 'name': 'Аккаунты'},
-                                   {'id': 131, 'name': 'Услуги'},
-                                   {'id': 132, 'name': 'Прочее'}],
-    'roblox__bee-swarm-simulator': [   {'id': 133, 'name': 'Предметы'},
-                                       {'id': 134, 'name': 'Стикеры'},
-                                       {'id': 135, 'name': 'Аккаунты'},
-                                       {'id': 136, 'name': 'Услуги'},
-                                       {'id': 137, 'name': 'Прочее'}],
-    'roblox__blade-ball': [   {'id': 138, 'name': 'Предметы'},
-                              {'id': 139, 'name': 'Монеты'},
-                              {'id': 347, 'name': 'Геймпассы'},
-                              {'id': 140, 'name': 'Аккаунты'},
-                              {'id': 141, 'name': 'Услуги'},
-                              {'id': 142, 'name': 'Прочее'}],
-    'roblox__blox-fruits': [   {'id': 1, 'name': 'Предметы'},
-                               {'id': 143, 'name': 'Белли'},
-                               {'id': 348, 'name': 'Геймпассы'},
-                               {'id': 3, 'name': 'Аккаунты'},
-                               {'id': 6, 'name': 'Услуги'},
-                               {'id': 5, 'name': 'VIP-сервер'},
-                               {'id': 7, 'name': 'Прочее'}],
-    'roblox__blue-lock-rivals': [   {'id': 349, 'name': 'Геймпассы'},
-                                    {'id': 144, 'name': 'Аккаунты'},
-                                    {'id': 145, 'name': 'Услуги'},
-                                    {'id': 146, 'name': 'Прочее'}],
-    'roblox__bubble-gum-simulator-infinity': [   {   'id': 292,
-                                                     'name': 'Предметы'},
-                                                 {   'id': 350,
-                                                     'name': 'Геймпассы'},
-                                                 {   'id': 293,
-                                                     'name': 'Аккаунты'},
-                                                 {'id': 294, 'name': 'Услуги'},
-                                                 {'id': 295, 'name': 'Прочее'}],
-    'roblox__counter-blox': [   {'id': 147, 'name': 'Предметы'},
-                                {'id': 148, 'name': 'Аккаунты'},
-                                {'id': 149, 'name': 'Услуги'},
-                                {'id': 150, 'name': 'Прочее'}],
-    'roblox__creatures-of-sonaria': [   {'id': 151, 'name': 'Предметы'},
-                                        {'id': 152, 'name': 'Грибы'},
-                                        {'id': 153, 'name': 'Аккаунты'},
-                                        {'id': 154, 'name': 'Услуги'},
-                                        {'id': 155, 'name': 'Прочее'}],
-    'roblox__criminality': [   {'id': 156, 'name': 'Предметы'},
-                               {'id': 351, 'name': 'Геймпассы'},
-                               {'id': 157, 'name': 'Аккаунты'},
-                               {'id': 158, 'name': 'Услуги'},
-                               {'id': 159, 'name': 'Прочее'}],
-    'roblox__da-hood': [   {'id': 160, 'name': 'Предметы'},
-                           {'id': 161, 'name': 'Деньги'},
-                           {'id': 352, 'name': 'Геймпассы'},
-                           {'id': 162, 'name': 'Аккаунты'},
-                           {'id': 163, 'name': 'Услуги'},
-                           {'id': 164, 'name': 'Прочее'}],
-    'roblox__dead-rails': [   {'id': 300, 'name': 'Предметы'},
-                              {'id': 301, 'name': 'Поезда'},
-                              {'id': 302, 'name': 'Аккаунты'},
-                              {'id': 303, 'name': 'Услуги'},
-                              {'id': 304, 'name': 'Прочее'}],
-    'roblox__death-ball': [   {'id': 165, 'name': 'Предметы'},
-                              {'id': 166, 'name': 'Гемы'},
-                              {'id': 353, 'name': 'Геймпассы'},
-                              {'id': 167, 'name': 'Аккаунты'},
-                              {'id': 168, 'name': 'Услуги'},
-                              {'id': 169, 'name': 'Прочее'}],
-    'roblox__deepwoken': [   {'id': 170, 'name': 'Предметы'},
-                             {'id': 171, 'name': 'Аккаунты'},
-                             {'id': 172, 'name': 'Услуги'},
-                             {'id': 173, 'name': 'Прочее'}],
-    'roblox__fisch': [   {'id': 174, 'name': 'Предметы'},
-                         {'id': 175, 'name': 'Валюта'},
-                         {'id': 354, 'name': 'Геймпассы'},
-                         {'id': 176, 'name': 'Аккаунты'},
-                         {'id': 177, 'name': 'Услуги'},
-                         {'id': 178, 'name': 'Прочее'}],
-    'roblox__fish-it': [   {'id': 416, 'name': 'Предметы'},
-                           {'id': 417, 'name': 'Геймпассы'},
-                           {'id': 418, 'name': 'Аккаунты'},
-                           {'id': 419, 'name': 'Услуги'},
-                           {'id': 420, 'name': 'Прочее'}],
-    'roblox__forsaken': [   {'id': 407, 'name': 'Геймпассы'},
-                            {'id': 408, 'name': 'Аккаунты'},
-                            {'id': 409, 'name': 'Услуги'},
-                            {'id': 410, 'name': 'Прочее'}],
-    'roblox__garden-tower-defense': [   {'id': 397, 'name': 'Предметы'},
-                                        {'id': 398, 'name': 'Семена'},
-                                        {'id': 399, 'name': 'Геймпассы'},
-                                        {'id': 400, 'name': 'Аккаунты'},
-                                        {'id': 401, 'name': 'Услуги'},
-                                        {'id': 402, 'name': 'Прочее'}],
-    'roblox__ghoul-re': [   {'id': 184, 'name': 'Предметы'},
-                            {'id': 355, 'name': 'Геймпассы'},
-                            {'id': 185, 'name': 'Аккаунты'},
-                            {'id': 186, 'name': 'Услуги'},
-                            {'id': 187, 'name': 'Прочее'}],
-    'roblox__goalbound': [   {'id': 379, 'name': 'Геймпассы'},
-                             {'id': 380, 'name': 'Аккаунты'},
-                             {'id': 381, 'name': 'Услуги'},
-                             {'id': 382, 'name': 'Прочее'}],
-    'roblox__grand-piece-online': [   {'id': 188, 'name': 'Предметы'},
-                                      {'id': 356, 'name': 'Геймпассы'},
-                                      {'id': 191, 'name': 'Аккаунты'},
-                                      {'id': 189, 'name': 'Peli'},
-                                      {'id': 190, 'name': 'Bounty'},
-                                      {'id': 193, 'name': 'Услуги'},
-                                      {'id': 192, 'name': 'Прочее'}],
-    'roblox__grow-a-garden': [   {'id': 296, 'name': 'Предметы'},
-                                 {'id': 331, 'name': 'Игровая валюта'},
-                                 {'id': 357, 'name': 'Геймпассы'},
-                                 {'id': 297, 'name': 'Аккаунты'},
-                                 {'id': 298, 'name': 'Услуги'},
-                                 {'id': 299, 'name': 'Прочее'}],
-    'roblox__ink-game': [   {'id': 383, 'name': 'Геймпассы'},
-                            {'id': 384, 'name': 'Аккаунты'},
-                            {'id': 385, 'name': 'Услуги'},
-                            {'id': 386, 'name': 'Прочее'}],
-    'roblox__jailbreak': [   {'id': 197, 'name': 'Предметы'},
-                             {'id': 198, 'name': 'Аккаунты'},
-                             {'id': 199, 'name': 'Услуги'},
-                             {'id': 200, 'name': 'Прочее'}],
-    'roblox__jujutsu-infinite': [   {'id': 201, 'name': 'Предметы'},
-                                    {'id': 358, 'name': 'Геймпассы'},
-                                    {'id': 202, 'name': 'Аккаунты'},
-                                    {'id': 203, 'name': 'Услуги'},
-                                    {'id': 204, 'name': 'Прочее'}],
-    'roblox__jujutsu-shenanigans': [   {'id': 205, 'name': 'Предметы'},
-                                       {'id': 359, 'name': 'Геймпассы'},
-                                       {'id': 206, 'name': 'Аккаунты'},
-                                       {'id': 207, 'name': 'Услуги'},
-                                       {'id': 208, 'name': 'Прочее'}],
-    'roblox__king-legacy': [   {'id': 209, 'name': 'Предметы'},
-                               {'id': 360, 'name': 'Геймпассы'},
-                               {'id': 210, 'name': 'Аккаунты'},
-                               {'id': 211, 'name': 'Услуги'},
-                               {'id': 212, 'name': 'Прочее'}],
-    'roblox__mm2': [   {'id': 213, 'name': 'Предметы'},
-                       {'id': 514, 'name': 'Сеты'},
-                       {'id': 515, 'name': 'Ножи'},
-                       {'id': 516, 'name': 'Пистолеты'},
-                       {'id': 517, 'name': 'Питомцы'},
-                       {'id': 214, 'name': 'Аккаунты'},
-                       {'id': 215, 'name': 'Услуги'},
-                       {'id': 216, 'name': 'Прочее'}],
-    'roblox__nft-battle': [   {'id': 548, 'name': 'Предметы'},
-                              {'id': 551, 'name': 'Геймпассы'},
-                              {'id': 547, 'name': 'Аккаунты'},
-                              {'id': 549, 'name': 'Услуги'},
-                              {'id': 552, 'name': 'Прочее'}],
-    'roblox__pet-simulator-99': [   {'id': 217, 'name': 'Предметы'},
-                                    {'id': 219, 'name': 'Питомцы'},
-                                    {'id': 218, 'name': 'Бриллианты'},
-                                    {'id': 361, 'name': 'Геймпассы'},
-                                    {'id': 220, 'name': 'Аккаунты'},
-                                    {'id': 221, 'name': 'Услуги'},
-                                    {'id': 222, 'name': 'Прочее'}],
-    'roblox__pets-go': [   {'id': 223, 'name': 'Предметы'},
-                           {'id': 224, 'name': 'Гемы'},
-                           {'id': 225, 'name': 'Аккаунты'},
-                           {'id': 226, 'name': 'Услуги'},
-                           {'id': 227, 'name': 'Прочее'}],
-    'roblox__plants-vs-brainrots': [   {'id': 430, 'name': 'Предметы'},
-                                       {'id': 431, 'name': 'Геймпассы'},
-                                       {'id': 432, 'name': 'Аккаунты'},
-                                       {'id': 433, 'name': 'Услуги'},
-                                       {'id': 434, 'name': 'Прочее'}],
-    'roblox__racket-rivals': [   {'id': 421, 'name': 'Геймпассы'},
-                                 {'id': 422, 'name': 'Аккаунты'},
-                                 {'id': 423, 'name': 'Услуги'},
-                                 {'id': 424, 'name': 'Прочее'}],
-    'roblox__rivals': [   {'id': 362, 'name': 'Геймпассы'},
-                          {'id': 234, 'name': 'Аккаунты'},
-                          {'id': 235, 'name': 'Услуги'},
-                          {'id': 236, 'name': 'Прочее'}],
-    'roblox__sols-rng': [   {'id': 242, 'name': 'Предметы'},
-                            {'id': 364, 'name': 'Геймпассы'},
-                            {'id': 243, 'name': 'Аккаунты'},
-                            {'id': 244, 'name': 'Услуги'},
-                            {'id': 245, 'name': 'Прочее'}],
-    'roblox__spongebob-tower-defense': [   {'id': 246, 'name': 'Предметы'},
-                                           {'id': 365, 'name': 'Геймпассы'},
-                                           {'id': 247, 'name': 'Аккаунты'},
-                                           {'id': 248, 'name': 'Услуги'},
-                                           {'id': 249, 'name': 'Прочее'}],
-    'roblox__steal-a-brainrot': [   {'id': 322, 'name': 'Предметы'},
-                                    {'id': 366, 'name': 'Геймпассы'},
-                                    {'id': 323, 'name': 'Аккаунты'},
-                                    {'id': 324, 'name': 'Услуги'},
-                                    {'id': 435, 'name': 'VIP-Сервер'},
-                                    {'id': 325, 'name': 'Прочее'}],
-    'roblox__the-strongest-battlegrounds': [   {'id': 367, 'name': 'Геймпассы'},
-                                               {'id': 250, 'name': 'Аккаунты'},
-                                               {   'id': 251,
-                                                   'name': 'VIP-Сервер'},
-                                               {'id': 252, 'name': 'Услуги'},
-                                               {'id': 253, 'name': 'Прочее'}],
-    'roblox__the-wild-west': [   {'id': 316, 'name': 'Предметы'},
-                                 {'id': 317, 'name': 'Золото'},
-                                 {'id': 368, 'name': 'Геймпассы'},
-                                 {'id': 318, 'name': 'Аккаунты'},
-                                 {'id': 319, 'name': 'Услуги'},
-                                 {'id': 320, 'name': 'Прочее'}],
-    'roblox__toilet-tower-defense': [   {'id': 310, 'name': 'Предметы'},
-                                        {'id': 311, 'name': 'Ящики'},
-                                        {'id': 312, 'name': 'Гемы'},
-                                        {'id': 369, 'name': 'Геймпассы'},
-                                        {'id': 313, 'name': 'Аккаунты'},
-                                        {'id': 314, 'name': 'Услуги'},
-                                        {'id': 315, 'name': 'Прочее'}],
-    'roblox__tower-defense-simulator': [   {'id': 254, 'name': 'Предметы'},
-                                           {'id': 370, 'name': 'Геймпассы'},
-                                           {'id': 255, 'name': 'Аккаунты'},
-                                           {'id': 256, 'name': 'Услуги'},
-                                           {'id': 257, 'name': 'Прочее'}],
-    'roblox__type-soul': [   {'id': 403, 'name': 'Предметы'},
-                             {'id': 513, 'name': 'Геймпассы'},
-                             {'id': 404, 'name': 'Аккаунты'},
-                             {'id': 405, 'name': 'Услуги'},
-                             {'id': 406, 'name': 'Прочее'}],
-    'roblox__untitled-boxing-game': [   {'id': 258, 'name': 'Предметы'},
-                                        {'id': 260, 'name': 'Спины'},
-                                        {'id': 259, 'name': 'Деньги'},
-                                        {'id': 261, 'name': 'Аккаунты'},
-                                        {'id': 262, 'name': 'Услуги'},
-                                        {'id': 263, 'name': 'Прочее'}],
-    'roblox__volleyball-legends': [   {'id': 371, 'name': 'Геймпассы'},
-                                      {'id': 194, 'name': 'Аккаунты'},
-                                      {'id': 195, 'name': 'Услуги'},
-                                      {'id': 196, 'name': 'Прочее'}],
-    'roblox__war-tycoon': [   {'id': 373, 'name': 'Предметы'},
-                              {'id': 374, 'name': 'Медали'},
-                              {'id': 375, 'name': 'Геймпассы'},
-                              {'id': 376, 'name': 'Аккаунты'},
-                              {'id': 377, 'name': 'Услуги'},
-                              {'id': 378, 'name': 'Прочее'}],
-    'roblox__your-bizzare-adventure': [   {'id': 264, 'name': 'Предметы'},
-                                          {'id': 265, 'name': 'Игровая валюта'},
-                                          {'id': 266, 'name': 'Аккаунты'},
-                                          {'id': 267, 'name': 'Услуги'},
-                                          {'id': 268, 'name': 'Прочее'}],
-    'roblox__other-games': [   {'id': 269, 'name': 'Предметы'},
-                               {'id': 270, 'name': 'Игровая валюта'},
-                               {'id': 372, 'name': 'Геймпассы'},
-                               {'id': 271, 'name': 'Аккаунты'},
-                               {'id': 272, 'name': 'Услуги'},
-                               {'id': 273, 'name': 'Прочее'}],
-    'clash-of-clans__gems': [   {'id': 518, 'name': '80 гемов'},
-                                {'id': 519, 'name': '160 гемов'},
-                                {'id': 520, 'name': '240 гемов'},
-                                {'id': 521, 'name': '500 гемов'},
-                                {'id': 522, 'name': '1200 гемов'},
-                                {'id': 523, 'name': '1700 гемов'},
-                                {'id': 524, 'name': '2500 гемов'},
-                                {'id': 525, 'name': '3700 гемов'},
-                                {'id': 526, 'name': '6500 гемов'},
-                                {'id': 527, 'name': '9000 гемов'},
-                                {'id': 528, 'name': '10000 гемов'},
-                                {'id': 529, 'name': '14000 гемов'},
-                                {'id': 530, 'name': '28000 гемов'},
-                                {'id': 531, 'name': 'Особая акция'},
-                                {'id': 532, 'name': 'Другое количество'}],
-    'clash-of-clans__gold-pass': [   {'id': 533, 'name': 'Начальный пропуск'},
-                                     {'id': 534, 'name': 'Золотой пропуск'},
-                                     {'id': 535, 'name': 'Пропуск события'}],
-    'clash-of-clans__donate': [   {'id': 536, 'name': 'Внешний вид'},
-                                  {'id': 537, 'name': 'Пропуск события'},
-                                  {'id': 538, 'name': 'Наборы'},
-                                  {'id': 539, 'name': 'Набор строителя'},
-                                  {'id': 540, 'name': 'Медали события'},
-                                  {'id': 541, 'name': 'Наборы ратуши'},
-                                  {'id': 542, 'name': 'Особые акции'}],
-    'clash-of-clans__services': [   {'id': 543, 'name': 'Буст'},
-                                    {'id': 544, 'name': 'Набор в клан'},
-                                    {'id': 546, 'name': 'Другое'}],
-    'clash-royale__gems': [   {'id': 476, 'name': '80 гемов'},
-                              {'id': 478, 'name': '160 гемов'},
-                              {'id': 479, 'name': '240 гемов'},
-                              {'id': 480, 'name': '500 гемов'},
-                              {'id': 486, 'name': '1200 гемов'},
-                              {'id': 473, 'name': '1700 гемов'},
-                              {'id': 481, 'name': '2500 гемов'},
-                              {'id': 482, 'name': '3700 гемов'},
-                              {'id': 477, 'name': '6500 гемов'},
-                              {'id': 474, 'name': '9000 гемов'},
-                              {'id': 483, 'name': '10000 гемов'},
-                              {'id': 484, 'name': '14000 гемов'},
-                              {'id': 485, 'name': '28000 гемов'},
-                              {'id': 475, 'name': 'Особая акция'},
-                              {'id': 487, 'name': 'Другое количество'}],
-    'clash-royale__donate': [   {'id': 496, 'name': 'Pass Royale'},
-                                {'id': 488, 'name': 'Наборы'},
-                                {'id': 489, 'name': 'Акции'},
-                                {'id': 490, 'name': 'Эволюции'},
-                                {'id': 491, 'name': 'Карты джокера'},
-                                {'id': 494, 'name': 'Свинья-копилка'},
-                                {'id': 495, 'name': 'Чемпионские карты'},
-                                {'id': 497, 'name': 'Другое'}],
-    'clash-royale__boost': [   {'id': 501, 'name': 'Буст кубков'},
-                               {'id': 498, 'name': 'Буст уровней БП'},
-                               {'id': 499, 'name': 'Буст лиги'},
-                               {'id': 500, 'name': 'Буст арены'},
-                               {'id': 502, 'name': 'Прочее'}],
-    'clash-royale__merge-tactics': [   {'id': 503, 'name': 'Буст звёзд'},
-                                       {'id': 504, 'name': 'Буст лиг'},
-                                       {'id': 505, 'name': 'Услуги'},
-                                       {'id': 506, 'name': 'Прочее'}]}
+"""
+SUB_CATEGORY_MAP: {'<game>__<category>': [{'id', 'name'}, ...]}.
+
+Раньше здесь лежала копия части каталога литералом; теперь карта строится из общего
+каталога (plugins/utils/catalog.py) при первом обращении и после его обновления.
+"""
+from typing import Dict, List, Any
+
+_sub_category_map = (None, None)
+
+
+def __getattr__(name: str):
+    global _sub_category_map
+    if name == "SUB_CATEGORY_MAP":
+        from .catalog import get_catalog
+        catalog = get_catalog()
+        cached_catalog, mapping = _sub_category_map
+        if cached_catalog is not catalog:
+            mapping = catalog.sub_category_map()
+            _sub_category_map = (catalog, mapping)
+        return mapping
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_sub_category_map() -> Dict[str, List[Dict[str, Any]]]:
+    return __getattr__("SUB_CATEGORY_MAP")
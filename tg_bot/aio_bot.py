@@ -2,7 +2,9 @@ import asyncio
 import logging
 import time
 import hashlib
+import html
 import math
+from collections import OrderedDict
 
 from aiogram import Bot, Dispatcher, Router, F
 from aiogram.filters import CommandStart, Command
@@ -14,11 +16,14 @@ from aiogram.client.default import DefaultBotProperties
 from tg_bot.locale import Locale
 from tg_bot.kb import KB
 from tg_bot.database import Database
+from Utils import json_codec
 from tg_bot.states import AuthFlow, SettingsFlow, TemplatesFlow, AutodeliveryFlow, ChatReplyFlow, OrderFlow, AutoResponseFlow, ReviewFlow, ReviewAutoReplyFlow
 
 logger = logging.getLogger("StarVell.TG")
 
 PAGE_SIZE = 5
+LOG_PAGE_CHARS = 3500  # запас до лимита Telegram в 4096 с заголовком и <pre>
+LOG_VIEWS = 10         # столько последних выдач /logs можно листать
 
 
 class AioTGBot:
@@ -32,32 +37,31 @@ class AioTGBot:
         self.bot = Bot(token=token, default=DefaultBotProperties(parse_mode="HTML"))
         self.dp = Dispatcher(storage=MemoryStorage())
         self.db = Database()
+        self.db_ready = False
         self.loop = None
+        self._log_views: "OrderedDict[int, list]" = OrderedDict()
+        self._log_seq = 0
         
         self._load_admins()
         self._setup_handlers()
 
     def _load_admins(self):
         """Загружает список админов из storage"""
-        import json
         import os
         try:
             path = "storage/admins.json"
             if os.path.exists(path):
-                with open(path, "r") as f:
-                    data = json.load(f)
-                    for uid in data.get("admins", []):
-                        self.admin_ids.add(int(uid))
+                data = json_codec.load_file(path)
+                for uid in data.get("admins", []):
+                    self.admin_ids.add(int(uid))
         except Exception:
             pass
 
     def _save_admins(self):
         """Сохраняет список админов"""
-        import json
         import os
         os.makedirs("storage", exist_ok=True)
-        with open("storage/admins.json", "w") as f:
-            json.dump({"admins": list(self.admin_ids)}, f)
+        json_codec.dump_file("storage/admins.json", {"admins": list(self.admin_ids)})
 
     def _is_admin(self, user_id: int) -> bool:
         """Проверяет является ли пользователь админом"""
@@ -69,6 +73,7 @@ class AioTGBot:
 
     async def init_db(self):
         await self.db.init()
+        self.db_ready = True
 
     def _t(self, lang: str, key: str, **kwargs) -> str:
         return Locale.t(lang, key, **kwargs)
@@ -182,6 +187,12 @@ class AioTGBot:
                 self._t(lang, "status_messages", messages=stats.get("messages_sent", 0)),
                 self._t(lang, "status_session", status=session_status),
             ])
+            accounts = getattr(self.nexus, "accounts", {}) if self.nexus else {}
+            if len(accounts) > 1:
+                text += "\n\n👥 <b>Аккаунты:</b>\n" + "\n".join(
+                    f"{'✅' if getattr(peer.account, 'is_initiated', False) else '❌'} {html.escape(peer.label)}"
+                    for peer in accounts.values()
+                )
             
             await cb.message.edit_text(
                 text,
@@ -613,18 +624,14 @@ class AioTGBot:
 
         # ============================
         def _load_ar_config():
-            import json
             try:
-                with open("configs/auto_response.json", "r", encoding="utf-8") as f:
-                    return json.load(f)
+                return json_codec.load_file("configs/auto_response.json")
             except Exception:
                 return {"enabled": False, "greeting_enabled": False, "greeting_message": "", "keywords": {}}
         
         def _save_ar_config(cfg):
-            import json
             try:
-                with open("configs/auto_response.json", "w", encoding="utf-8") as f:
-                    json.dump(cfg, f, ensure_ascii=False, indent=4)
+                json_codec.dump_file("configs/auto_response.json", cfg, pretty=True)
             except Exception:
                 pass
 
@@ -847,6 +854,22 @@ class AioTGBot:
                 "updated": updated,
             }
 
+        def _plugin_events_text(key: str) -> str:
+            pm = getattr(self.nexus, "plugin_manager", None) if self.nexus else None
+            stats = pm.events.stats.get(key) if pm is not None and hasattr(pm, "events") else None
+            if stats is None:
+                return ""
+            text = (
+                f"\n\n📡 События: {stats.calls}, "
+                f"ср. {stats.avg_time * 1000:.0f} мс, макс. {stats.max_time * 1000:.0f} мс\n"
+                f"❌ Ошибок: {stats.errors} · ⏱ Таймаутов: {stats.timeouts}"
+            )
+            if stats.dropped:
+                text += f" · 🚫 Пропущено: {stats.dropped}"
+            if stats.last_error:
+                text += f"\n<i>{html.escape(stats.last_error[:200])}</i>"
+            return text
+
         @router.callback_query(F.data == "menu:plugins")
         async def menu_plugins(cb: CallbackQuery, state: FSMContext):
             if not self._is_admin(cb.from_user.id):
@@ -902,7 +925,7 @@ class AioTGBot:
                 f"🕐 Обновлён: {info['updated']}\n"
                 f"📊 Статус: {status}\n\n"
                 f"{info['description']}"
-            )
+            ) + _plugin_events_text(plugin_name)
             
             has_commands = len(info["commands"]) > 0
             has_settings = len(info["buttons"]) > 0
@@ -939,7 +962,7 @@ class AioTGBot:
                         f"🕐 Обновлён: {info['updated']}\n"
                         f"📊 Статус: {status}\n\n"
                         f"{info['description']}"
-                    )
+                    ) + _plugin_events_text(plugin_name)
                     
                     has_commands = len(info["commands"]) > 0
                     has_settings = len(info["buttons"]) > 0
@@ -1052,7 +1075,10 @@ class AioTGBot:
             if self.nexus and hasattr(self.nexus, "plugin_manager"):
                 pm = self.nexus.plugin_manager
                 if hasattr(pm, "plugins") and plugin_name in pm.plugins:
-                    del pm.plugins[plugin_name]
+                    if hasattr(pm, "delete_plugin"):
+                        pm.delete_plugin(plugin_name)
+                    else:
+                        del pm.plugins[plugin_name]
                     deleted = True
             
             if deleted:
@@ -1342,9 +1368,10 @@ class AioTGBot:
                 pass
             
             success = False
-            if self.nexus and hasattr(self.nexus, "account") and self.nexus.account:
+            account = self.nexus.account_for(chat_id) if self.nexus else None
+            if account:
                 try:
-                    self.nexus.account.send_message(chat_id, content)
+                    account.send_message(chat_id, content)
                     success = True
                 except Exception as e:
                     error_text = self._t(lang, "reply_error", error=str(e))
@@ -1436,9 +1463,10 @@ class AioTGBot:
             original_text = data.get("original_text", "")
             
             success = False
-            if self.nexus and hasattr(self.nexus, "account") and self.nexus.account:
+            account = self.nexus.account_for(chat_id) if self.nexus else None
+            if account:
                 try:
-                    self.nexus.account.send_message(chat_id, content)
+                    account.send_message(chat_id, content)
                     success = True
                 except Exception:
                     pass
@@ -1601,10 +1629,11 @@ class AioTGBot:
                 pass
             
             success = False
-            if self.nexus and hasattr(self.nexus, "account") and self.nexus.account:
+            account = self.nexus.account_for(review_id) if self.nexus else None
+            if account:
                 try:
-                    if hasattr(self.nexus.account, "reply_to_review"):
-                        self.nexus.account.reply_to_review(review_id, content)
+                    if hasattr(account, "reply_to_review"):
+                        account.reply_to_review(review_id, content)
                         success = True
                 except Exception as e:
                     pass
@@ -1881,25 +1910,20 @@ class AioTGBot:
                     await msg.answer(text)
 
         def _load_update_settings():
-            import json
             try:
-                with open("configs/auto_response.json", "r", encoding="utf-8") as f:
-                    cfg = json.load(f)
-                    return cfg.get("auto_update", True)
+                cfg = json_codec.load_file("configs/auto_response.json")
+                return cfg.get("auto_update", True)
             except Exception:
                 return True
         
         def _save_update_settings(enabled: bool):
-            import json
             try:
-                with open("configs/auto_response.json", "r", encoding="utf-8") as f:
-                    cfg = json.load(f)
+                cfg = json_codec.load_file("configs/auto_response.json")
             except Exception:
                 cfg = {}
             cfg["auto_update"] = enabled
             try:
-                with open("configs/auto_response.json", "w", encoding="utf-8") as f:
-                    json.dump(cfg, f, ensure_ascii=False, indent=4)
+                json_codec.dump_file("configs/auto_response.json", cfg, pretty=True)
             except Exception:
                 pass
 
@@ -1933,7 +1957,7 @@ class AioTGBot:
                 
                 await msg.answer(
                     text,
-                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=True).as_markup()
+                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=True, rollback_version=Updater.backup_version()).as_markup()
                 )
             else:
                 error = result.get("error", "")
@@ -1944,7 +1968,7 @@ class AioTGBot:
                 
                 await msg.answer(
                     text,
-                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=False).as_markup()
+                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=False, rollback_version=Updater.backup_version()).as_markup()
                 )
 
         @router.callback_query(F.data == "upd:toggle")
@@ -1955,11 +1979,13 @@ class AioTGBot:
             user = await self.db.get_user(cb.from_user.id)
             lang = user.get("language") or "ru"
             
+            from Utils.updater import Updater
+
             current = _load_update_settings()
             _save_update_settings(not current)
             
             await cb.message.edit_reply_markup(
-                reply_markup=KB.update_menu(lambda k: self._t(lang, k), not current, has_update=False).as_markup()
+                reply_markup=KB.update_menu(lambda k: self._t(lang, k), not current, has_update=False, rollback_version=Updater.backup_version()).as_markup()
             )
             await cb.answer("✅ Включено" if not current else "❌ Выключено")
 
@@ -1994,7 +2020,7 @@ class AioTGBot:
                 
                 await cb.message.edit_text(
                     text,
-                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=True).as_markup()
+                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=True, rollback_version=Updater.backup_version()).as_markup()
                 )
             else:
                 error = result.get("error", "")
@@ -2005,7 +2031,7 @@ class AioTGBot:
                 
                 await cb.message.edit_text(
                     text,
-                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=False).as_markup()
+                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), auto_update, has_update=False, rollback_version=Updater.backup_version()).as_markup()
                 )
 
         @router.callback_query(F.data == "upd:now")
@@ -2042,12 +2068,104 @@ class AioTGBot:
                 await cb.message.edit_text(
                     "❌ <b>Ошибка обновления</b>\n\n"
                     "Попробуйте позже или обновите вручную.",
-                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), True, has_update=True).as_markup()
+                    reply_markup=KB.update_menu(lambda k: self._t(lang, k), True, has_update=True, rollback_version=Updater.backup_version()).as_markup()
                 )
             await cb.answer()
 
+        @router.callback_query(F.data == "upd:rollback")
+        async def upd_rollback(cb: CallbackQuery):
+            if not self._is_admin(cb.from_user.id):
+                await cb.answer()
+                return
+
+            from Utils.updater import Updater
+
+            version = Updater.backup_version()
+            if not version or not await asyncio.to_thread(Updater.rollback):
+                await cb.answer("❌ Откат не удался", show_alert=True)
+                return
+            await cb.message.edit_text(f"⏪ <b>Откат на v{version} выполнен</b>\n\n🔄 Бот перезапускается...")
+            await cb.answer()
+            await asyncio.sleep(2)
+            Updater.restart_bot()
+
+        # ============================
+        # ЛОГИ
+        # ============================
+
+        @router.message(Command("logs"))
+        async def cmd_logs(msg: Message):
+            """/logs [N] — последние N строк; /logs <текст> или /logs re:<regex> — поиск по bot.log и архивам"""
+            if not self._is_admin(msg.from_user.id):
+                return
+            from Utils import log_reader
+
+            arg = (msg.text or "").partition(" ")[2].strip()
+            wait = await msg.answer("🔍 Читаю логи...")
+            if not arg or arg.isdigit():
+                scan = await asyncio.to_thread(log_reader.tail, int(arg or 50))
+                lines = scan.lines[::-1]  # хвост показываем по порядку, как в файле
+                title = f"📄 <b>Последние {len(lines)} строк</b>"
+            else:
+                regex = arg.lower().startswith("re:")
+                pattern = arg[3:].strip() if regex else arg
+                try:
+                    scan = await asyncio.to_thread(log_reader.search, pattern, regex=regex)
+                except ValueError as e:
+                    await wait.edit_text(f"❌ {html.escape(str(e))}")
+                    return
+                lines = scan.lines
+                title = f"🔎 <b>{html.escape(arg[:50])}</b>: {len(lines)} совпадений, новые сверху"
+            if not lines:
+                await wait.edit_text("📭 В логах ничего не найдено" if arg and not arg.isdigit() else "📭 Лог пуст")
+                return
+
+            pages = self._paginate_log(lines)
+            footer = f"\n<i>{scan.files} файл(ов), {scan.scanned_bytes // 1024} КБ, {scan.elapsed:.2f} с</i>"
+            if scan.truncated:
+                footer += "\n⏱ <i>Время поиска вышло — показано найденное</i>"
+            self._log_seq += 1
+            self._log_views[self._log_seq] = [f"{title}\n{page}{footer}" for page in pages]
+            while len(self._log_views) > LOG_VIEWS:
+                self._log_views.popitem(last=False)
+            await wait.edit_text(
+                self._log_views[self._log_seq][0],
+                reply_markup=KB.log_pages(self._log_seq, 1, len(pages)).as_markup() if len(pages) > 1 else None
+            )
+
+        @router.callback_query(F.data.startswith("logs:"))
+        async def logs_page(cb: CallbackQuery):
+            if not self._is_admin(cb.from_user.id):
+                await cb.answer()
+                return
+            _, view_id, page = cb.data.split(":")
+            pages = self._log_views.get(int(view_id))
+            if not pages:
+                await cb.answer("⌛ Выдача устарела, повторите /logs", show_alert=True)
+                return
+            page = max(1, min(int(page), len(pages)))
+            await cb.message.edit_text(pages[page - 1], reply_markup=KB.log_pages(int(view_id), page, len(pages)).as_markup())
+            await cb.answer()
+
         self.dp.include_router(router)
 
+    @staticmethod
+    def _paginate_log(lines: list) -> list:
+        """Режет строки лога на страницы <pre> не длиннее LOG_PAGE_CHARS"""
+        pages, current, size = [], [], 0
+        for line in lines:
+            line = html.escape(line[:LOG_PAGE_CHARS // 2], quote=False)
+            if len(line) > LOG_PAGE_CHARS:  # строка из одних & и <
+                line = line[:LOG_PAGE_CHARS].rpartition("&")[0]
+            if current and size + len(line) + 1 > LOG_PAGE_CHARS:
+                pages.append(current)
+                current, size = [], 0
+            current.append(line)
+            size += len(line) + 1
+        if current:
+            pages.append(current)
+        return ["<pre>" + "\n".join(page) + "</pre>" for page in pages]
+
     async def send_notification(self, text: str, reply_markup=None):
         try:
             await self.bot.send_message(
@@ -2141,6 +2259,7 @@ class AioTGBot:
 
     async def run(self):
         self.loop = asyncio.get_event_loop()
-        await self.init_db()
+        if not self.db_ready:
+            await self.init_db()
         logger.info("Telegram bot polling started")
         await self.dp.start_polling(self.bot)
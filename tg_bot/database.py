@@ -3,13 +3,27 @@ import time
 import aiosqlite
 from pathlib import Path
 
+from Utils import json_codec
+from Utils.settings import MAIN_ACCOUNT
+
 
 class Database:
     def __init__(self, path: str = "storage/bot.db"):
         self.path = path
         self._lock = asyncio.Lock()
+        # Вызываются с именем товара после любого изменения остатка автовыдачи основного аккаунта
+        self.autodelivery_listeners = []
         Path(path).parent.mkdir(parents=True, exist_ok=True)
 
+    def _autodelivery_changed(self, product: str, account: str = MAIN_ACCOUNT):
+        if account != MAIN_ACCOUNT:
+            return  # слушатели (StockSync) ведут лоты основного аккаунта
+        for listener in self.autodelivery_listeners:
+            try:
+                listener(product)
+            except Exception:
+                pass
+
     async def init(self):
         async with aiosqlite.connect(self.path) as db:
             await db.execute("""
@@ -49,12 +63,28 @@ class Database:
                     updated_at INTEGER DEFAULT 0
                 )
             """)
-            await db.execute("""
+            await db.execute(f"""
                 CREATE TABLE IF NOT EXISTS autodelivery (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     product TEXT NOT NULL,
                     value TEXT NOT NULL,
-                    created_at INTEGER DEFAULT 0
+                    created_at INTEGER DEFAULT 0,
+                    account TEXT NOT NULL DEFAULT '{MAIN_ACCOUNT}'
+                )
+            """)
+            # базы до многоаккаунтности: весь прежний запас — основного аккаунта
+            cur = await db.execute("PRAGMA table_info(autodelivery)")
+            if "account" not in {row[1] for row in await cur.fetchall()}:
+                await db.execute(f"ALTER TABLE autodelivery ADD COLUMN account TEXT NOT NULL DEFAULT '{MAIN_ACCOUNT}'")
+            await cur.close()
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_autodelivery_account ON autodelivery(account, product, id)")
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS plugin_kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at INTEGER DEFAULT 0,
+                    PRIMARY KEY (namespace, key)
                 )
             """)
             await db.commit()
@@ -229,26 +259,27 @@ class Database:
                 )
                 await db.commit()
 
-    async def add_autodelivery(self, product: str, values: list) -> int:
+    async def add_autodelivery(self, product: str, values: list, account: str = MAIN_ACCOUNT) -> int:
         if not values:
             return 0
         async with self._lock:
             async with aiosqlite.connect(self.path) as db:
                 ts = int(time.time())
                 await db.executemany(
-                    "INSERT INTO autodelivery(product, value, created_at) VALUES(?, ?, ?)",
-                    [(product, v, ts) for v in values]
+                    "INSERT INTO autodelivery(product, value, created_at, account) VALUES(?, ?, ?, ?)",
+                    [(product, v, ts, account) for v in values]
                 )
                 await db.commit()
-                return len(values)
+        self._autodelivery_changed(product, account)
+        return len(values)
 
-    async def pop_autodelivery(self, product: str) -> str | None:
+    async def pop_autodelivery(self, product: str, account: str = MAIN_ACCOUNT) -> str | None:
         async with self._lock:
             async with aiosqlite.connect(self.path) as db:
                 db.row_factory = aiosqlite.Row
                 cur = await db.execute(
-                    "SELECT id, value FROM autodelivery WHERE product=? ORDER BY id ASC LIMIT 1",
-                    (product,)
+                    "SELECT id, value FROM autodelivery WHERE account=? AND product=? ORDER BY id ASC LIMIT 1",
+                    (account, product)
                 )
                 row = await cur.fetchone()
                 await cur.close()
@@ -258,36 +289,42 @@ class Database:
                 value = row["value"]
                 await db.execute("DELETE FROM autodelivery WHERE id=?", (item_id,))
                 await db.commit()
-                return value
+        self._autodelivery_changed(product, account)
+        return value
 
-    async def count_autodelivery(self, product: str) -> int:
+    async def count_autodelivery(self, product: str, account: str = MAIN_ACCOUNT) -> int:
         async with self._lock:
             async with aiosqlite.connect(self.path) as db:
-                cur = await db.execute("SELECT COUNT(*) FROM autodelivery WHERE product=?", (product,))
+                cur = await db.execute("SELECT COUNT(*) FROM autodelivery WHERE account=? AND product=?",
+                                       (account, product))
                 row = await cur.fetchone()
                 await cur.close()
                 return int(row[0]) if row else 0
 
-    async def list_autodelivery(self) -> list:
+    async def list_autodelivery(self, account: str = MAIN_ACCOUNT) -> list:
         async with self._lock:
             async with aiosqlite.connect(self.path) as db:
                 cur = await db.execute(
-                    "SELECT product, COUNT(*) as cnt FROM autodelivery GROUP BY product ORDER BY product"
+                    "SELECT product, COUNT(*) as cnt FROM autodelivery WHERE account=? "
+                    "GROUP BY product ORDER BY product",
+                    (account,)
                 )
                 rows = await cur.fetchall()
                 await cur.close()
                 return [(r[0], r[1]) for r in rows]
 
-    async def delete_autodelivery(self, product: str) -> int:
+    async def delete_autodelivery(self, product: str, account: str = MAIN_ACCOUNT) -> int:
         async with self._lock:
             async with aiosqlite.connect(self.path) as db:
-                cur = await db.execute("SELECT COUNT(*) FROM autodelivery WHERE product=?", (product,))
+                cur = await db.execute("SELECT COUNT(*) FROM autodelivery WHERE account=? AND product=?",
+                                       (account, product))
                 row = await cur.fetchone()
                 count = int(row[0]) if row else 0
                 await cur.close()
-                await db.execute("DELETE FROM autodelivery WHERE product=?", (product,))
+                await db.execute("DELETE FROM autodelivery WHERE account=? AND product=?", (account, product))
                 await db.commit()
-                return count
+        self._autodelivery_changed(product, account)
+        return count
 
     async def get_authorized_users(self) -> list:
         async with self._lock:
@@ -298,3 +335,37 @@ class Database:
                 await cur.close()
                 return [dict(r) for r in rows]
 
+    # ===== KV плагинов (core/plugin_services.PluginKV) =====
+
+    async def kv_get(self, namespace: str, key: str, default=None):
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT value FROM plugin_kv WHERE namespace=? AND key=?", (namespace, key))
+                row = await cur.fetchone()
+                await cur.close()
+        return json_codec.loads(row[0]) if row else default
+
+    async def kv_set(self, namespace: str, key: str, value):
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                await db.execute(
+                    "INSERT INTO plugin_kv(namespace, key, value, updated_at) VALUES(?,?,?,?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at",
+                    (namespace, key, json_codec.dumps(value), int(time.time())),
+                )
+                await db.commit()
+
+    async def kv_delete(self, namespace: str, key: str) -> bool:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("DELETE FROM plugin_kv WHERE namespace=? AND key=?", (namespace, key))
+                await db.commit()
+                return cur.rowcount > 0
+
+    async def kv_items(self, namespace: str) -> dict:
+        async with self._lock:
+            async with aiosqlite.connect(self.path) as db:
+                cur = await db.execute("SELECT key, value FROM plugin_kv WHERE namespace=?", (namespace,))
+                rows = await cur.fetchall()
+                await cur.close()
+        return {k: json_codec.loads(v) for k, v in rows}
@@ -12,6 +12,8 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from Utils.exceptions import ConfigParseError
+
 if TYPE_CHECKING:
     from nexus import Nexus
 
@@ -156,10 +158,20 @@ def init_uploader(nexus: Nexus):
             return
         
         if await download_file(bot, message, file_name, f"configs/{file_name}"):
-            await message.reply(
-                f"✅ Конфиг <code>{file_name}</code> успешно загружен!\n\n"
-                "⚠️ Перезапустите бота для применения изменений."
-            )
+            text = f"✅ Конфиг <code>{file_name}</code> успешно загружен!"
+            watcher = getattr(nexus, "config_watcher", None)
+            if watcher is None:
+                text += "\n\n⚠️ Перезапустите бота для применения изменений."
+            else:
+                try:
+                    live, restart = await watcher.reload()
+                    if live:
+                        text += "\n\n♻️ Применено сразу: <code>" + ", ".join(sorted(live)) + "</code>"
+                    if restart:
+                        text += "\n\n⚠️ Требуют перезапуска: <code>" + ", ".join(sorted(restart)) + "</code>"
+                except ConfigParseError as e:
+                    text += f"\n\n❌ Конфиг не применён, работают старые настройки:\n<code>{e}</code>"
+            await message.reply(text)
             logger.info(
                 f"Пользователь {message.from_user.username} ({message.from_user.id}) "
                 f"загрузил основной конфиг"
@@ -255,18 +267,43 @@ def init_uploader(nexus: Nexus):
             await message.reply("❌ Неверный формат файла. Ожидается .py файл.")
             return
         
-        file_name = message.document.file_name
-        if await download_file(bot, message, file_name, f"plugins/{file_name}"):
+        file_name = os.path.basename(message.document.file_name)
+        target = f"plugins/{file_name}"
+        part = f"{target}.part"  # не *.py — слежение за плагинами не увидит недокачанный файл
+        if not await download_file(bot, message, file_name, part):
+            await message.reply("❌ Ошибка загрузки плагина")
+            return
+
+        try:
+            with open(part, "rb") as f:
+                compile(f.read(), target, "exec")
+        except SyntaxError as e:
+            os.remove(part)
+            await message.reply(
+                f"❌ Плагин <code>{file_name}</code> не принят: синтаксическая ошибка в строке {e.lineno}\n"
+                f"<code>{e.msg}</code>"
+            )
+            return
+        os.replace(part, target)
+        logger.info(
+            f"Пользователь {message.from_user.username} ({message.from_user.id}) "
+            f"загрузил плагин: {file_name}"
+        )
+
+        pm = getattr(nexus, "plugin_manager", None)
+        if pm is None or not hasattr(pm, "reload_plugin"):
             await message.reply(
                 f"✅ Плагин <code>{file_name}</code> успешно загружен!\n\n"
                 "⚠️ Перезапустите бота для загрузки плагина."
             )
-            logger.info(
-                f"Пользователь {message.from_user.username} ({message.from_user.id}) "
-                f"загрузил плагин: {file_name}"
-            )
+            return
+        ok, info = await pm.reload_plugin(os.path.splitext(file_name)[0])
+        if ok:
+            await message.reply(f"✅ Плагин <code>{file_name}</code> загружен: {info}")
         else:
-            await message.reply("❌ Ошибка загрузки плагина")
+            await message.reply(
+                f"⚠️ Плагин <code>{file_name}</code> сохранён, но не подключён: <code>{info}</code>"
+            )
 
     # ===== FUNPAY IMAGE =====
     @router.callback_query(F.data == "upload_funpay_image")
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardButton
 
@@ -344,17 +346,29 @@ class KB:
         return b
 
     @staticmethod
-    def update_menu(t, auto_update: bool, has_update: bool = False) -> InlineKeyboardBuilder:
+    def log_pages(view_id: int, page: int, total_pages: int) -> InlineKeyboardBuilder:
+        b = InlineKeyboardBuilder()
+        nav = []
+        if page > 1:
+            nav.append(InlineKeyboardButton(text="◀️", callback_data=f"logs:{view_id}:{page-1}"))
+        nav.append(InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="noop"))
+        if page < total_pages:
+            nav.append(InlineKeyboardButton(text="▶️", callback_data=f"logs:{view_id}:{page+1}"))
+        b.row(*nav)
+        return b
+
+    @staticmethod
+    def update_menu(t, auto_update: bool, has_update: bool = False,
+                    rollback_version: Optional[str] = None) -> InlineKeyboardBuilder:
         b = InlineKeyboardBuilder()
         if has_update:
             b.button(text="📥 Обновить сейчас", callback_data="upd:now")
         icon = "✅" if auto_update else "❌"
         b.button(text=f"{icon} Автообновление", callback_data="upd:toggle")
         b.button(text="🔄 Проверить обновления", callback_data="upd:check")
+        if rollback_version:
+            b.button(text=f"⏪ Откатить на v{rollback_version}", callback_data="upd:rollback")
         b.button(text=t("btn_back"), callback_data="back:main")
-        if has_update:
-            b.adjust(1, 1, 1, 1)
-        else:
-            b.adjust(1, 1, 1)
+        b.adjust(1)
         return b
 
@@ -1,10 +1,11 @@
 import os
-import json
 import logging
 from typing import Dict, List, Optional, Union
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 import configparser
 
+from Utils import json_codec
+
 logger = logging.getLogger("StarVellBot.tg_bot")
 
 
@@ -54,9 +55,8 @@ def load_authorized_users() -> Dict[int, Dict[str, Union[bool, None, str]]]:
         if not os.path.exists("storage/authorized_users.json"):
             return {}
         
-        with open("storage/authorized_users.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return {int(k): v for k, v in data.items()}
+        data = json_codec.load_file("storage/authorized_users.json")
+        return {int(k): v for k, v in data.items()}
     except Exception as e:
         logger.error(f"Ошибка загрузки авторизованных пользователей: {e}")
         return {}
@@ -72,13 +72,25 @@ def load_notification_settings() -> Dict:
         if not os.path.exists("storage/notification_settings.json"):
             return {}
         
-        with open("storage/notification_settings.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_codec.load_file("storage/notification_settings.json")
     except Exception as e:
         logger.error(f"Ошибка загрузки настроек уведомлений: {e}")
         return {}
 
 
+def is_notification_enabled(chat_id: int, notification_type: str, default: bool = True) -> bool:
+    """
+    Проверяет, включён ли тип уведомлений для чата.
+
+    :param chat_id: ID чата.
+    :param notification_type: тип уведомлений (NotificationTypes).
+    :param default: значение, если переключатель ещё не трогали.
+    :return: True, если уведомление нужно отправить.
+    """
+    chat_settings = load_notification_settings().get(str(chat_id)) or {}
+    return bool(chat_settings.get(notification_type, default))
+
+
 def load_answer_templates() -> List[str]:
     """
     Загружает шаблоны ответов.
@@ -89,8 +101,7 @@ def load_answer_templates() -> List[str]:
         if not os.path.exists("storage/answer_templates.json"):
             return []
         
-        with open("storage/answer_templates.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_codec.load_file("storage/answer_templates.json")
     except Exception as e:
         logger.error(f"Ошибка загрузки шаблонов ответов: {e}")
         return []
@@ -104,8 +115,7 @@ def save_authorized_users(users: Dict[int, Dict]) -> None:
     """
     try:
         os.makedirs("storage", exist_ok=True)
-        with open("storage/authorized_users.json", "w", encoding="utf-8") as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file("storage/authorized_users.json", users)
     except Exception as e:
         logger.error(f"Ошибка сохранения авторизованных пользователей: {e}")
 
@@ -118,8 +128,7 @@ def save_notification_settings(settings: Dict) -> None:
     """
     try:
         os.makedirs("storage", exist_ok=True)
-        with open("storage/notification_settings.json", "w", encoding="utf-8") as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file("storage/notification_settings.json", settings)
     except Exception as e:
         logger.error(f"Ошибка сохранения настроек уведомлений: {e}")
 
@@ -132,8 +141,7 @@ def save_answer_templates(templates: List[str]) -> None:
     """
     try:
         os.makedirs("storage", exist_ok=True)
-        with open("storage/answer_templates.json", "w", encoding="utf-8") as f:
-            json.dump(templates, f, ensure_ascii=False, indent=2)
+        json_codec.dump_file("storage/answer_templates.json", templates)
     except Exception as e:
         logger.error(f"Ошибка сохранения шаблонов ответов: {e}")
 